@@ -0,0 +1,132 @@
+"""Range-partition live_tracking on timestamp
+
+Revision ID: 1ec1b0e9b00c
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-17 11:34:54.000000
+
+Rebuilds public.live_tracking as a table partitioned by RANGE ("timestamp").
+Partitions are created for every interval that holds existing rows, plus
+LIVE_TRACKING_PARTITION_PREMAKE intervals ahead; services/partitions.py keeps
+them rolling afterwards. Existing rows are copied into the new table, so run
+this in a maintenance window on large installs.
+
+The primary key becomes (id, "timestamp") because a partitioned table's unique
+constraints must include the partition key. A default partition catches rows
+outside every range instead of failing the insert.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ec1b0e9b00c'
+down_revision: Union[str, Sequence[str], None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INTERVAL = os.getenv("LIVE_TRACKING_PARTITION_INTERVAL", "day")
+PREMAKE = int(os.getenv("LIVE_TRACKING_PARTITION_PREMAKE", "7"))
+
+COLUMNS = 'id, vehicle_id, driver_id, latitude, longitude, speed, heading, accuracy, "timestamp", created_at'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if INTERVAL not in ("day", "week", "month"):
+        raise ValueError(f"Unsupported LIVE_TRACKING_PARTITION_INTERVAL: {INTERVAL}")
+
+    # -- move the plain table aside --
+    op.execute('ALTER TABLE public.live_tracking RENAME TO live_tracking_legacy')
+    op.execute('ALTER INDEX public.live_tracking_pkey RENAME TO live_tracking_legacy_pkey')
+    op.execute('ALTER INDEX public.ix_live_tracking_vehicle_id RENAME TO ix_live_tracking_legacy_vehicle_id')
+    op.execute('ALTER INDEX public.ix_live_tracking_timestamp RENAME TO ix_live_tracking_legacy_timestamp')
+
+    # -- partitioned parent --
+    op.execute("""
+        CREATE TABLE public.live_tracking (
+            id VARCHAR(36) NOT NULL,
+            vehicle_id VARCHAR(36) NOT NULL,
+            driver_id VARCHAR(36) NOT NULL,
+            latitude DOUBLE PRECISION NOT NULL,
+            longitude DOUBLE PRECISION NOT NULL,
+            speed DOUBLE PRECISION,
+            heading DOUBLE PRECISION,
+            accuracy DOUBLE PRECISION,
+            "timestamp" TIMESTAMP WITH TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT live_tracking_pkey PRIMARY KEY (id, "timestamp"),
+            CONSTRAINT live_tracking_vehicle_id_fkey FOREIGN KEY (vehicle_id)
+                REFERENCES public.vehicles (id) ON DELETE CASCADE,
+            CONSTRAINT live_tracking_driver_id_fkey FOREIGN KEY (driver_id)
+                REFERENCES auth.users (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.create_index('ix_live_tracking_vehicle_id', 'live_tracking', ['vehicle_id'], schema='public')
+    op.create_index('ix_live_tracking_timestamp', 'live_tracking', ['timestamp'], schema='public')
+
+    # -- one partition per interval from the oldest row to PREMAKE intervals ahead (UTC) --
+    op.execute(f"""
+        DO $$
+        DECLARE
+            step interval := '1 {INTERVAL}';
+            first_ts timestamptz;
+            lo timestamptz;
+            horizon timestamptz;
+        BEGIN
+            -- interval arithmetic on timestamptz follows the session TimeZone; in UTC
+            -- a day/month step never crosses DST, so bounds stay on UTC midnights
+            PERFORM set_config('TimeZone', 'UTC', true);
+            SELECT min("timestamp") INTO first_ts FROM public.live_tracking_legacy;
+            lo := date_trunc('{INTERVAL}', least(coalesce(first_ts, now()), now()) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+            horizon := (date_trunc('{INTERVAL}', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') + step * ({PREMAKE} + 1);
+            WHILE lo < horizon LOOP
+                EXECUTE format(
+                    'CREATE TABLE public.%I PARTITION OF public.live_tracking FOR VALUES FROM (%L) TO (%L)',
+                    'live_tracking_p' || to_char(lo AT TIME ZONE 'UTC', 'YYYYMMDD'), lo, lo + step
+                );
+                lo := lo + step;
+            END LOOP;
+        END $$
+    """)
+    op.execute('CREATE TABLE public.live_tracking_default PARTITION OF public.live_tracking DEFAULT')
+
+    # -- copy rows and drop the old table --
+    op.execute(f'INSERT INTO public.live_tracking ({COLUMNS}) SELECT {COLUMNS} FROM public.live_tracking_legacy')
+    op.execute('DROP TABLE public.live_tracking_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE public.live_tracking RENAME TO live_tracking_partitioned')
+    op.execute('ALTER INDEX public.live_tracking_pkey RENAME TO live_tracking_partitioned_pkey')
+    op.execute('ALTER INDEX public.ix_live_tracking_vehicle_id RENAME TO ix_live_tracking_partitioned_vehicle_id')
+    op.execute('ALTER INDEX public.ix_live_tracking_timestamp RENAME TO ix_live_tracking_partitioned_timestamp')
+
+    op.create_table(
+        'live_tracking',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('vehicle_id', sa.String(length=36), nullable=False),
+        sa.Column('driver_id', sa.String(length=36), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('speed', sa.Float(), nullable=True),
+        sa.Column('heading', sa.Float(), nullable=True),
+        sa.Column('accuracy', sa.Float(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['public.vehicles.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['driver_id'], ['auth.users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        schema='public'
+    )
+    op.execute(
+        f'INSERT INTO public.live_tracking ({COLUMNS}) '
+        f'SELECT DISTINCT ON (id) {COLUMNS} FROM public.live_tracking_partitioned'
+    )
+    op.execute('DROP TABLE public.live_tracking_partitioned CASCADE')
+    op.create_index(op.f('ix_live_tracking_vehicle_id'), 'live_tracking', ['vehicle_id'], schema='public')
+    op.create_index(op.f('ix_live_tracking_timestamp'), 'live_tracking', ['timestamp'], schema='public')
@@ -0,0 +1,39 @@
+"""Composite covering index on live_tracking (vehicle_id, timestamp DESC)
+
+Revision ID: ebbab74c47d4
+Revises: 1ec1b0e9b00c
+Create Date: 2026-10-17 11:36:15.000000
+
+Serves the latest-point lookup, history range scans and index-only route
+scans. It replaces the single-column vehicle_id index, which is a prefix of
+the new one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ebbab74c47d4'
+down_revision: Union[str, Sequence[str], None] = '1ec1b0e9b00c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_live_tracking_vehicle_id_timestamp',
+        'live_tracking',
+        ['vehicle_id', sa.text('"timestamp" DESC')],
+        postgresql_include=['latitude', 'longitude', 'speed', 'heading'],
+        schema='public'
+    )
+    op.drop_index('ix_live_tracking_vehicle_id', table_name='live_tracking', schema='public')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_live_tracking_vehicle_id', 'live_tracking', ['vehicle_id'], schema='public')
+    op.drop_index('ix_live_tracking_vehicle_id_timestamp', table_name='live_tracking', schema='public')
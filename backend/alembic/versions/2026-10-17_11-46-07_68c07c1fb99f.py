@@ -0,0 +1,47 @@
+"""Minute / hour rollups of live_tracking
+
+Revision ID: 68c07c1fb99f
+Revises: ebbab74c47d4
+Create Date: 2026-10-17 11:46:07.000000
+
+Filled by services/rollups.py (in the API lifespan, or
+`python -m services.rollups --since ...` for a backfill).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '68c07c1fb99f'
+down_revision: Union[str, Sequence[str], None] = 'ebbab74c47d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'live_tracking_rollups',
+        sa.Column('vehicle_id', sa.String(length=36), nullable=False),
+        sa.Column('resolution', sa.String(length=16), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('point_count', sa.Integer(), nullable=False),
+        sa.Column('avg_speed', sa.Float(), nullable=True),
+        sa.Column('max_speed', sa.Float(), nullable=True),
+        sa.Column('speed_samples', sa.Integer(), nullable=False),
+        sa.Column('distance_m', sa.Float(), nullable=False),
+        sa.Column('last_latitude', sa.Float(), nullable=False),
+        sa.Column('last_longitude', sa.Float(), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['vehicle_id'], ['public.vehicles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('vehicle_id', 'resolution', 'bucket'),
+        schema='public'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('live_tracking_rollups', schema='public')
@@ -0,0 +1,48 @@
+"""PostGIS geography location columns with GiST indexes
+
+Revision ID: 07437ad94b66
+Revises: 68c07c1fb99f
+Create Date: 2026-10-17 11:49:53.000000
+
+Adds a stored generated geography(Point, 4326) column derived from
+latitude/longitude to stations and live_tracking, each with a GiST index.
+Writers keep setting latitude/longitude only. On live_tracking the column is
+added on the partitioned parent and every partition is rewritten, so run this
+in a maintenance window on large installs; future partitions inherit both.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07437ad94b66'
+down_revision: Union[str, Sequence[str], None] = '68c07c1fb99f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LOCATION = (
+    'geography(Point, 4326) GENERATED ALWAYS AS '
+    '(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography) STORED'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS postgis')
+
+    op.execute(f'ALTER TABLE public.stations ADD COLUMN location {LOCATION}')
+    op.create_index('ix_stations_location', 'stations', ['location'], postgresql_using='gist', schema='public')
+
+    op.execute(f'ALTER TABLE public.live_tracking ADD COLUMN location {LOCATION}')
+    op.create_index('ix_live_tracking_location', 'live_tracking', ['location'], postgresql_using='gist', schema='public')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_live_tracking_location', table_name='live_tracking', schema='public')
+    op.execute('ALTER TABLE public.live_tracking DROP COLUMN location')
+
+    op.drop_index('ix_stations_location', table_name='stations', schema='public')
+    op.execute('ALTER TABLE public.stations DROP COLUMN location')
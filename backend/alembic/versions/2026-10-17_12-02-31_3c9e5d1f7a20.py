@@ -0,0 +1,30 @@
+"""Odometer reading at travel departure
+
+Revision ID: 3c9e5d1f7a20
+Revises: 07437ad94b66
+Create Date: 2026-10-17 12:02:31.000000
+
+travels.distance is derived from the vehicle odometer (services/odometer.py)
+minus this start reading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5d1f7a20'
+down_revision: Union[str, Sequence[str], None] = '07437ad94b66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('travels', sa.Column('start_odometer_m', sa.Float(), nullable=True), schema='public')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('travels', 'start_odometer_m', schema='public')
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Request latency at high concurrency: threadpool routes on get_db vs async routes on get_async_db.
+
+Mounts two copies of the same read endpoint (user lookup + latest travels, the
+shape of GET /travels) on an in-process ASGI app and fires a fixed number of
+requests with N clients in flight. Sync routes run in Starlette's threadpool
+(40 threads by default), async routes run on the event loop with AsyncSession.
+
+Needs a reachable DATABASE_URL with the schema migrated, plus httpx:
+  cd pi-live-core/backend && python benchmarks/async_db_latency.py --clients 500 --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+for key, value in {"APP_ENC_KEY": "bench", "JWT_SECRET_KEY": "bench", "REDIS_URL": "redis://localhost"}.items():
+    os.environ.setdefault(key, value)
+
+from auth.simple.security import get_db  # noqa: E402
+from core.dependencies import get_async_db  # noqa: E402
+from core.db import engine, async_engine  # noqa: E402
+from common.models import Travel, User  # noqa: E402
+
+app = FastAPI()
+
+
+@app.get("/sync")
+def sync_route(db: Session = Depends(get_db)):
+    db.query(User).limit(1).first()
+    travels = db.query(Travel).order_by(Travel.created_at.desc()).limit(20).all()
+    return {"count": len(travels)}
+
+
+@app.get("/async")
+async def async_route(db: AsyncSession = Depends(get_async_db)):
+    await db.scalar(select(User).limit(1))
+    travels = (await db.scalars(select(Travel).order_by(Travel.created_at.desc()).limit(20))).all()
+    return {"count": len(travels)}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(path: str, clients: int, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    response.raise_for_status()
+                except Exception:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99": percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        "max": max(latencies) * 1000 if latencies else 0.0,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="p99 latency: threadpool vs async DB routes")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.clients} concurrent clients, {args.requests} requests per mode")
+    print(f"{'mode':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for mode in ("sync", "async"):
+        await run(f"/{mode}", min(args.clients, 50), args.warmup)
+        row = await run(f"/{mode}", args.clients, args.requests)
+        print(
+            f"{mode:>6} {row['rps']:>9,.0f} {row['p50']:>9.1f} {row['p99']:>9.1f} "
+            f"{row['max']:>9.1f} {row['errors']:>7}"
+        )
+
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
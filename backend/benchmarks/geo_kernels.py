@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Vectorized geodesic kernels (core/geo.py) on N x M random points.
+
+Times one-to-many distance, bearing and radius masks (each of the N points
+against all M), the full N x M distance matrix and a blockwise nearest-point
+search, next to the scalar haversine_distance loop on a sample of rows
+(extrapolated to N). The matrix needs N * M * 8 bytes; skip it with
+--no-matrix on small machines.
+
+  cd pi-live-core/backend && python benchmarks/geo_kernels.py --n 10000 --m 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+# importing core loads settings; none of these are used here
+for key, value in {
+    "APP_ENC_KEY": "bench",
+    "JWT_SECRET_KEY": "bench",
+    "REDIS_URL": "redis://localhost",
+    "DATABASE_URL": "postgresql://localhost/bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from core.geo import (  # noqa: E402
+    bearings_from,
+    distances_from,
+    haversine_distance,
+    haversine_matrix,
+    nearest,
+    unit_vectors,
+    within_radius,
+)
+
+
+def random_points(count: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    # a metro-sized area, like stations and vehicles in one deployment
+    return rng.uniform(8.8, 9.2, count), rng.uniform(38.5, 39.0, count)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized geodesic kernels")
+    parser.add_argument("--n", type=int, default=10_000, help="query points")
+    parser.add_argument("--m", type=int, default=10_000, help="target points")
+    parser.add_argument("--radius", type=float, default=500.0, help="meters, for the radius mask")
+    parser.add_argument("--scalar-rows", type=int, default=20, help="rows timed with the scalar loop")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-matrix", action="store_true", help="skip the full N x M matrix")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    lat_a, lon_a = random_points(args.n, rng)
+    lat_b, lon_b = random_points(args.m, rng)
+    pairs = args.n * args.m
+
+    def scalar():
+        targets = list(zip(lat_b.tolist(), lon_b.tolist()))
+        for lat, lon in zip(lat_a[:args.scalar_rows].tolist(), lon_a[:args.scalar_rows].tolist()):
+            [haversine_distance(lat, lon, t_lat, t_lon) for t_lat, t_lon in targets]
+
+    vectors = unit_vectors(lat_b, lon_b)
+
+    def one_to_many():
+        for lat, lon in zip(lat_a.tolist(), lon_a.tolist()):
+            distances_from(lat, lon, vectors)
+
+    def radius_mask():
+        for lat, lon in zip(lat_a.tolist(), lon_a.tolist()):
+            within_radius(lat, lon, vectors, args.radius)
+
+    def bearings():
+        for lat, lon in zip(lat_a.tolist(), lon_a.tolist()):
+            bearings_from(lat, lon, vectors)
+
+    cases = [
+        ("scalar loop (extrapolated)", lambda: scalar(), args.n / args.scalar_rows),
+        ("one-to-many distance", one_to_many, 1.0),
+        ("radius mask", radius_mask, 1.0),
+        ("one-to-many bearing", bearings, 1.0),
+        ("nearest (blockwise)", lambda: nearest(lat_a, lon_a, lat_b, lon_b), 1.0),
+    ]
+    if not args.no_matrix:
+        out = np.empty((args.n, args.m), dtype=np.float64)
+        cases.append(("distance matrix", lambda: haversine_matrix(lat_a, lon_a, lat_b, lon_b, out=out), 1.0))
+
+    print(f"{args.n} x {args.m} points ({pairs / 1e6:.0f}M pairs), best of {args.repeat}")
+    print(f"{'kernel':<28} {'s':>9} {'ns/pair':>9}")
+    for name, fn, scale in cases:
+        seconds = timed(fn, 1 if scale != 1.0 else args.repeat) * scale
+        print(f"{name:<28} {seconds:>9.3f} {seconds / pairs * 1e9:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
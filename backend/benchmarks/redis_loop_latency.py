@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Event-loop latency under driver GPS ping load: blocking vs asyncio Redis.
+
+Replays the location write done by ConnectionManager.update_vehicle_location
+(SET vehicle:{id}:location + PUBLISH vehicle:{id}:updates) at a fixed rate and
+measures how late a 5 ms heartbeat task wakes up while the pings run.
+
+  * before: redis.Redis called from a coroutine (the old code path)
+  * after:  redis.asyncio pipeline on a shared ConnectionPool
+
+Run from backend directory against a local Redis:
+  cd pi-live-core/backend && python benchmarks/redis_loop_latency.py --rate 1000 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+import redis
+import redis.asyncio as aioredis
+
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+def location_payload() -> str:
+    return json.dumps({
+        "latitude": 9.0 + random.random() / 100,
+        "longitude": 38.7 + random.random() / 100,
+        "speed": random.uniform(0, 60),
+        "heading": random.uniform(0, 360),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append((time.perf_counter() - start - HEARTBEAT_INTERVAL) * 1000)
+
+
+async def ping_sync(r: redis.Redis, vehicle_id: str) -> None:
+    payload = location_payload()
+    r.set(f"vehicle:{vehicle_id}:location", payload, ex=60)
+    r.publish(f"vehicle:{vehicle_id}:updates", payload)
+
+
+async def ping_async(r: aioredis.Redis, vehicle_id: str) -> None:
+    payload = location_payload()
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.set(f"vehicle:{vehicle_id}:location", payload, ex=60)
+        pipe.publish(f"vehicle:{vehicle_id}:updates", payload)
+        await pipe.execute()
+
+
+async def run(mode: str, url: str, rate: int, seconds: float, vehicles: int) -> dict:
+    if mode == "sync":
+        client = redis.from_url(url, decode_responses=True)
+        ping = ping_sync
+    else:
+        pool = aioredis.ConnectionPool.from_url(url, decode_responses=True)
+        client = aioredis.Redis(connection_pool=pool)
+        ping = ping_async
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    hb = asyncio.create_task(heartbeat(lags, stop))
+
+    pending: set[asyncio.Task] = set()
+    interval = 1.0 / rate
+    sent = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+
+    while time.perf_counter() < deadline:
+        task = asyncio.create_task(ping(client, f"bench-{sent % vehicles}"))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        sent += 1
+        next_at = started + sent * interval
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+    if pending:
+        await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await hb
+
+    if mode == "sync":
+        client.close()
+    else:
+        await client.aclose()
+        await pool.disconnect()
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "pings": sent,
+        "achieved_rate": sent / elapsed,
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--rate", type=int, default=1000, help="pings per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--vehicles", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'pings':>8}{'rate/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for mode in ("sync", "async"):
+        res = asyncio.run(run(mode, args.redis_url, args.rate, args.seconds, args.vehicles))
+        print(
+            f"{res['mode']:<8}{res['pings']:>8}{res['achieved_rate']:>10.0f}"
+            f"{res['lag_p50_ms']:>10.2f}{res['lag_p99_ms']:>10.2f}{res['lag_max_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
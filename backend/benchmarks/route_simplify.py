@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Route simplification cost (tracking/simplify.py) on synthetic 1 Hz GPS traces.
+
+Generates a wandering vehicle track of N points (about 10 m/s with random
+heading drift plus GPS noise) and times simplify_indices for a few
+tolerance_m / max_points settings, reporting kept vertices and wall time.
+
+  cd pi-live-core/backend && python benchmarks/route_simplify.py --points 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+# importing the tracking package loads settings; none of these are used here
+for key, value in {
+    "APP_ENC_KEY": "bench",
+    "JWT_SECRET_KEY": "bench",
+    "REDIS_URL": "redis://localhost",
+    "DATABASE_URL": "postgresql://localhost/bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from tracking.simplify import simplify_indices  # noqa: E402
+
+CASES = [
+    (5.0, None),
+    (20.0, None),
+    (0.0, 500),
+    (10.0, 2000),
+]
+
+
+def synthetic_track(points: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    heading = np.cumsum(rng.normal(0.0, 0.05, points))
+    step_deg = 10.0 / 111_000.0
+    latitudes = 40.0 + np.cumsum(np.cos(heading) * step_deg) + rng.normal(0.0, 2e-5, points)
+    longitudes = -3.0 + np.cumsum(np.sin(heading) * step_deg) + rng.normal(0.0, 2e-5, points)
+    return latitudes, longitudes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark route simplification")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    latitudes, longitudes = synthetic_track(args.points, args.seed)
+    print(f"{args.points} points, best of {args.repeat}")
+    print(f"{'tolerance_m':>12} {'max_points':>11} {'kept':>8} {'ms':>9}")
+    for tolerance_m, max_points in CASES:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            kept = simplify_indices(latitudes, longitudes, tolerance_m, max_points)
+            best = min(best, time.perf_counter() - started)
+        print(f"{tolerance_m:>12} {str(max_points):>11} {len(kept):>8} {best * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-based plan checks for the tracking queries (tracking/queries.py).
+
+Asserts that every live_tracking scan in the latest-point, history and route
+plans goes through ix_live_tracking_vehicle_id_timestamp (or its per-partition
+copy), that no plan needs a Sort, and that the route query is an Index Only
+Scan. Exits non-zero on any regression, so it can gate CI or a deploy.
+
+Sequential and bitmap scans are disabled for the check, so small dev tables
+still show the plan shape production gets. VACUUM ANALYZE live_tracking first
+if you also want "Heap Fetches: 0" in --verbose output.
+
+Run from backend directory after migrations:
+  cd pi-live-core/backend && PYTHONPATH=src python scripts/check_tracking_plans.py [--vehicle-id ID] [--verbose]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add src to path so we can import from core, common, tracking
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from core.db import engine
+from tracking.queries import latest_point_query, history_query, route_query
+
+INDEX_MARKER = "vehicle_id_timestamp"
+SORT_NODES = {"Sort", "Incremental Sort"}
+
+
+def walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from walk(child)
+
+
+def explain(conn, statement) -> dict:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    row = conn.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON, COSTS OFF) " + str(compiled), compiled.params
+    ).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def check(name: str, plan: dict, index_only: bool) -> list[str]:
+    problems = []
+    scans = [node for node in walk(plan) if str(node.get("Relation Name", "")).startswith("live_tracking")]
+    if not scans:
+        problems.append(f"{name}: no live_tracking scan in plan")
+    for node in scans:
+        index_name = node.get("Index Name", "")
+        if INDEX_MARKER not in index_name:
+            problems.append(f"{name}: {node['Node Type']} on {node['Relation Name']} ({index_name or 'no index'})")
+        elif index_only and node["Node Type"] != "Index Only Scan":
+            problems.append(f"{name}: expected Index Only Scan on {node['Relation Name']}, got {node['Node Type']}")
+    for node in walk(plan):
+        if node["Node Type"] in SORT_NODES:
+            problems.append(f"{name}: plan contains {node['Node Type']}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Assert index plans for tracking queries")
+    parser.add_argument("--vehicle-id", help="Vehicle to plan for (default: any vehicle with tracking rows)")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=24)
+
+    with engine.connect() as conn:
+        vehicle_id = args.vehicle_id or conn.execute(
+            text("SELECT vehicle_id FROM public.live_tracking LIMIT 1")
+        ).scalar() or "00000000-0000-0000-0000-000000000000"
+
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+
+        cases = [
+            ("latest point", latest_point_query(vehicle_id), False),
+            ("history", history_query(vehicle_id, start, end, 1000), False),
+            ("route", route_query(vehicle_id, start, end), True),
+        ]
+
+        problems = []
+        for name, statement, index_only in cases:
+            plan = explain(conn, statement)
+            if args.verbose:
+                print(f"-- {name}\n{json.dumps(plan, indent=2, default=str)}")
+            problems += check(name, plan, index_only)
+        conn.rollback()
+
+    if problems:
+        print("Tracking plan regressions:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+
+    print(f"OK: {', '.join(name for name, _, _ in cases)} use {INDEX_MARKER} without sorting")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,7 +30,7 @@ async def get_access_token_data(
     
     session_id = data.get("sid")
     
-    if not uow.user_sessions.is_active(session_id):
+    if not await uow.user_sessions.is_active(session_id):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session has expired",
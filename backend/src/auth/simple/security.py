@@ -4,10 +4,13 @@ import jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import config
 from core.db import SessionLocal
+from core.dependencies import get_async_db
 from common.models import User
 from .schemas import TokenData, UserRole
 
@@ -89,12 +92,46 @@ def get_current_user(
     return user
 
 
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the current authenticated user (for async routes)"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token_data = verify_token(token, credentials_exception)
+    user = await db.scalar(select(User).where(User.email == token_data.email).limit(1))
+    if user is None:
+        raise credentials_exception
+    return user
+
+
+def has_role(user: User, allowed_roles: list[UserRole]) -> bool:
+    """Whether the user holds any of the allowed roles"""
+    user_roles = [UserRole(r) for r in user.roles if r in [role.value for role in UserRole]]
+    return any(role in allowed_roles for role in user_roles)
+
+
 def require_role(allowed_roles: list[UserRole]):
     """Dependency factory for role-based access control"""
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
         # Check if user has any of the allowed roles
-        user_roles = [UserRole(r) for r in current_user.roles if r in [role.value for role in UserRole]]
-        if not any(role in allowed_roles for role in user_roles):
+        if not has_role(current_user, allowed_roles):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        return current_user
+    return role_checker
+
+
+def require_role_async(allowed_roles: list[UserRole]):
+    """Async counterpart of require_role for routes on get_async_db"""
+    async def role_checker(current_user: User = Depends(get_current_user_async)) -> User:
+        if not has_role(current_user, allowed_roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
@@ -10,6 +10,7 @@ from .travel import Travel, TravelStatus
 from .travel_history import TravelHistory, HistoryStatus
 from .review import Review, ReviewType
 from .tracking import LiveTracking
+from .tracking_rollup import TrackingRollup
 
 
 __all__ = [
@@ -29,4 +30,5 @@ __all__ = [
     "Review",
     "ReviewType",
     "LiveTracking",
+    "TrackingRollup",
 ]
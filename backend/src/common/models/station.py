@@ -1,14 +1,18 @@
 import uuid
 from sqlalchemy import (
-    Column, String, Float, DateTime, func, Text
+    Column, String, Float, DateTime, func, Text, Computed, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from geoalchemy2 import Geography
 from core.db import Base
 
 
 class Station(Base):
     __tablename__ = "stations"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_stations_location", "location", postgresql_using="gist"),
+        {"schema": "public"},
+    )
 
     id = Column(
         String(length=36),
@@ -20,6 +24,11 @@ class Station(Base):
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     radius = Column(Float, default=100.0)  # Radius in meters to consider "at station"
+    # PostGIS point derived from latitude/longitude; deferred so plain loads skip it
+    location = deferred(Column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        Computed("ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography", persisted=True),
+    ))
     address = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,14 +1,28 @@
 import uuid
 from sqlalchemy import (
-    Column, String, ForeignKey, DateTime, Float, func
+    Column, String, ForeignKey, DateTime, Float, Index, Computed, func, text
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from geoalchemy2 import Geography
 from core.db import Base
 
 
 class LiveTracking(Base):
     __tablename__ = "live_tracking"
-    __table_args__ = {"schema": "public"}
+    # Range-partitioned on "timestamp", so the PK is (id, timestamp);
+    # partitions are managed by services/partitions.py
+    __table_args__ = (
+        # latest point / history / index-only route scans per vehicle
+        Index(
+            "ix_live_tracking_vehicle_id_timestamp",
+            "vehicle_id",
+            text('"timestamp" DESC'),
+            postgresql_include=["latitude", "longitude", "speed", "heading"],
+        ),
+        # radius / polygon searches (ST_DWithin, ST_Covers)
+        Index("ix_live_tracking_location", "location", postgresql_using="gist"),
+        {"schema": "public", "postgresql_partition_by": 'RANGE ("timestamp")'},
+    )
 
     id = Column(
         String(length=36),
@@ -16,14 +30,20 @@ class LiveTracking(Base):
         default=lambda: str(uuid.uuid4()),
         index=True,
     )
-    vehicle_id = Column(String(length=36), ForeignKey("public.vehicles.id"), nullable=False, index=True)
+    vehicle_id = Column(String(length=36), ForeignKey("public.vehicles.id"), nullable=False)
     driver_id = Column(String(length=36), ForeignKey("auth.users.id"), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     speed = Column(Float, nullable=True)  # km/h
     heading = Column(Float, nullable=True)  # degrees (0-360)
     accuracy = Column(Float, nullable=True)  # meters
-    timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    # part of the primary key: Postgres requires the partition key in it
+    timestamp = Column(DateTime(timezone=True), primary_key=True, nullable=False, index=True)
+    # PostGIS point derived from latitude/longitude; deferred so plain loads skip it
+    location = deferred(Column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        Computed("ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography", persisted=True),
+    ))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
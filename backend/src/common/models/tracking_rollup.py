@@ -0,0 +1,30 @@
+from sqlalchemy import (
+    Column, String, ForeignKey, DateTime, Float, Integer, func
+)
+from core.db import Base
+
+
+class TrackingRollup(Base):
+    """Per-vehicle live_tracking aggregate for one minute or hour bucket
+
+    Maintained by services/rollups.py.
+    """
+    __tablename__ = "live_tracking_rollups"
+    __table_args__ = {"schema": "public"}
+
+    vehicle_id = Column(
+        String(length=36),
+        ForeignKey("public.vehicles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    resolution = Column(String(length=16), primary_key=True)  # AggregateInterval value
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # UTC bucket start
+    point_count = Column(Integer, nullable=False)
+    avg_speed = Column(Float, nullable=True)  # km/h, over points that reported speed
+    max_speed = Column(Float, nullable=True)  # km/h
+    speed_samples = Column(Integer, nullable=False, default=0)
+    distance_m = Column(Float, nullable=False, default=0.0)
+    last_latitude = Column(Float, nullable=False)
+    last_longitude = Column(Float, nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
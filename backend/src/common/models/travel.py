@@ -34,6 +34,7 @@ class Travel(Base):
     scheduled_arrival = Column(DateTime(timezone=True), nullable=True)
     actual_arrival = Column(DateTime(timezone=True), nullable=True)
     distance = Column(Float, nullable=True)  # Distance in kilometers
+    start_odometer_m = Column(Float, nullable=True)  # Vehicle odometer reading at departure (meters)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,16 +1,27 @@
+import logging
 from datetime import datetime
 from typing import Dict, Any
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from sqlalchemy.orm import Session as SQLAlchemySession
 
 from core.repository import BaseRepository
 from common.models import Session as SessionModel 
 
+logger = logging.getLogger(__name__)
+
 
 # fixme: session updates cache before commit
 class SessionRepository(BaseRepository[SessionModel]):
-    def __init__(self, sql_session: SQLAlchemySession, cache: Redis):
+    def __init__(
+        self,
+        sql_session: SQLAlchemySession,
+        cache: AsyncRedis,
+        sync_cache: Redis | None = None,
+    ):
         super().__init__(sql_session, SessionModel, cache)
+        # blocking facade for revoke paths that run in threadpool routes
+        self.sync_cache = sync_cache
         self.cache_ttl = 180
 
     def create(self, user_id: int, expires_at: datetime) -> SessionModel:
@@ -22,9 +33,9 @@ class SessionRepository(BaseRepository[SessionModel]):
         self.session.flush()
         return sess
 
-    def is_active(self, session_id: str) -> bool:
+    async def is_active(self, session_id: str) -> bool:
 
-        cached = self._cache_get_bool(session_id)
+        cached = await self._cache_get_bool(session_id)
         if cached != None:
             return cached
 
@@ -40,7 +51,7 @@ class SessionRepository(BaseRepository[SessionModel]):
         )
         active = rec is not None
 
-        self._cache_set_bool(session_id, active)
+        await self._cache_set_bool(session_id, active)
         return active
 
 
@@ -89,22 +100,30 @@ class SessionRepository(BaseRepository[SessionModel]):
     def _active_key(self, session_id: str) -> str:
         return f"sess:{session_id}:active"
 
-    def _cache_get_bool(self, session_id: str) -> bool | None:
-        val = self.cache.get(self._active_key(session_id))
+    async def _cache_get_bool(self, session_id: str) -> bool | None:
+        val = await self.cache.get(self._active_key(session_id))
         
         if val is None:
             return None
         
         return val == "1"
 
-    def _cache_set_bool(self, session_id: str, value: bool) -> None:
-        self.cache.setex(
+    async def _cache_set_bool(self, session_id: str, value: bool) -> None:
+        await self.cache.setex(
             self._active_key(session_id),
             self.cache_ttl,
             "1" if value else "0"
         )
 
     def _cache_del(self, *session_ids: str) -> None:
-        if session_ids:
-            keys = [self._active_key(sid) for sid in session_ids]
-            self.cache.delete(*keys)
\ No newline at end of file
+        if not session_ids:
+            return
+        if self.sync_cache is None:
+            # cached "active" flags expire on their own after cache_ttl
+            logger.warning(
+                "No sync cache on SessionRepository; %d revoked sessions stay cached up to %ds",
+                len(session_ids), self.cache_ttl,
+            )
+            return
+        keys = [self._active_key(sid) for sid in session_ids]
+        self.sync_cache.delete(*keys)
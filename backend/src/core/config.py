@@ -33,6 +33,8 @@ class Config(BaseSettings):
 
     # DB
     DATABASE_URL: str
+    ASYNC_DB_POOL_SIZE: int    = 20  # async routes are no longer capped by the threadpool
+    ASYNC_DB_MAX_OVERFLOW: int = 20
 
     # JWT / Tokens
     JWT_SECRET_KEY: str
@@ -45,6 +47,91 @@ class Config(BaseSettings):
     # Redis
     REDIS_URL: str
 
+    # Live tracking ingest (write-behind batching of driver pings)
+    TRACKING_INGEST_BATCH_SIZE: int       = 1000
+    TRACKING_INGEST_FLUSH_INTERVAL: float = 0.5    # seconds
+    TRACKING_INGEST_MAX_PENDING: int      = 50000  # queued points before producers block
+    TRACKING_INGEST_POOL_SIZE: int        = 4
+    # Client timestamps outside [now - BEHIND, now + AHEAD] are not trusted: a
+    # skewed clock would write rows past the premade partitions (into the default one)
+    TRACKING_MAX_CLOCK_BEHIND: float = 86400.0  # seconds
+    TRACKING_MAX_CLOCK_AHEAD: float  = 300.0    # seconds
+
+    # Tracking export (GET /tracking/export streams rows in batches of this size)
+    TRACKING_EXPORT_BATCH_SIZE: int = 5000
+
+    # Tracking rollups: per-vehicle minute/hour aggregates (see services/rollups.py)
+    TRACKING_ROLLUP_REFRESH_INTERVAL: float = 30.0   # seconds between refreshes
+    TRACKING_ROLLUP_LOOKBACK: float         = 300.0  # seconds recomputed each refresh (late pings)
+    TRACKING_ROLLUP_MAX_GAP: float          = 300.0  # seconds; longer gaps add no distance
+    TRACKING_ROLLUP_BACKFILL_HOURS: int     = 24     # first refresh with empty rollups
+    TRACKING_ROLLUP_MINUTE_RETENTION_DAYS: int = 30  # hour rollups are kept
+    TRACKING_HISTORY_RAW_MAX_HOURS: float   = 24.0   # auto resolution: raw up to this span,
+    TRACKING_HISTORY_MINUTE_MAX_DAYS: float = 7.0    # minute rollups up to this, hour beyond
+
+    # live_tracking range partitions on "timestamp" (see services/partitions.py)
+    LIVE_TRACKING_PARTITION_INTERVAL: Literal["day", "week", "month"] = "day"
+    LIVE_TRACKING_PARTITION_PREMAKE: int   = 7       # future partitions kept ready
+    LIVE_TRACKING_RETENTION_DAYS: int      = 90      # 0 keeps every partition
+    LIVE_TRACKING_RETENTION_ACTION: Literal["drop", "detach"] = "drop"
+    LIVE_TRACKING_PARTITION_CHECK_INTERVAL: float = 3600.0  # seconds between maintenance runs
+
+    # Kafka ingest: sockets and POST /tracking produce, `python -m services.tracking_consumer` writes
+    TRACKING_INGEST_MODE: Literal["direct", "kafka"] = "direct"
+    KAFKA_BOOTSTRAP_SERVERS: str   = "localhost:9092"  # "memory://" = in-process stand-in broker
+    KAFKA_TRACKING_TOPIC: str      = "tracking.locations"
+    KAFKA_CONSUMER_GROUP: str      = "tracking-writer"
+    KAFKA_CONSUMER_BATCH_SIZE: int = 1000
+
+    # WebSocket fan-out
+    WS_SEND_QUEUE_SIZE: int       = 32     # pending frames per viewer before dropping old ones
+    WS_SLOW_CLIENT_TIMEOUT: float = 10.0   # seconds a viewer may stay behind before eviction
+    WS_FLEET_BATCH_INTERVAL: float = 0.25  # seconds between batched /ws/fleet frames
+    WS_FLEET_MAX_VEHICLES: int     = 5000  # explicit vehicle subscriptions per /ws/fleet socket
+
+    # Multi-worker WebSocket cluster (heartbeats + connection counts in Redis)
+    WS_CLUSTER_ENABLED: bool            = False
+    WS_WORKER_HEARTBEAT_INTERVAL: float = 5.0   # seconds
+    WS_WORKER_TTL: float                = 15.0  # seconds without a heartbeat before a worker is dropped
+
+    # In-process vehicle cache (ping-path validation)
+    VEHICLE_CACHE_TTL: float   = 300.0  # seconds
+    VEHICLE_CACHE_MAX_SIZE: int = 10000
+
+    # In-process station grid index (at-station checks)
+    STATION_INDEX_CELL_M: float = 500.0  # grid cell edge in meters
+
+    # Geofence stage on driver pings: arrived/departed events (see services/geofence.py)
+    GEOFENCE_ENABLED: bool        = True
+    GEOFENCE_EXIT_MARGIN_M: float = 25.0  # meters past the radius before a departure
+    GEOFENCE_QUEUE_SIZE: int      = 1000  # undelivered events per /ws/geofence client
+
+    # Per-vehicle odometer on driver pings; travels.distance from its readings (see services/odometer.py)
+    ODOMETER_MAX_ACCURACY_M: float = 50.0   # ignore fixes reported less accurate than this
+    ODOMETER_MIN_STEP_M: float     = 5.0    # movement below this (or the fix accuracy) is jitter
+    ODOMETER_MAX_SPEED_KMH: float  = 200.0  # steps implying more are GPS jumps
+    ODOMETER_MAX_REJECTS: int      = 5      # consecutive jumps before re-anchoring on the new position
+    ODOMETER_FLUSH_INTERVAL: float = 30.0   # seconds between in-progress travels.distance updates
+
+    # Travel ETAs, cached per vehicle and refreshed from driver pings (see services/eta.py)
+    ETA_RECOMPUTE_DISTANCE_M: float = 200.0  # movement that triggers a new estimate
+    ETA_RECOMPUTE_INTERVAL: float   = 120.0  # seconds before re-estimating a vehicle that hasn't moved
+    ETA_CACHE_TTL: int              = 600    # seconds
+    ETA_MAX_CONCURRENCY: int        = 8      # estimates computed at once per worker
+    ETA_SPEED_WINDOW: float         = 600.0  # seconds of recent points behind the smoothed speed
+    ETA_SPEED_HALF_LIFE: float      = 120.0  # seconds; a point this old weighs half as much
+    ETA_HISTORY_TRIPS: int          = 50     # most recent completed trips per origin/destination
+    ETA_HISTORY_TTL: float          = 600.0  # seconds origin/destination stats stay cached
+    ETA_LIVE_WEIGHT: float          = 0.5    # live vs historical speed when both are known
+    ETA_ROUTE_FACTOR: float         = 1.3    # road / straight-line distance without history
+    ETA_DEFAULT_SPEED_KMH: float    = 30.0
+    ETA_MIN_SPEED_KMH: float        = 5.0
+
+    # Automatic travel start/complete from geofence events (see services/travel_lifecycle.py)
+    TRAVEL_LIFECYCLE_ENABLED: bool          = True
+    TRAVEL_LIFECYCLE_FLUSH_INTERVAL: float  = 1.0  # seconds events wait to share a transaction
+    TRAVEL_LIFECYCLE_BATCH_SIZE: int        = 500
+
     model_config = {
         "env_file": ".env",
         "extra": "allow"
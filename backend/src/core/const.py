@@ -3,10 +3,15 @@ from datetime import timedelta
 
 
 class AggregateInterval(str, Enum):
+    MINUTE = "minute"
     HOUR  = "hour"
     DAY   = "day"
     MONTH = "month"
 
+class GeofenceEvent(str, Enum):
+    ARRIVED  = "arrived"
+    DEPARTED = "departed"
+
 class AggregateWindow(str, Enum):
     LAST_24_HOURS  = "last_24_hours"
     LAST_7_DAYS    = "last_7_days"
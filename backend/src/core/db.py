@@ -49,6 +49,8 @@ def to_async_url(url: str) -> str:
 async_engine = create_async_engine(
     to_async_url(config.DATABASE_URL),
     pool_pre_ping=True,
+    pool_size=config.ASYNC_DB_POOL_SIZE,
+    max_overflow=config.ASYNC_DB_MAX_OVERFLOW,
     future=True,
 )
 
@@ -103,3 +105,28 @@ async def ping_listen_connection() -> bool:
         return True
     except Exception:
         return False
+
+
+# -- asyncpg pool (bulk writes) --
+
+pg_pool: asyncpg.Pool | None = None
+
+async def open_pg_pool(dsn: str | None = None, max_size: int = 4) -> asyncpg.Pool:
+    global pg_pool
+
+    if pg_pool is not None:
+        return pg_pool
+
+    pg_dsn = to_asyncpg_dsn(dsn or config.DATABASE_URL)
+    pg_pool = await asyncpg.create_pool(pg_dsn, min_size=1, max_size=max_size)
+
+    return pg_pool
+
+async def close_pg_pool() -> None:
+    global pg_pool
+
+    if pg_pool is not None:
+        try:
+            await pg_pool.close()
+        finally:
+            pg_pool = None
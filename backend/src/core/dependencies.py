@@ -1,19 +1,36 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Request
 import redis
+import redis.asyncio as aioredis
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.db import SessionLocal
+from core.db import SessionLocal, AsyncSessionLocal
 from core.uow import UnitOfWork
 
 
-def get_redis(request: Request) -> redis.Redis:
-    """Get Redis client from app state (for api_v1 routes, use api_v1.state.redis)."""
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async database dependency; lets routes run on the event loop instead of the threadpool"""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def get_redis(request: Request) -> aioredis.Redis:
+    """Get asyncio Redis client from app state (for api_v1 routes, use api_v1.state.redis)."""
     return request.app.state.redis
 
 
+def get_sync_redis(request: Request) -> redis.Redis:
+    """Get blocking Redis client; only for code running in threadpool routes."""
+    return request.app.state.redis_sync
+
+
 def get_uow(request: Request) -> Generator[UnitOfWork, None, None]:
     session = SessionLocal()
-    uow = UnitOfWork(session, cache=request.app.state.redis)
+    uow = UnitOfWork(
+        session,
+        cache=request.app.state.redis,
+        sync_cache=request.app.state.redis_sync,
+    )
     try:
         yield uow
     finally:
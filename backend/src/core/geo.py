@@ -0,0 +1,179 @@
+import math
+
+import numpy as np
+from sqlalchemy import cast, func
+from geoalchemy2 import Geography
+
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two WGS84 coordinates, in meters"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+
+    a = math.sin(delta_phi / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * \
+        math.sin(delta_lambda / 2) ** 2
+
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def heading_difference(h1: float, h2: float) -> float:
+    """Smallest absolute angle between two headings, in degrees [0, 180]"""
+    d = abs(h1 - h2) % 360
+    return 360 - d if d > 180 else d
+
+
+def geography_point(latitude: float, longitude: float):
+    """SQL expression for a WGS84 geography point (matches the generated location columns)"""
+    return cast(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326), Geography(srid=4326))
+
+
+# -- vectorized kernels --
+#
+# Points are turned into unit vectors once and distances come from the chord
+# between them: hav(d / R) = chord^2 / 4, so results match haversine_distance
+# while the n x m work is subtractions and squares. Radius tests compare
+# squared chords and never call a trig function per pair. Inputs are any
+# array-likes of degrees; they are converted to contiguous float64.
+
+
+def as_float64(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def unit_vectors(latitudes, longitudes) -> np.ndarray:
+    """(3, n) array of x, y, z unit vectors for WGS84 coordinates"""
+    phi = np.radians(as_float64(latitudes))
+    lam = np.radians(as_float64(longitudes))
+    cos_phi = np.cos(phi)
+    return np.stack((cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)))
+
+
+def chord_sq_to_meters(chord_sq: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Great-circle meters from squared unit chords (in place when out is chord_sq)"""
+    out = np.sqrt(chord_sq, out=out)
+    out *= 0.5
+    np.minimum(out, 1.0, out=out)
+    np.arcsin(out, out=out)
+    out *= 2 * EARTH_RADIUS_M
+    return out
+
+
+def radius_to_chord_sq(radius_m) -> np.ndarray:
+    """Squared unit chord of a great-circle distance (scalar or array of meters)"""
+    return (2 * np.sin(as_float64(radius_m) / (2 * EARTH_RADIUS_M))) ** 2
+
+
+def _chord_sq_from(latitude: float, longitude: float, vectors: np.ndarray) -> np.ndarray:
+    phi = math.radians(latitude)
+    lam = math.radians(longitude)
+    cos_phi = math.cos(phi)
+    chord_sq = np.square(vectors[0] - cos_phi * math.cos(lam))
+    chord_sq += np.square(vectors[1] - cos_phi * math.sin(lam))
+    chord_sq += np.square(vectors[2] - math.sin(phi))
+    return chord_sq
+
+
+def distances_from(latitude: float, longitude: float, vectors: np.ndarray) -> np.ndarray:
+    """Meters from one point to every unit vector in a precomputed (3, n) array"""
+    chord_sq = _chord_sq_from(latitude, longitude, vectors)
+    return chord_sq_to_meters(chord_sq, out=chord_sq)
+
+
+def haversine_many(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Meters from one point to each of n points (one-to-many)"""
+    return distances_from(latitude, longitude, unit_vectors(latitudes, longitudes))
+
+
+def within_radius(latitude: float, longitude: float, vectors: np.ndarray, radius_m) -> np.ndarray:
+    """Boolean mask of precomputed unit vectors within radius_m (scalar or per-point) of a point"""
+    return _chord_sq_from(latitude, longitude, vectors) <= radius_to_chord_sq(radius_m)
+
+
+def _chord_sq_block(a: np.ndarray, b: np.ndarray, out: np.ndarray, scratch: np.ndarray) -> np.ndarray:
+    """Squared chords between every column of a (3, k) and of b (3, m), into out (k, m)"""
+    np.subtract(a[0][:, None], b[0], out=out)
+    np.square(out, out=out)
+    for axis in (1, 2):
+        np.subtract(a[axis][:, None], b[axis], out=scratch)
+        np.square(scratch, out=scratch)
+        out += scratch
+    return out
+
+
+def haversine_matrix(
+    latitudes_a,
+    longitudes_a,
+    latitudes_b,
+    longitudes_b,
+    out: np.ndarray | None = None,
+    block_rows: int = 256,
+) -> np.ndarray:
+    """(n, m) meters between every pair of points (many-to-many)
+
+    Needs n * m * 8 bytes for the result; computed in row blocks so the only
+    other memory is one block of scratch.
+    """
+    a = unit_vectors(latitudes_a, longitudes_a)
+    b = unit_vectors(latitudes_b, longitudes_b)
+    n, m = a.shape[1], b.shape[1]
+    if out is None:
+        out = np.empty((n, m), dtype=np.float64)
+    scratch = np.empty((min(block_rows, n), m), dtype=np.float64)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        block = out[start:stop]
+        _chord_sq_block(a[:, start:stop], b, block, scratch[:stop - start])
+        chord_sq_to_meters(block, out=block)
+    return out
+
+
+def nearest(
+    latitudes_a,
+    longitudes_a,
+    latitudes_b,
+    longitudes_b,
+    block_rows: int = 256,
+) -> tuple[np.ndarray, np.ndarray]:
+    """For each point in a, index of and meters to the nearest point in b
+
+    Never materializes the n x m matrix; only the winners are converted to meters.
+    """
+    a = unit_vectors(latitudes_a, longitudes_a)
+    b = unit_vectors(latitudes_b, longitudes_b)
+    n, m = a.shape[1], b.shape[1]
+    index = np.empty(n, dtype=np.intp)
+    chord_sq = np.empty(n, dtype=np.float64)
+    block = np.empty((min(block_rows, n), m), dtype=np.float64)
+    scratch = np.empty_like(block)
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        rows = _chord_sq_block(a[:, start:stop], b, block[:stop - start], scratch[:stop - start])
+        best = rows.argmin(axis=1)
+        index[start:stop] = best
+        chord_sq[start:stop] = rows[np.arange(stop - start), best]
+    return index, chord_sq_to_meters(chord_sq, out=chord_sq)
+
+
+def bearings_from(latitude: float, longitude: float, vectors: np.ndarray) -> np.ndarray:
+    """Initial great-circle bearing in degrees [0, 360) from one point to every precomputed unit vector"""
+    phi1 = math.radians(latitude)
+    lam1 = math.radians(longitude)
+    sin_lam1, cos_lam1 = math.sin(lam1), math.cos(lam1)
+    x2, y2, z2 = vectors
+    # sin(dlon) * cos(lat2) and cos(lat1) * sin(lat2) - sin(lat1) * cos(lat2) * cos(dlon)
+    east = y2 * cos_lam1 - x2 * sin_lam1
+    north = math.cos(phi1) * z2 - math.sin(phi1) * (x2 * cos_lam1 + y2 * sin_lam1)
+    bearing = np.degrees(np.arctan2(east, north, out=east), out=east)
+    bearing %= 360.0
+    return bearing
+
+
+def bearing_many(latitude: float, longitude: float, latitudes, longitudes) -> np.ndarray:
+    """Initial great-circle bearing in degrees [0, 360) from one point to each of n points"""
+    return bearings_from(latitude, longitude, unit_vectors(latitudes, longitudes))
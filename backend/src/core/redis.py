@@ -1,7 +1,10 @@
 import redis
+import redis.asyncio as aioredis
 from core.config import config
 
 
+# -- sync facade (threadpool routes only) --
+
 def create_redis() -> redis.Redis:
     return redis.from_url(
         config.REDIS_URL,
@@ -12,4 +15,23 @@ def create_redis() -> redis.Redis:
     )
 
 def close_redis(r: redis.Redis) -> None:
-    r.close()
\ No newline at end of file
+    r.close()
+
+
+# -- asyncio client (event loop) --
+
+def create_redis_pool() -> aioredis.ConnectionPool:
+    return aioredis.ConnectionPool.from_url(
+        config.REDIS_URL,
+        decode_responses=True,
+        health_check_interval=30,
+        socket_timeout=5,
+        retry_on_timeout=True,
+    )
+
+def create_async_redis(pool: aioredis.ConnectionPool) -> aioredis.Redis:
+    return aioredis.Redis(connection_pool=pool)
+
+async def close_async_redis(r: aioredis.Redis, pool: aioredis.ConnectionPool) -> None:
+    await r.aclose()
+    await pool.disconnect()
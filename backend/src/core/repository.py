@@ -1,15 +1,17 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from datetime import datetime
 from typing import Generic, Type, TypeVar, List, Any, Tuple, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from core.const import AggregateInterval, AggregateWindow
 
 Model = TypeVar("Model")
 
 
 class BaseRepository(Generic[Model]):
-    def __init__(self, session: Session, model: Type[Model], cache: Redis | None = None):
+    def __init__(self, session: Session, model: Type[Model], cache: AsyncRedis | Redis | None = None):
         self.session = session
         self.cache = cache
         self.model = model
@@ -200,3 +202,177 @@ class BaseRepository(Generic[Model]):
 
         rows = query.all()
         return [(r.bucket, r.total or 0) for r in rows]
+
+
+class AsyncBaseRepository(Generic[Model]):
+    """BaseRepository for AsyncSession; runs on the event loop instead of the threadpool"""
+
+    def __init__(self, session: AsyncSession, model: Type[Model], cache: AsyncRedis | None = None):
+        self.session = session
+        self.cache = cache
+        self.model = model
+
+    async def get(self, id: Any) -> Model | None:
+        return await self.session.get(self.model, id)
+
+    async def get_by(self, **filters: Any) -> Model | None:
+        query = select(self.model).filter_by(**filters).limit(1)
+        return (await self.session.execute(query)).scalars().first()
+
+    async def filter(
+        self,
+        *conditions: Any,
+        filters: dict[str, Any] | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Any | None = None,
+        with_total: bool = True
+    ) -> Tuple[List[Model], int, int]:
+
+        query = select(self.model)
+
+        if filters:
+            query = query.filter_by(**filters)
+        if conditions:
+            query = query.where(*conditions)
+
+        skip = max(0, skip)
+        limit = max(0, limit)
+
+        # list endpoints that never show totals can skip the COUNT(*) round trip
+        total_items = total_pages = 0
+        if with_total:
+            total_items = await self.session.scalar(
+                select(func.count()).select_from(query.order_by(None).subquery())
+            )
+            total_pages = (total_items + limit - 1) // limit if limit else 1
+
+        if order_by is not None:
+            query = query.order_by(order_by)
+
+        items = (await self.session.execute(query.offset(skip).limit(limit))).scalars().all()
+
+        return list(items), total_items, total_pages
+
+    async def list(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Any | None = None
+    ) -> Tuple[List[Model], int, int]:
+
+        return await self.filter(skip=skip, limit=limit, order_by=order_by)
+
+    def add(self, obj: Model) -> Model:
+        self.session.add(obj)
+        return obj
+
+    async def delete(self, obj: Model) -> None:
+        await self.session.delete(obj)
+
+    # -- aggregate functions --
+
+    async def aggregate_count(
+        self,
+        ts_column: Any,
+        *conditions: Any,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        window: AggregateWindow | None = None,
+        interval: AggregateInterval = AggregateInterval.DAY,
+        filters: dict[str, Any] | None = None,
+        join_model: Any | None = None,
+        join_condition: Any | None = None,
+        join_filter: Any | None = None,
+        limit: int | None = None,
+    ) -> List[Tuple[Any, int]]:
+
+        if end is None:
+            end = datetime.utcnow()
+
+        delta = window.delta if window is not None else None
+        if start is None and delta is not None:
+            start = end - delta
+
+        bucket = func.date_trunc(interval.value, ts_column)
+
+        query = select(
+            bucket.label("bucket"),
+            func.count().label("count"),
+        ).select_from(self.model)
+
+        if join_model is not None and join_condition is not None:
+            query = query.join(join_model, join_condition)
+        if filters:
+            query = query.filter_by(**filters)
+        if join_filter is not None:
+            query = query.where(join_filter)
+        if conditions:
+            query = query.where(*conditions)
+        if start is not None:
+            query = query.where(ts_column >= start)
+        if end is not None:
+            query = query.where(ts_column < end)
+
+        query = query.group_by(bucket).order_by(bucket.asc())
+
+        if limit is not None:
+            query = query.limit(max(0, limit))
+
+        rows = (await self.session.execute(query)).all()
+        return [(r.bucket, r.count) for r in rows]
+
+    async def aggregate_sum(
+        self,
+        ts_column: Any,
+        sum_column: Any,
+        *conditions: Any,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        window: AggregateWindow | None = None,
+        interval: AggregateInterval = AggregateInterval.DAY,
+        filters: dict[str, Any] | None = None,
+        joins: Optional[List[Tuple[Any, Any, Any]]] = None,
+        join_filter: Any | None = None,
+        limit: int | None = None,
+    ) -> List[Tuple[Any, float]]:
+
+        if end is None:
+            end = datetime.utcnow()
+
+        delta = window.delta if window is not None else None
+        if start is None and delta is not None:
+            start = end - delta
+
+        bucket = func.date_trunc(interval.value, ts_column)
+
+        query = select(
+            bucket.label("bucket"),
+            func.sum(sum_column).label("total"),
+        ).select_from(self.model)
+
+        if joins:
+            for join_model, join_condition, join_filter in joins:
+                query = query.join(join_model, join_condition)
+                if join_filter is not None:
+                    query = query.where(join_filter)
+
+        if filters:
+            query = query.filter_by(**filters)
+
+        if conditions:
+            query = query.where(*conditions)
+
+        if start is not None:
+            query = query.where(ts_column >= start)
+        if end is not None:
+            query = query.where(ts_column < end)
+
+        query = query.group_by(bucket).order_by(bucket.asc())
+
+        if limit is not None:
+            query = query.limit(max(0, limit))
+
+        rows = (await self.session.execute(query)).all()
+        return [(r.bucket, r.total or 0) for r in rows]
@@ -1,6 +1,7 @@
 from contextlib import AbstractContextManager
 from sqlalchemy.orm import Session
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 from common.repositories import (
     UserRepository,
@@ -13,13 +14,19 @@ from common.repositories import (
 
 
 class UnitOfWork(AbstractContextManager):
-    def __init__(self, session: Session, cache: Redis | None = None):
+    def __init__(
+        self,
+        session: Session,
+        cache: AsyncRedis | None = None,
+        sync_cache: Redis | None = None,
+    ):
         self.session = session
         self.cache = cache
+        self.sync_cache = sync_cache
 
         # -- repositories --
         self.users = UserRepository(session)
-        self.user_sessions = SessionRepository(session, cache)
+        self.user_sessions = SessionRepository(session, cache, sync_cache)
         self.staff = StaffRepository(session)
         self.profile = ProfileRepository(session)
         self.driver = DriverRepository(session)
@@ -5,7 +5,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import config
-from core.redis import create_redis, close_redis
+from core.redis import (
+    create_redis,
+    close_redis,
+    create_redis_pool,
+    create_async_redis,
+    close_async_redis,
+)
+from core.db import open_pg_pool, close_pg_pool
 from core.rate_limiter import limiter as rate_limiter
 
 from auth import router as auth_router
@@ -62,19 +69,103 @@ api_v1.include_router(reviews_router)
 async def lifespan(app: FastAPI):
     
     # -- redis --
-    r = create_redis()
+    pool = create_redis_pool()
+    r = create_async_redis(pool)
     app.state.redis = r
     api_v1.state.redis = r
 
+    # blocking facade for code that runs in threadpool routes
+    r_sync = create_redis()
+    app.state.redis_sync = r_sync
+    api_v1.state.redis_sync = r_sync
+
     # WebSocket manager needs redis for pub/sub
     from services.websocket_manager import manager
     manager.set_redis(r)
 
+    # -- vehicle cache (invalidated by vehicles router via pub/sub) --
+    from services.vehicle_cache import vehicle_cache
+    await vehicle_cache.start(r)
+
+    # -- station grid index (invalidated by stations router via pub/sub) --
+    from services.station_index import station_index
+    await station_index.start(r)
+
+    # -- geofence events (arrived/departed, relayed to /ws/geofence) --
+    from services.geofence import geofence
+    geofence.start(r)
+
+    # -- travel ETAs (re-estimated from driver pings, pushed to /ws/track) --
+    from services.eta import eta_service
+    eta_service.start(r)
+
+    # -- automatic travel start/complete from this worker's geofence events --
+    from services.travel_lifecycle import travel_lifecycle
+    if config.TRAVEL_LIFECYCLE_ENABLED:
+        travel_lifecycle.start()
+
+    # -- multi-worker cluster registry (heartbeats + connection counts) --
+    from services.cluster import registry
+    if config.WS_CLUSTER_ENABLED:
+        registry.start(r, manager.stats)
+
+    # -- live tracking ingest --
+    from services.tracking_ingest import ingestor
+    pg = await open_pg_pool(max_size=config.TRACKING_INGEST_POOL_SIZE)
+    ingestor.start(pg)
+
+    # -- live_tracking partitions (pre-create ahead, expire by retention) --
+    from services.partitions import partition_manager
+    partition_manager.start(pg)
+
+    # -- minute/hour tracking rollups (recent buckets recomputed periodically) --
+    from services.rollups import rollup_manager
+    rollup_manager.start(pg)
+
+    # -- in-progress travels.distance from vehicle odometers --
+    from services.odometer import odometer
+    odometer.start(r, pg)
+
+    # -- kafka ingest mode: sockets and POST /tracking produce instead --
+    from services.tracking_kafka import producer, create_consumer, MEMORY_BROKER
+    from services.tracking_consumer import TrackingConsumer
+    consumer_stop = asyncio.Event()
+    consumer_task = None
+    if config.TRACKING_INGEST_MODE == "kafka":
+        producer.start()
+        if config.KAFKA_BOOTSTRAP_SERVERS == MEMORY_BROKER:
+            # a separate consumer process can't reach the in-process broker
+            consumer = TrackingConsumer(create_consumer(), ingestor, r)
+            consumer_task = asyncio.create_task(consumer.run(consumer_stop))
+
     try:
         yield
     finally:
+        # -- websocket manager --
+        await registry.stop()
+        await manager.close()
+        await vehicle_cache.stop()
+        await station_index.stop()
+        await travel_lifecycle.stop()
+        await eta_service.stop()
+        await geofence.stop()
+
+        # -- kafka ingest --
+        await producer.stop()
+        if consumer_task is not None:
+            consumer_stop.set()
+            await consumer_task
+
+        # -- live tracking ingest (flush buffered points first) --
+        await odometer.stop()
+        await rollup_manager.stop()
+        await partition_manager.stop()
+        await ingestor.stop()
+        await close_pg_pool()
+
         # -- redis --
-        close_redis(r)
+        await close_async_redis(r, pool)
+        close_redis(r_sync)
 
 # -- init app --
 app = FastAPI(
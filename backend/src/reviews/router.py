@@ -1,25 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Optional
 
-from auth.simple.security import get_current_user, require_role, get_db
+from auth.simple.security import get_current_user_async, require_role_async
 from auth.simple.schemas import UserRole
 from common.models import Review, User, Travel
+from core.dependencies import get_async_db
+from core.repository import AsyncBaseRepository
 from .schemas import ReviewCreate, ReviewUpdate, ReviewResponse, DriverStatsResponse
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 
 @router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
-def create_review(
+async def create_review(
     review_data: ReviewCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Create a new review"""
     # Validate driver exists
-    driver = db.query(User).filter(User.id == review_data.driver_id).first()
+    driver = await AsyncBaseRepository(db, User).get(review_data.driver_id)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -34,7 +36,7 @@ def create_review(
     
     # Validate travel exists if provided
     if review_data.travel_id:
-        travel = db.query(Travel).filter(Travel.id == review_data.travel_id).first()
+        travel = await AsyncBaseRepository(db, Travel).get(review_data.travel_id)
         if not travel:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -42,10 +44,10 @@ def create_review(
             )
         
         # Check if user already reviewed this travel
-        existing = db.query(Review).filter(
-            Review.travel_id == review_data.travel_id,
-            Review.reviewer_id == current_user.id
-        ).first()
+        existing = await AsyncBaseRepository(db, Review).get_by(
+            travel_id=review_data.travel_id,
+            reviewer_id=current_user.id
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,46 +59,52 @@ def create_review(
         reviewer_id=current_user.id
     )
     db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
+    await db.commit()
+    await db.refresh(new_review)
     
     return new_review
 
 
 @router.get("", response_model=List[ReviewResponse])
-def list_reviews(
+async def list_reviews(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     driver_id: Optional[str] = None,
     travel_id: Optional[str] = None,
     rating: Optional[int] = Query(None, ge=1, le=5),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """List reviews with optional filters"""
-    query = db.query(Review)
+    conditions = []
     
     if driver_id:
-        query = query.filter(Review.driver_id == driver_id)
+        conditions.append(Review.driver_id == driver_id)
     
     if travel_id:
-        query = query.filter(Review.travel_id == travel_id)
+        conditions.append(Review.travel_id == travel_id)
     
     if rating:
-        query = query.filter(Review.rating == rating)
-    
-    reviews = query.order_by(Review.created_at.desc()).offset(skip).limit(limit).all()
+        conditions.append(Review.rating == rating)
+    
+    reviews, _, _ = await AsyncBaseRepository(db, Review).filter(
+        *conditions,
+        skip=skip,
+        limit=limit,
+        order_by=Review.created_at.desc(),
+        with_total=False
+    )
     return reviews
 
 
 @router.get("/{review_id}", response_model=ReviewResponse)
-def get_review(
+async def get_review(
     review_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get a specific review"""
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await AsyncBaseRepository(db, Review).get(review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,13 +114,13 @@ def get_review(
 
 
 @router.get("/driver/{driver_id}/stats", response_model=DriverStatsResponse)
-def get_driver_stats(
+async def get_driver_stats(
     driver_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get driver rating statistics"""
-    driver = db.query(User).filter(User.id == driver_id).first()
+    driver = await AsyncBaseRepository(db, User).get(driver_id)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,16 +128,20 @@ def get_driver_stats(
         )
     
     # Get average rating and total count
-    stats = db.query(
-        func.avg(Review.rating).label('avg_rating'),
-        func.count(Review.id).label('total_reviews')
-    ).filter(Review.driver_id == driver_id).first()
+    stats = (await db.execute(
+        select(
+            func.avg(Review.rating).label('avg_rating'),
+            func.count(Review.id).label('total_reviews')
+        ).where(Review.driver_id == driver_id)
+    )).first()
     
     # Get rating breakdown
-    breakdown = db.query(
-        Review.rating,
-        func.count(Review.id).label('count')
-    ).filter(Review.driver_id == driver_id).group_by(Review.rating).all()
+    breakdown = (await db.execute(
+        select(
+            Review.rating,
+            func.count(Review.id).label('count')
+        ).where(Review.driver_id == driver_id).group_by(Review.rating)
+    )).all()
     
     rating_breakdown = {rating: count for rating, count in breakdown}
     
@@ -142,14 +154,14 @@ def get_driver_stats(
 
 
 @router.put("/{review_id}", response_model=ReviewResponse)
-def update_review(
+async def update_review(
     review_id: str,
     review_data: ReviewUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Update a review (only by the reviewer)"""
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await AsyncBaseRepository(db, Review).get(review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,27 +178,27 @@ def update_review(
     for field, value in review_data.model_dump(exclude_unset=True).items():
         setattr(review, field, value)
     
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
     
     return review
 
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_review(
+async def delete_review(
     review_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async([UserRole.ADMIN]))
 ):
     """Delete a review (Admin only)"""
-    review = db.query(Review).filter(Review.id == review_id).first()
+    review = await AsyncBaseRepository(db, Review).get(review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Review not found"
         )
     
-    db.delete(review)
-    db.commit()
+    await db.delete(review)
+    await db.commit()
     
     return None
@@ -1,3 +1,25 @@
 from .websocket_manager import manager
+from .tracking_ingest import ingestor
+from .vehicle_cache import vehicle_cache
+from .cluster import registry
+from .partitions import partition_manager
+from .rollups import rollup_manager
+from .station_index import station_index
+from .geofence import geofence
+from .travel_lifecycle import travel_lifecycle
+from .odometer import odometer
+from .eta import eta_service
 
-__all__ = ["manager"]
+__all__ = [
+    "manager",
+    "ingestor",
+    "vehicle_cache",
+    "registry",
+    "partition_manager",
+    "rollup_manager",
+    "station_index",
+    "geofence",
+    "travel_lifecycle",
+    "odometer",
+    "eta_service",
+]
@@ -0,0 +1,121 @@
+import os
+import time
+import socket
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+# worker_id -> unix time of its last heartbeat
+WORKERS_KEY = "ws:workers"
+# per-worker stats hash, expires if the worker stops heartbeating
+WORKER_KEY_PREFIX = "ws:worker:"
+
+
+def worker_key(worker_id: str) -> str:
+    return f"{WORKER_KEY_PREFIX}{worker_id}"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkerRegistry:
+    """Heartbeats this worker's WebSocket stats into Redis so every worker can see the cluster"""
+
+    def __init__(
+        self,
+        worker_id: str | None = None,
+        interval: float = config.WS_WORKER_HEARTBEAT_INTERVAL,
+        ttl: float = config.WS_WORKER_TTL,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.interval = interval
+        self.ttl = max(ttl, interval * 2)
+        self.started_at = time.time()
+        self._redis: Any = None
+        self._stats: Callable[[], Dict[str, int]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, redis_client, stats: Callable[[], Dict[str, int]]) -> None:
+        """Start heartbeating (called from main.py lifespan when WS_CLUSTER_ENABLED)"""
+        self._redis = redis_client
+        self._stats = stats
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop heartbeating and deregister so peers don't wait for the TTL"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.delete(worker_key(self.worker_id))
+                pipe.zrem(WORKERS_KEY, self.worker_id)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Failed to deregister worker %s", self.worker_id, exc_info=True)
+
+    async def heartbeat(self) -> None:
+        """Publish current stats and prune workers that missed their TTL"""
+        now = time.time()
+        fields = {
+            "worker_id": self.worker_id,
+            "started_at": self.started_at,
+            "heartbeat": now,
+            **self._stats(),
+        }
+        key = worker_key(self.worker_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, int(self.ttl) + 1)
+            pipe.zadd(WORKERS_KEY, {self.worker_id: now})
+            pipe.zremrangebyscore(WORKERS_KEY, "-inf", now - self.ttl)
+            await pipe.execute()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Worker heartbeat failed", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+async def live_workers(redis_client, ttl: float = config.WS_WORKER_TTL) -> List[Dict[str, Any]]:
+    """Stats of every worker that heartbeated within the TTL"""
+    worker_ids = await redis_client.zrangebyscore(WORKERS_KEY, time.time() - ttl, "+inf")
+    if not worker_ids:
+        return []
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for worker_id in worker_ids:
+            pipe.hgetall(worker_key(worker_id))
+        rows = await pipe.execute()
+
+    workers = []
+    for row in rows:
+        if not row:
+            continue
+        worker: Dict[str, Any] = {
+            "worker_id": row.pop("worker_id", None),
+            "started_at": float(row.pop("started_at", 0)),
+            "heartbeat": float(row.pop("heartbeat", 0)),
+        }
+        worker.update((field, int(value)) for field, value in row.items())
+        workers.append(worker)
+    return workers
+
+
+# Global worker registry instance
+registry = WorkerRegistry()
@@ -0,0 +1,256 @@
+"""
+Arrival estimates for in-progress travels.
+
+remaining distance = straight line to the destination station x route factor
+(road / straight-line distance of past trips between the same stations, or
+ETA_ROUTE_FACTOR). Speed blends the vehicle's recent speed (exponentially
+weighted over ETA_SPEED_WINDOW) with the historical average speed of that
+origin/destination pair from TravelHistory.
+
+Estimates are cached per vehicle in Redis under eta_key. The ping path calls
+observe(), which re-estimates in the background only once the vehicle has
+moved ETA_RECOMPUTE_DISTANCE_M (or ETA_RECOMPUTE_INTERVAL passed), then
+pushes the result to the vehicle's /ws/track viewers as {"type": "eta", ...}.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Sequence
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import config
+from core.db import AsyncSessionLocal
+from core.geo import haversine_distance
+from common.models import Station, Travel, TravelHistory, TravelStatus, HistoryStatus
+from services.station_index import station_index
+from services.websocket_manager import location_key, vehicle_channel, vehicle_event
+from tracking.queries import latest_point_query, recent_speeds_query
+
+logger = logging.getLogger(__name__)
+
+ETA_EVENT = "eta"
+
+
+def eta_key(vehicle_id: str) -> str:
+    """Redis key holding a vehicle's latest travel estimate"""
+    return f"vehicle:{vehicle_id}:eta"
+
+
+class PairStats(NamedTuple):
+    """Completed trips between two stations"""
+    trips: int
+    duration_minutes: float | None
+    distance_km: float | None
+
+    @property
+    def speed_kmh(self) -> float | None:
+        if not self.duration_minutes or not self.distance_km:
+            return None
+        return self.distance_km / (self.duration_minutes / 60)
+
+
+def pair_history_query(origin_station_id: str, destination_station_id: str, limit: int):
+    """Median duration / distance of the most recent completed trips between two stations"""
+    recent = (
+        select(TravelHistory.duration_minutes, TravelHistory.distance_km)
+        .where(
+            TravelHistory.origin_station_id == origin_station_id,
+            TravelHistory.destination_station_id == destination_station_id,
+            TravelHistory.status == HistoryStatus.COMPLETED,
+            TravelHistory.duration_minutes > 0
+        )
+        .order_by(TravelHistory.departure_time.desc())
+        .limit(limit)
+        .subquery()
+    )
+    return select(
+        func.count(),
+        func.percentile_cont(0.5).within_group(recent.c.duration_minutes),
+        func.percentile_cont(0.5).within_group(recent.c.distance_km),
+    ).select_from(recent)
+
+
+def smoothed_speed(rows: Sequence[tuple[datetime, float]], now: datetime, half_life: float) -> float | None:
+    """Exponentially time-weighted mean of (timestamp, speed) rows; stops count as 0"""
+    total = weights = 0.0
+    for timestamp, speed in rows:
+        weight = 0.5 ** (max(0.0, (now - timestamp).total_seconds()) / half_life)
+        total += weight * speed
+        weights += weight
+    return total / weights if weights else None
+
+
+class EtaService:
+    """Estimates, caches and pushes travel arrival times"""
+
+    def __init__(
+        self,
+        recompute_distance_m: float = config.ETA_RECOMPUTE_DISTANCE_M,
+        recompute_interval: float = config.ETA_RECOMPUTE_INTERVAL,
+        cache_ttl: int = config.ETA_CACHE_TTL,
+        max_concurrency: int = config.ETA_MAX_CONCURRENCY,
+    ):
+        self.recompute_distance_m = recompute_distance_m
+        self.recompute_interval = recompute_interval
+        self.cache_ttl = cache_ttl
+        # position and monotonic time of each vehicle's last estimate
+        self._anchors: dict[str, tuple[float, float, float]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pair_stats: dict[tuple[str, str], tuple[float, PairStats]] = {}
+        self._redis_client: Any = None
+
+    def start(self, redis_client) -> None:
+        """Set the Redis client for background estimates (called from main.py lifespan)"""
+        self._redis_client = redis_client
+
+    async def stop(self) -> None:
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+
+    def observe(self, vehicle_id: str, latitude: float, longitude: float) -> None:
+        """Ping-path hook: schedule a new estimate after meaningful movement"""
+        if self._redis_client is None or vehicle_id in self._inflight:
+            return
+        now = time.monotonic()
+        anchor = self._anchors.get(vehicle_id)
+        if anchor is not None:
+            moved = haversine_distance(anchor[0], anchor[1], latitude, longitude)
+            if moved < self.recompute_distance_m and now - anchor[2] < self.recompute_interval:
+                return
+        self._anchors[vehicle_id] = (latitude, longitude, now)
+        task = asyncio.create_task(self._refresh(vehicle_id))
+        self._inflight[vehicle_id] = task
+        task.add_done_callback(lambda _: self._inflight.pop(vehicle_id, None))
+
+    async def _refresh(self, vehicle_id: str) -> None:
+        try:
+            async with self._semaphore:
+                async with AsyncSessionLocal() as session:
+                    travel = await session.scalar(
+                        select(Travel)
+                        .where(Travel.vehicle_id == vehicle_id, Travel.status == TravelStatus.IN_PROGRESS)
+                        .order_by(Travel.actual_departure.desc().nulls_last())
+                        .limit(1)
+                    )
+                    if travel is None:
+                        return
+                    eta = await self.estimate(session, self._redis_client, travel)
+            if eta is not None:
+                await self.store(self._redis_client, eta, push=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("ETA refresh failed for vehicle %s", vehicle_id)
+
+    async def cached(self, redis_client, travel: Travel) -> dict | None:
+        """Cached estimate for this travel, if its vehicle has one"""
+        raw = await redis_client.get(eta_key(travel.vehicle_id))
+        if raw is None:
+            return None
+        eta = orjson.loads(raw)
+        return eta if eta.get("travel_id") == travel.id else None
+
+    async def store(self, redis_client, eta: dict, push: bool = False) -> None:
+        """Cache an estimate and optionally push it to the vehicle's viewers"""
+        vehicle_id = eta["vehicle_id"]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(eta_key(vehicle_id), orjson.dumps(eta), ex=self.cache_ttl)
+            if push:
+                pipe.publish(vehicle_channel(vehicle_id), vehicle_event(ETA_EVENT, eta))
+            await pipe.execute()
+
+    async def _station(self, session: AsyncSession, station_id: str) -> tuple[float, float, float] | None:
+        station = station_index.get(station_id)
+        if station is None:
+            station = await session.get(Station, station_id)
+        if station is None:
+            return None
+        return station.latitude, station.longitude, station.radius or 0.0
+
+    async def _position(self, session: AsyncSession, redis_client, vehicle_id: str) -> tuple[float, float] | None:
+        raw = await redis_client.get(location_key(vehicle_id))
+        if raw is not None:
+            location = orjson.loads(raw)
+            return location["latitude"], location["longitude"]
+        point = await session.scalar(latest_point_query(vehicle_id))
+        return (point.latitude, point.longitude) if point is not None else None
+
+    async def pair_stats(self, session: AsyncSession, origin_station_id: str, destination_station_id: str) -> PairStats:
+        key = (origin_station_id, destination_station_id)
+        cached = self._pair_stats.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        trips, duration, distance = (await session.execute(
+            pair_history_query(origin_station_id, destination_station_id, config.ETA_HISTORY_TRIPS)
+        )).one()
+        stats = PairStats(trips, duration, distance)
+        self._pair_stats[key] = (time.monotonic() + config.ETA_HISTORY_TTL, stats)
+        return stats
+
+    async def estimate(self, session: AsyncSession, redis_client, travel: Travel) -> dict | None:
+        """Estimate for an in-progress travel; None without a known position or destination"""
+        position = await self._position(session, redis_client, travel.vehicle_id)
+        destination = await self._station(session, travel.destination_station_id)
+        if position is None or destination is None:
+            return None
+        now = datetime.now(timezone.utc)
+
+        stats = await self.pair_stats(session, travel.origin_station_id, travel.destination_station_id)
+        route_factor = config.ETA_ROUTE_FACTOR
+        origin = await self._station(session, travel.origin_station_id)
+        if stats.distance_km and origin is not None:
+            straight_m = haversine_distance(origin[0], origin[1], destination[0], destination[1])
+            if straight_m > 0:
+                route_factor = min(3.0, max(1.0, stats.distance_km * 1000 / straight_m))
+
+        remaining_m = haversine_distance(position[0], position[1], destination[0], destination[1])
+        if remaining_m <= destination[2]:
+            remaining_m = 0.0
+        remaining_km = remaining_m * route_factor / 1000
+
+        rows = (await session.execute(
+            recent_speeds_query(travel.vehicle_id, now - timedelta(seconds=config.ETA_SPEED_WINDOW))
+        )).all()
+        live_speed = smoothed_speed(rows, now, config.ETA_SPEED_HALF_LIFE)
+        historical_speed = stats.speed_kmh
+        if live_speed is not None and historical_speed is not None:
+            speed = config.ETA_LIVE_WEIGHT * live_speed + (1 - config.ETA_LIVE_WEIGHT) * historical_speed
+        else:
+            speed = next(
+                (s for s in (live_speed, historical_speed) if s is not None), config.ETA_DEFAULT_SPEED_KMH
+            )
+        speed = max(speed, config.ETA_MIN_SPEED_KMH)
+
+        remaining_minutes = remaining_km / speed * 60
+        eta = now + timedelta(minutes=remaining_minutes)
+        delay_minutes = None
+        if travel.scheduled_arrival is not None:
+            delay_minutes = round((eta - travel.scheduled_arrival).total_seconds() / 60, 1)
+
+        return {
+            "travel_id": travel.id,
+            "vehicle_id": travel.vehicle_id,
+            "destination_station_id": travel.destination_station_id,
+            "eta": eta,
+            "remaining_minutes": round(remaining_minutes, 1),
+            "remaining_km": round(remaining_km, 3),
+            "speed_kmh": round(speed, 1),
+            "live_speed_kmh": round(live_speed, 1) if live_speed is not None else None,
+            "historical_speed_kmh": round(historical_speed, 1) if historical_speed is not None else None,
+            "historical_trips": stats.trips,
+            "scheduled_arrival": travel.scheduled_arrival,
+            "delay_minutes": delay_minutes,
+            "computed_at": now,
+        }
+
+
+# Global ETA service instance
+eta_service = EtaService()
@@ -0,0 +1,224 @@
+"""
+Station geofencing on the driver ping path.
+
+Each ping is matched against the in-process station index. A vehicle's current
+station is kept in Redis under station_key and swapped with SET ... GET in the
+same pipeline that stores the location, so transitions are detected atomically
+across workers without an extra round trip. Every change publishes
+arrived/departed events on GEOFENCE_CHANNEL, relayed to /ws/geofence clients.
+"""
+import asyncio
+import logging
+from typing import Any, Callable
+
+import orjson
+
+from core.config import config
+from core.const import GeofenceEvent
+from core.geo import haversine_distance
+from services.station_index import station_index
+
+logger = logging.getLogger(__name__)
+
+GEOFENCE_CHANNEL = "geofence:events"
+
+# Membership keys outlive a silent vehicle as long as its latest location does
+STATION_TTL = 3600  # seconds
+
+
+def station_key(vehicle_id: str) -> str:
+    """Redis key holding the station a vehicle is at ("" when at none)"""
+    return f"vehicle:{vehicle_id}:station"
+
+
+def geofence_event(
+    event: GeofenceEvent,
+    vehicle_id: str,
+    station_id: str,
+    latitude: float,
+    longitude: float,
+    timestamp: str | None,
+    odometer_m: float | None = None,
+) -> dict:
+    station = station_index.get(station_id)
+    return {
+        "type": event.value,
+        "vehicle_id": vehicle_id,
+        "station_id": station_id,
+        "station_name": station.name if station is not None else None,
+        "latitude": latitude,
+        "longitude": longitude,
+        "timestamp": timestamp,
+        "odometer_m": odometer_m,
+    }
+
+
+class GeofenceEngine:
+    """Detects station enter/exit per vehicle and fans events out to subscribers"""
+
+    def __init__(
+        self,
+        enabled: bool = config.GEOFENCE_ENABLED,
+        exit_margin_m: float = config.GEOFENCE_EXIT_MARGIN_M,
+        queue_size: int = config.GEOFENCE_QUEUE_SIZE,
+    ):
+        self.enabled = enabled
+        self.exit_margin_m = exit_margin_m
+        self.queue_size = queue_size
+        # station each vehicle was last resolved to by this worker (exit hysteresis)
+        self._current: dict[str, str] = {}
+        # in-process consumers of the events this worker detects
+        self._handlers: list[Callable[[dict], None]] = []
+        # local /ws/geofence subscribers fed by one pubsub connection
+        self._queues: set[asyncio.Queue] = set()
+        self._redis_client: Any = None
+        self._pubsub: Any = None
+        self._listener_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def resolve(self, redis_client, vehicle_id: str, latitude: float, longitude: float) -> str | None:
+        """Station id the vehicle is at, "" for none, or None to skip this ping
+
+        A vehicle stays at its current station until it is exit_margin_m past
+        the radius, so pings jittering on the boundary don't flap. The first
+        ping this worker sees for a vehicle seeds that state from station_key,
+        so a reconnect (here or on another worker) doesn't read as a departure.
+        """
+        if not self.enabled or not station_index.ensure_loaded():
+            return None
+        if vehicle_id not in self._current:
+            self._current[vehicle_id] = await redis_client.get(station_key(vehicle_id)) or ""
+        current = station_index.get(self._current[vehicle_id])
+        if current is not None and haversine_distance(
+            latitude, longitude, current.latitude, current.longitude
+        ) <= current.radius + self.exit_margin_m:
+            return current.id
+        match = station_index.lookup(latitude, longitude)
+        return match[0].id if match is not None else ""
+
+    def queue_membership(self, pipe, vehicle_id: str, station_id: str) -> None:
+        """Add the membership swap to a pipeline; its result is the previous station"""
+        self._current[vehicle_id] = station_id
+        pipe.set(station_key(vehicle_id), station_id, ex=STATION_TTL, get=True)
+
+    def forget(self, vehicle_id: str) -> None:
+        """Drop the vehicle's hysteresis state (called when its driver socket closes)
+
+        The next resolve() re-seeds it from Redis.
+        """
+        self._current.pop(vehicle_id, None)
+
+    async def publish_transitions(
+        self,
+        redis_client,
+        vehicle_id: str,
+        previous: str | None,
+        station_id: str,
+        latitude: float,
+        longitude: float,
+        timestamp: str | None,
+        odometer_m: float | None = None,
+    ) -> list[dict]:
+        """Publish departed/arrived for a membership change; returns the events"""
+        previous = previous or ""
+        if previous == station_id:
+            return []
+
+        events = []
+        if previous:
+            events.append(geofence_event(
+                GeofenceEvent.DEPARTED, vehicle_id, previous, latitude, longitude, timestamp, odometer_m
+            ))
+        if station_id:
+            events.append(geofence_event(
+                GeofenceEvent.ARRIVED, vehicle_id, station_id, latitude, longitude, timestamp, odometer_m
+            ))
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.publish(GEOFENCE_CHANNEL, orjson.dumps(event))
+            await pipe.execute()
+        for event in events:
+            for handler in self._handlers:
+                handler(event)
+        return events
+
+    def add_handler(self, handler: Callable[[dict], None]) -> None:
+        """Also hand every event detected by this worker to handler (exactly once fleet-wide)"""
+        self._handlers.append(handler)
+
+    def remove_handler(self, handler: Callable[[dict], None]) -> None:
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    # -- subscribers --
+
+    def start(self, redis_client) -> None:
+        """Set the Redis client used for the event subscription (called from main.py lifespan)"""
+        self._redis_client = redis_client
+
+    async def subscribe(self) -> asyncio.Queue:
+        """Queue receiving (vehicle_id, event JSON text) for every event"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.queue_size))
+        async with self._lock:
+            if self._pubsub is None:
+                if self._redis_client is None:
+                    raise RuntimeError("Redis not set on geofence engine; ensure lifespan runs first")
+                self._pubsub = self._redis_client.pubsub(ignore_subscribe_messages=True)
+                await self._pubsub.subscribe(GEOFENCE_CHANNEL)
+            self._queues.add(queue)
+            if self._listener_task is None or self._listener_task.done():
+                self._listener_task = asyncio.create_task(self._listen())
+        return queue
+
+    async def unsubscribe(self, queue: asyncio.Queue) -> None:
+        async with self._lock:
+            self._queues.discard(queue)
+            if not self._queues:
+                await self._close_pubsub()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            self._queues.clear()
+            await self._close_pubsub()
+
+    async def _close_pubsub(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if not message or message.get('type') != 'message':
+                    continue
+                text = message['data']
+                vehicle_id = orjson.loads(text).get("vehicle_id")
+                for queue in self._queues:
+                    try:
+                        queue.put_nowait((vehicle_id, text))
+                    except asyncio.QueueFull:
+                        # events don't supersede each other; drop and let the client resync
+                        logger.warning("Geofence subscriber queue full; dropping event")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Geofence event listener failed; retrying")
+                await asyncio.sleep(1.0)
+
+
+# Global geofence engine instance
+geofence = GeofenceEngine()
@@ -0,0 +1,112 @@
+import struct
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+# Binary location frame (WebSocket subprotocol "pilive.binary.v1"), little-endian, 23 bytes:
+#   B  flags      bit0 speed, bit1 heading, bit2 accuracy, bit3 timestamp present
+#   i  latitude   1e-7 degrees
+#   i  longitude  1e-7 degrees
+#   H  speed      0.1 km/h
+#   H  heading    0.01 degrees [0, 36000)
+#   H  accuracy   0.1 meters
+#   q  timestamp  milliseconds since the Unix epoch (UTC)
+LOCATION = struct.Struct("<BiiHHHq")
+
+BINARY_SUBPROTOCOL = "pilive.binary.v1"
+
+HAS_SPEED = 0x01
+HAS_HEADING = 0x02
+HAS_ACCURACY = 0x04
+HAS_TIMESTAMP = 0x08
+KNOWN_FLAGS = HAS_SPEED | HAS_HEADING | HAS_ACCURACY | HAS_TIMESTAMP
+
+COORD_SCALE = 10_000_000
+SPEED_SCALE = 10
+HEADING_SCALE = 100
+ACCURACY_SCALE = 10
+UINT16_MAX = 0xFFFF
+
+MAX_LAT_E7 = 90 * COORD_SCALE
+MAX_LON_E7 = 180 * COORD_SCALE
+MAX_TIMESTAMP_MS = 4_102_444_800_000  # 2100-01-01
+
+
+class LocationFrameError(ValueError):
+    """Malformed binary location frame"""
+
+
+class BinaryLocation(NamedTuple):
+    """Decoded binary location frame"""
+    latitude: float
+    longitude: float
+    speed: float | None
+    heading: float | None
+    accuracy: float | None
+    timestamp: datetime | None
+
+
+def decode_location(buf: bytes) -> BinaryLocation:
+    """Unpack and range-check a frame; raises LocationFrameError on anything malformed"""
+    if len(buf) != LOCATION.size:
+        raise LocationFrameError(f"expected {LOCATION.size} bytes, got {len(buf)}")
+
+    flags, lat, lon, speed, heading, accuracy, ts = LOCATION.unpack(buf)
+
+    if flags & ~KNOWN_FLAGS:
+        raise LocationFrameError("unknown flags")
+    if not -MAX_LAT_E7 <= lat <= MAX_LAT_E7:
+        raise LocationFrameError("latitude out of range")
+    if not -MAX_LON_E7 <= lon <= MAX_LON_E7:
+        raise LocationFrameError("longitude out of range")
+    if flags & HAS_HEADING and heading >= 360 * HEADING_SCALE:
+        raise LocationFrameError("heading out of range")
+    if flags & HAS_TIMESTAMP and not 0 <= ts < MAX_TIMESTAMP_MS:
+        raise LocationFrameError("timestamp out of range")
+
+    return BinaryLocation(
+        lat / COORD_SCALE,
+        lon / COORD_SCALE,
+        speed / SPEED_SCALE if flags & HAS_SPEED else None,
+        heading / HEADING_SCALE if flags & HAS_HEADING else None,
+        accuracy / ACCURACY_SCALE if flags & HAS_ACCURACY else None,
+        datetime.fromtimestamp(ts / 1000, tz=timezone.utc) if flags & HAS_TIMESTAMP else None,
+    )
+
+
+def _uint16(value: float, scale: int) -> int:
+    return min(UINT16_MAX, max(0, round(value * scale)))
+
+
+def encode_location(data: dict) -> bytes:
+    """Pack a location dict as published by ConnectionManager.update_vehicle_location"""
+    flags = 0
+    speed = heading = accuracy = ts = 0
+
+    if data.get("speed") is not None:
+        flags |= HAS_SPEED
+        speed = _uint16(data["speed"], SPEED_SCALE)
+    if data.get("heading") is not None:
+        flags |= HAS_HEADING
+        heading = round(data["heading"] * HEADING_SCALE) % (360 * HEADING_SCALE)
+    if data.get("accuracy") is not None:
+        flags |= HAS_ACCURACY
+        accuracy = _uint16(data["accuracy"], ACCURACY_SCALE)
+    if data.get("timestamp"):
+        try:
+            parsed = datetime.fromisoformat(str(data["timestamp"]).replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            ts = round(parsed.timestamp() * 1000)
+            flags |= HAS_TIMESTAMP
+        except ValueError:
+            pass
+
+    return LOCATION.pack(
+        flags,
+        round(data["latitude"] * COORD_SCALE),
+        round(data["longitude"] * COORD_SCALE),
+        speed,
+        heading,
+        accuracy,
+        ts,
+    )
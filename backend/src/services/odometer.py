@@ -0,0 +1,238 @@
+"""
+Per-vehicle odometer on the driver ping path.
+
+Each vehicle keeps an anchor (last accepted fix) and a running total in
+meters. A ping adds the haversine step from the anchor only if it passes the
+gates: fixes less accurate than ODOMETER_MAX_ACCURACY_M are ignored, movement
+within the fix's accuracy (or ODOMETER_MIN_STEP_M) is stationary jitter, and a
+step implying more than ODOMETER_MAX_SPEED_KMH is a GPS jump. The state lives
+in this worker (the driver's socket is pinned to it) and is written to Redis
+under odometer_key in the same pipeline as the location.
+
+A travel stores the reading at departure (travels.start_odometer_m), so its
+distance is a subtraction. In-progress travels get travels.distance refreshed
+every ODOMETER_FLUSH_INTERVAL.
+"""
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+import asyncpg
+from redis.exceptions import RedisError
+
+from core.config import config
+from core.geo import haversine_distance
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key so only one worker flushes travel distances at a time
+ADVISORY_LOCK_KEY = 0x6C6976656F  # "liveo"
+
+IN_PROGRESS_SQL = """
+    SELECT id, vehicle_id, start_odometer_m FROM public.travels
+    WHERE status = 'IN_PROGRESS' AND start_odometer_m IS NOT NULL
+"""
+
+# $1 travel ids, $2 distance in km
+FLUSH_DISTANCE_SQL = """
+    UPDATE public.travels t SET distance = d.distance, updated_at = now()
+    FROM unnest($1::varchar[], $2::float8[]) AS d(id, distance)
+    WHERE t.id = d.id AND t.status = 'IN_PROGRESS' AND t.distance IS DISTINCT FROM d.distance
+"""
+
+
+def odometer_key(vehicle_id: str) -> str:
+    """Redis hash with a vehicle's odometer anchor (latitude, longitude, ts) and meters"""
+    return f"vehicle:{vehicle_id}:odometer"
+
+
+def travel_distance_km(start_m: float | None, end_m: float | None) -> float | None:
+    """Distance between two odometer readings; None when either is missing or they went backwards"""
+    if start_m is None or end_m is None or end_m < start_m:
+        return None
+    return round((end_m - start_m) / 1000, 3)
+
+
+def _epoch(timestamp: str | None) -> float:
+    if timestamp:
+        try:
+            return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class _Anchor:
+    __slots__ = ("latitude", "longitude", "ts", "meters", "rejects")
+
+    def __init__(self, latitude: float, longitude: float, ts: float, meters: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.ts = ts
+        self.meters = meters
+        self.rejects = 0
+
+
+class Odometer:
+    """Accumulates gated haversine distance per vehicle"""
+
+    def __init__(
+        self,
+        max_accuracy_m: float = config.ODOMETER_MAX_ACCURACY_M,
+        min_step_m: float = config.ODOMETER_MIN_STEP_M,
+        max_speed_kmh: float = config.ODOMETER_MAX_SPEED_KMH,
+        max_rejects: int = config.ODOMETER_MAX_REJECTS,
+        flush_interval: float = config.ODOMETER_FLUSH_INTERVAL,
+    ):
+        self.max_accuracy_m = max_accuracy_m
+        self.min_step_m = min_step_m
+        self.max_speed = max_speed_kmh / 3.6  # m/s
+        self.max_rejects = max_rejects
+        self.flush_interval = flush_interval
+        self._anchors: dict[str, _Anchor | None] = {}
+        # vehicles whose anchor moved since their last Redis write
+        self._dirty: set[str] = set()
+        self._redis_client: Any = None
+        self._pool: asyncpg.Pool | None = None
+        self._task: asyncio.Task | None = None
+
+    def forget(self, vehicle_id: str) -> None:
+        """Reload from Redis on the next ping (the driver may have reported via another worker)"""
+        self._anchors.pop(vehicle_id, None)
+        self._dirty.discard(vehicle_id)
+
+    async def _load(self, redis_client, vehicle_id: str) -> _Anchor | None:
+        state = await redis_client.hgetall(odometer_key(vehicle_id))
+        try:
+            return _Anchor(
+                float(state["latitude"]), float(state["longitude"]), float(state["ts"]), float(state["meters"])
+            )
+        except (KeyError, ValueError):
+            return None
+
+    async def advance(
+        self,
+        redis_client,
+        vehicle_id: str,
+        latitude: float,
+        longitude: float,
+        accuracy: float | None = None,
+        timestamp: str | None = None,
+    ) -> float | None:
+        """Feed one ping; returns the vehicle's reading in meters (None before its first accepted fix)"""
+        if vehicle_id not in self._anchors:
+            self._anchors[vehicle_id] = await self._load(redis_client, vehicle_id)
+        anchor = self._anchors[vehicle_id]
+
+        if accuracy is not None and accuracy > self.max_accuracy_m:
+            return anchor.meters if anchor is not None else None
+
+        ts = _epoch(timestamp)
+        if anchor is None:
+            self._anchors[vehicle_id] = _Anchor(latitude, longitude, ts, 0.0)
+            self._dirty.add(vehicle_id)
+            return 0.0
+
+        step = haversine_distance(anchor.latitude, anchor.longitude, latitude, longitude)
+        if step < max(self.min_step_m, accuracy or 0.0):
+            return anchor.meters
+
+        elapsed = ts - anchor.ts
+        if elapsed <= 0 or step / elapsed > self.max_speed:
+            anchor.rejects += 1
+            if anchor.rejects < self.max_rejects:
+                return anchor.meters
+            # the anchor itself was the outlier: restart from here without counting the jump
+            step = 0.0
+        else:
+            anchor.meters += step
+
+        anchor.latitude, anchor.longitude, anchor.ts = latitude, longitude, max(ts, anchor.ts)
+        anchor.rejects = 0
+        self._dirty.add(vehicle_id)
+        return anchor.meters
+
+    def queue_write(self, pipe, vehicle_id: str) -> None:
+        """Add the anchor to a pipeline if it moved"""
+        if vehicle_id not in self._dirty:
+            return
+        self._dirty.discard(vehicle_id)
+        anchor = self._anchors[vehicle_id]
+        pipe.hset(odometer_key(vehicle_id), mapping={
+            "latitude": anchor.latitude,
+            "longitude": anchor.longitude,
+            "ts": anchor.ts,
+            "meters": anchor.meters,
+        })
+
+    # -- travels.distance flush --
+
+    def start(self, redis_client, pool: asyncpg.Pool) -> None:
+        """Refresh in-progress travel distances periodically (called from main.py lifespan)"""
+        self._redis_client = redis_client
+        self._pool = pool
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def flush(self, conn: asyncpg.Connection) -> int:
+        """Write current distances of in-progress travels; returns how many were updated"""
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", ADVISORY_LOCK_KEY):
+            # another worker is on it
+            return 0
+        try:
+            travels = await conn.fetch(IN_PROGRESS_SQL)
+            if not travels:
+                return 0
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for travel in travels:
+                    pipe.hget(odometer_key(travel["vehicle_id"]), "meters")
+                readings = await pipe.execute()
+
+            ids, distances = [], []
+            for travel, meters in zip(travels, readings):
+                distance = travel_distance_km(travel["start_odometer_m"], float(meters) if meters else None)
+                if distance is not None:
+                    ids.append(travel["id"])
+                    distances.append(distance)
+            if not ids:
+                return 0
+            status = await conn.execute(FLUSH_DISTANCE_SQL, ids, distances)
+            return int(status.rsplit(" ", 1)[-1])
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                async with self._pool.acquire() as conn:
+                    await self.flush(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Travel distance flush failed")
+
+
+async def read_odometer(redis_client, vehicle_id: str) -> float | None:
+    """Vehicle's stored reading in meters, for code off the ping path"""
+    try:
+        meters = await redis_client.hget(odometer_key(vehicle_id), "meters")
+    except RedisError:
+        logger.warning("Failed to read odometer for %s", vehicle_id, exc_info=True)
+        return None
+    return float(meters) if meters else None
+
+
+# Global odometer instance
+odometer = Odometer()
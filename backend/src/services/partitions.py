@@ -0,0 +1,221 @@
+"""
+Partition maintenance for public.live_tracking (range-partitioned on "timestamp").
+
+Runs inside the API lifespan every LIVE_TRACKING_PARTITION_CHECK_INTERVAL, or
+once from cron:
+  cd pi-live-core/backend/src && python -m services.partitions
+"""
+import re
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple
+
+import asyncpg
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = "public"
+PARENT = "live_tracking"
+
+# pg_try_advisory_lock key so only one worker maintains partitions at a time
+ADVISORY_LOCK_KEY = 0x6C69766570  # "livep"
+
+LIST_PARTITIONS_SQL = """
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    JOIN pg_namespace n ON n.oid = p.relnamespace
+    WHERE n.nspname = $1 AND p.relname = $2
+"""
+
+IS_PARTITIONED_SQL = """
+    SELECT c.relkind = 'p'
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = $1 AND c.relname = $2
+"""
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+def interval_floor(ts: datetime, interval: str) -> datetime:
+    """Start of the partition interval containing ts (UTC midnight based)"""
+    day = ts.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def interval_next(start: datetime, interval: str) -> datetime:
+    """Start of the interval following the one containing start"""
+    start = interval_floor(start, interval)
+    if interval == "week":
+        return start + timedelta(days=7)
+    if interval == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT}_p{start:%Y%m%d}"
+
+
+def create_partition_sql(name: str, start: datetime, end: datetime) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS {SCHEMA}."{name}" PARTITION OF {SCHEMA}.{PARENT} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def plan_partitions(
+    existing: List[Partition],
+    now: datetime,
+    interval: str,
+    premake: int,
+) -> List[Partition]:
+    """Ranges to create so that [current interval, premake intervals ahead) is covered"""
+    start = interval_floor(now, interval)
+    horizon = start
+    for _ in range(max(0, premake) + 1):
+        horizon = interval_next(horizon, interval)
+
+    missing = []
+    while start < horizon:
+        end = interval_next(start, interval)
+        overlapping = [p for p in existing if p.start < end and p.end > start]
+        if overlapping:
+            # interval was changed since these were made; continue after them
+            start = max(p.end for p in overlapping)
+            continue
+        missing.append(Partition(partition_name(start), start, end))
+        start = end
+    return missing
+
+
+def expired_partitions(existing: List[Partition], now: datetime, retention_days: int) -> List[Partition]:
+    """Partitions whose whole range is older than the retention window"""
+    if retention_days <= 0:
+        return []
+    cutoff = interval_floor(now - timedelta(days=retention_days), "day")
+    return sorted((p for p in existing if p.end <= cutoff), key=lambda p: p.start)
+
+
+class PartitionManager:
+    """Keeps future live_tracking partitions created and expires old ones"""
+
+    def __init__(
+        self,
+        interval: str = config.LIVE_TRACKING_PARTITION_INTERVAL,
+        premake: int = config.LIVE_TRACKING_PARTITION_PREMAKE,
+        retention_days: int = config.LIVE_TRACKING_RETENTION_DAYS,
+        retention_action: str = config.LIVE_TRACKING_RETENTION_ACTION,
+        check_interval: float = config.LIVE_TRACKING_PARTITION_CHECK_INTERVAL,
+    ):
+        self.interval = interval
+        self.premake = premake
+        self.retention_days = retention_days
+        self.retention_action = retention_action
+        self.check_interval = check_interval
+        self._pool: asyncpg.Pool | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, pool: asyncpg.Pool) -> None:
+        """Run maintenance now and then periodically (called from main.py lifespan)"""
+        self._pool = pool
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def maintain(self, conn: asyncpg.Connection, now: datetime | None = None) -> None:
+        """Create missing future partitions, then detach or drop expired ones"""
+        if not await conn.fetchval(IS_PARTITIONED_SQL, SCHEMA, PARENT):
+            logger.warning("%s.%s is not partitioned; run alembic upgrade", SCHEMA, PARENT)
+            return
+
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", ADVISORY_LOCK_KEY):
+            # another worker is on it
+            return
+        try:
+            now = now or datetime.now(timezone.utc)
+            existing = await self.partitions(conn)
+
+            for partition in plan_partitions(existing, now, self.interval, self.premake):
+                try:
+                    await conn.execute(create_partition_sql(*partition))
+                    logger.info("Created partition %s [%s, %s)", *partition)
+                except asyncpg.PostgresError:
+                    # e.g. rows for this range already sit in the default partition
+                    logger.exception("Failed to create partition %s", partition.name)
+
+            for partition in expired_partitions(existing, now, self.retention_days):
+                if self.retention_action == "detach":
+                    await conn.execute(
+                        f'ALTER TABLE {SCHEMA}.{PARENT} DETACH PARTITION {SCHEMA}."{partition.name}"'
+                    )
+                    logger.info("Detached expired partition %s", partition.name)
+                else:
+                    await conn.execute(f'DROP TABLE {SCHEMA}."{partition.name}"')
+                    logger.info("Dropped expired partition %s", partition.name)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+
+    async def partitions(self, conn: asyncpg.Connection) -> List[Partition]:
+        """Range partitions currently attached to live_tracking (the default one excluded)"""
+        result = []
+        for name, bound in await conn.fetch(LIST_PARTITIONS_SQL, SCHEMA, PARENT):
+            match = _BOUND.search(bound or "")
+            if match is None:
+                continue
+            start, end = (datetime.fromisoformat(value) for value in match.groups())
+            result.append(Partition(name, start, end))
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._pool.acquire() as conn:
+                    await self.maintain(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("live_tracking partition maintenance failed")
+            await asyncio.sleep(self.check_interval)
+
+
+# Global partition manager instance
+partition_manager = PartitionManager()
+
+
+async def main() -> None:
+    from core.db import to_asyncpg_dsn
+
+    conn = await asyncpg.connect(to_asyncpg_dsn(config.DATABASE_URL))
+    try:
+        await partition_manager.maintain(conn)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
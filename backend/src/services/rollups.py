@@ -0,0 +1,224 @@
+"""
+Minute / hour rollups of live_tracking into public.live_tracking_rollups.
+
+Each refresh recomputes whole buckets from raw rows (minute) and from minute
+rollups (hour) with one INSERT ... ON CONFLICT per chunk, so re-running is
+idempotent and pings that arrive up to TRACKING_ROLLUP_LOOKBACK late are
+picked up. Runs inside the API lifespan, or from cron / for a backfill:
+  cd pi-live-core/backend/src && python -m services.rollups [--since 2026-01-01T00:00:00+00:00]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+
+from core.config import config
+from core.const import AggregateInterval
+from core.geo import EARTH_RADIUS_M
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key so only one worker refreshes rollups at a time
+ADVISORY_LOCK_KEY = 0x6C69766572  # "liver"
+
+# Raw rows are rolled up at most this much at a time during catch-up
+CHUNK = timedelta(hours=1)
+
+_UPSERT = """
+    ON CONFLICT (vehicle_id, resolution, bucket) DO UPDATE SET
+        point_count = EXCLUDED.point_count,
+        avg_speed = EXCLUDED.avg_speed,
+        max_speed = EXCLUDED.max_speed,
+        speed_samples = EXCLUDED.speed_samples,
+        distance_m = EXCLUDED.distance_m,
+        last_latitude = EXCLUDED.last_latitude,
+        last_longitude = EXCLUDED.last_longitude,
+        last_timestamp = EXCLUDED.last_timestamp,
+        updated_at = now()
+"""
+
+_COLUMNS = """
+    vehicle_id, resolution, bucket, point_count, avg_speed, max_speed, speed_samples,
+    distance_m, last_latitude, last_longitude, last_timestamp
+"""
+
+# $1 window start (minute aligned), $2 window end, $3 max gap in seconds.
+# Each step's distance is booked to the bucket of its later point; rows up to
+# $3 before the window are read only to give the first points a predecessor.
+MINUTE_ROLLUP_SQL = f"""
+    WITH points AS (
+        SELECT vehicle_id, "timestamp", latitude, longitude, speed,
+               lag(latitude) OVER w AS prev_latitude,
+               lag(longitude) OVER w AS prev_longitude,
+               lag("timestamp") OVER w AS prev_timestamp
+        FROM public.live_tracking
+        WHERE "timestamp" >= $1::timestamptz - make_interval(secs => $3) AND "timestamp" < $2
+        WINDOW w AS (PARTITION BY vehicle_id ORDER BY "timestamp")
+    ), steps AS (
+        SELECT vehicle_id, "timestamp", latitude, longitude, speed,
+               CASE WHEN prev_timestamp IS NULL OR "timestamp" - prev_timestamp > make_interval(secs => $3)
+                    THEN 0.0
+                    ELSE 2 * {EARTH_RADIUS_M} * asin(least(1.0, sqrt(
+                        power(sin(radians(latitude - prev_latitude) / 2), 2)
+                        + cos(radians(prev_latitude)) * cos(radians(latitude))
+                        * power(sin(radians(longitude - prev_longitude) / 2), 2)
+                    )))
+               END AS step_m
+        FROM points
+        WHERE "timestamp" >= $1
+    )
+    INSERT INTO public.live_tracking_rollups ({_COLUMNS})
+    SELECT vehicle_id,
+           '{AggregateInterval.MINUTE.value}',
+           date_trunc('minute', "timestamp" AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS minute_bucket,
+           count(*),
+           avg(speed),
+           max(speed),
+           count(speed),
+           sum(step_m),
+           (array_agg(latitude ORDER BY "timestamp" DESC))[1],
+           (array_agg(longitude ORDER BY "timestamp" DESC))[1],
+           max("timestamp")
+    FROM steps
+    GROUP BY vehicle_id, minute_bucket
+    {_UPSERT}
+"""
+
+# $1 window start (hour aligned), $2 window end
+HOUR_ROLLUP_SQL = f"""
+    INSERT INTO public.live_tracking_rollups ({_COLUMNS})
+    SELECT vehicle_id,
+           '{AggregateInterval.HOUR.value}',
+           date_trunc('hour', bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS hour_bucket,
+           sum(point_count),
+           sum(avg_speed * speed_samples) / nullif(sum(speed_samples), 0),
+           max(max_speed),
+           sum(speed_samples),
+           sum(distance_m),
+           (array_agg(last_latitude ORDER BY last_timestamp DESC))[1],
+           (array_agg(last_longitude ORDER BY last_timestamp DESC))[1],
+           max(last_timestamp)
+    FROM public.live_tracking_rollups
+    WHERE resolution = '{AggregateInterval.MINUTE.value}' AND bucket >= $1 AND bucket < $2
+    GROUP BY vehicle_id, hour_bucket
+    {_UPSERT}
+"""
+
+LAST_MINUTE_SQL = f"""
+    SELECT max(bucket) FROM public.live_tracking_rollups
+    WHERE resolution = '{AggregateInterval.MINUTE.value}'
+"""
+
+EXPIRE_MINUTES_SQL = f"""
+    DELETE FROM public.live_tracking_rollups
+    WHERE resolution = '{AggregateInterval.MINUTE.value}' AND bucket < $1
+"""
+
+
+def floor_to(ts: datetime, interval: AggregateInterval) -> datetime:
+    """Start of the minute/hour bucket containing ts (UTC)"""
+    ts = ts.astimezone(timezone.utc).replace(second=0, microsecond=0)
+    if interval == AggregateInterval.HOUR:
+        ts = ts.replace(minute=0)
+    return ts
+
+
+class RollupManager:
+    """Keeps minute/hour rollups current for recent tracking data"""
+
+    def __init__(
+        self,
+        refresh_interval: float = config.TRACKING_ROLLUP_REFRESH_INTERVAL,
+        lookback: float = config.TRACKING_ROLLUP_LOOKBACK,
+        max_gap: float = config.TRACKING_ROLLUP_MAX_GAP,
+        backfill_hours: int = config.TRACKING_ROLLUP_BACKFILL_HOURS,
+        minute_retention_days: int = config.TRACKING_ROLLUP_MINUTE_RETENTION_DAYS,
+    ):
+        self.refresh_interval = refresh_interval
+        self.lookback = timedelta(seconds=lookback)
+        self.max_gap = max_gap
+        self.backfill = timedelta(hours=backfill_hours)
+        self.minute_retention_days = minute_retention_days
+        self._pool: asyncpg.Pool | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self, pool: asyncpg.Pool) -> None:
+        """Refresh now and then periodically (called from main.py lifespan)"""
+        self._pool = pool
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh(
+        self,
+        conn: asyncpg.Connection,
+        now: datetime | None = None,
+        since: datetime | None = None,
+    ) -> None:
+        """Recompute buckets from since (default: last rollup minute minus lookback) to now"""
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", ADVISORY_LOCK_KEY):
+            # another worker is on it
+            return
+        try:
+            now = now or datetime.now(timezone.utc)
+            if since is None:
+                since = now - self.lookback
+                last = await conn.fetchval(LAST_MINUTE_SQL)
+                since = min(since, last) if last is not None else now - self.backfill
+            start = floor_to(since, AggregateInterval.MINUTE)
+
+            chunk_start = start
+            while chunk_start < now:
+                chunk_end = min(chunk_start + CHUNK, now)
+                await conn.execute(MINUTE_ROLLUP_SQL, chunk_start, chunk_end, self.max_gap)
+                chunk_start = chunk_end
+            await conn.execute(HOUR_ROLLUP_SQL, floor_to(start, AggregateInterval.HOUR), now)
+
+            if self.minute_retention_days > 0:
+                await conn.execute(EXPIRE_MINUTES_SQL, now - timedelta(days=self.minute_retention_days))
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._pool.acquire() as conn:
+                    await self.refresh(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("live_tracking rollup refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+
+# Global rollup manager instance
+rollup_manager = RollupManager()
+
+
+async def main() -> None:
+    from core.db import to_asyncpg_dsn
+
+    parser = argparse.ArgumentParser(description="Refresh live_tracking rollups")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Recompute from this time (backfill)")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(to_asyncpg_dsn(config.DATABASE_URL))
+    try:
+        await rollup_manager.refresh(conn, since=args.since)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,288 @@
+import math
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import NamedTuple, Any
+
+import numpy as np
+from sqlalchemy import Select, func, select
+
+from core.config import config
+from core.db import AsyncSessionLocal
+from core.geo import EARTH_RADIUS_M, geography_point, haversine_distance, unit_vectors, distances_from
+from common.models import Station
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "stations:invalidate"
+
+# meters per degree of latitude
+_M_PER_DEG = math.pi * EARTH_RADIUS_M / 180.0
+
+# Cells with at least this many stations are measured with the NumPy kernel;
+# below it the per-call overhead makes the scalar loop faster
+VECTOR_MIN_STATIONS = 16
+
+# Minimum seconds between rebuild attempts while the index is unloaded
+REBUILD_RETRY_INTERVAL = 5.0
+
+
+class IndexedStation(NamedTuple):
+    """Subset of a Station row needed for at-station checks"""
+    id: str
+    name: str
+    latitude: float
+    longitude: float
+    radius: float
+
+
+def containing_stations_query(latitude: float, longitude: float) -> Select:
+    """Stations whose radius contains the point, nearest first
+
+    The per-row radius can't drive the GiST index, so the largest radius is
+    added as an index-usable ST_DWithin bound.
+    """
+    point = geography_point(latitude, longitude)
+    distance = func.ST_Distance(Station.location, point)
+    max_radius = select(func.max(Station.radius)).scalar_subquery()
+    return (
+        select(
+            Station.id, Station.name, Station.latitude, Station.longitude, Station.radius,
+            distance.label("distance")
+        )
+        .where(
+            func.ST_DWithin(Station.location, point, max_radius),
+            func.ST_DWithin(Station.location, point, Station.radius)
+        )
+        .order_by(distance)
+    )
+
+
+class StationIndex:
+    """In-process grid index of station catchment circles
+
+    Each station is filed under every grid cell its radius overlaps, so a
+    lookup only measures the stations in the point's own cell. Built at
+    startup and kept current across workers via Redis Pub/Sub invalidations.
+    """
+
+    def __init__(self, cell_size_m: float = config.STATION_INDEX_CELL_M):
+        self.cell_deg = cell_size_m / _M_PER_DEG
+        self._cells: dict[tuple[int, int], list[IndexedStation]] = defaultdict(list)
+        self._stations: dict[str, tuple[IndexedStation, list[tuple[int, int]]]] = {}
+        # unit vectors and radii of dense cells, built on first lookup
+        self._cell_arrays: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task | None = None
+        self._retry_at = 0.0
+        self._pubsub: Any = None
+        self._listener_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+
+    def _cover(self, station: IndexedStation) -> list[tuple[int, int]]:
+        """Grid cells overlapped by the station's bounding box"""
+        radius = station.radius or 0.0
+        dlat = radius / _M_PER_DEG
+        dlon = radius / (_M_PER_DEG * max(math.cos(math.radians(station.latitude)), 1e-6))
+        lat_lo, lon_lo = self._cell(station.latitude - dlat, station.longitude - dlon)
+        lat_hi, lon_hi = self._cell(station.latitude + dlat, station.longitude + dlon)
+        return [
+            (i, j)
+            for i in range(lat_lo, lat_hi + 1)
+            for j in range(lon_lo, lon_hi + 1)
+        ]
+
+    def _insert(self, station: IndexedStation) -> None:
+        cells = self._cover(station)
+        for cell in cells:
+            self._cells[cell].append(station)
+            self._cell_arrays.pop(cell, None)
+        self._stations[station.id] = (station, cells)
+
+    def _remove(self, station_id: str) -> None:
+        entry = self._stations.pop(station_id, None)
+        if entry is None:
+            return
+        station, cells = entry
+        for cell in cells:
+            self._cell_arrays.pop(cell, None)
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            bucket[:] = [s for s in bucket if s.id != station_id]
+            if not bucket:
+                del self._cells[cell]
+
+    def get(self, station_id: str | None) -> IndexedStation | None:
+        entry = self._stations.get(station_id) if station_id else None
+        return entry[0] if entry is not None else None
+
+    async def locate(self, latitude: float, longitude: float) -> tuple[IndexedStation, float] | None:
+        """Closest station whose radius contains the point, with its distance in meters
+
+        Until the index is (re)built the check runs in PostGIS instead.
+        """
+        if not self.ensure_loaded():
+            return await self._locate_db(latitude, longitude)
+        return self.lookup(latitude, longitude)
+
+    def lookup(self, latitude: float, longitude: float) -> tuple[IndexedStation, float] | None:
+        """Grid-only locate() for hot paths; callers check ensure_loaded() first"""
+        cell = self._cell(latitude, longitude)
+        bucket = self._cells.get(cell, ())
+        if len(bucket) >= VECTOR_MIN_STATIONS:
+            return self._lookup_vector(cell, bucket, latitude, longitude)
+
+        closest = None
+        closest_distance = float("inf")
+        for station in bucket:
+            distance = haversine_distance(latitude, longitude, station.latitude, station.longitude)
+            if distance <= station.radius and distance < closest_distance:
+                closest = station
+                closest_distance = distance
+        return (closest, closest_distance) if closest is not None else None
+
+    def _lookup_vector(
+        self, cell: tuple[int, int], bucket: list[IndexedStation], latitude: float, longitude: float
+    ) -> tuple[IndexedStation, float] | None:
+        arrays = self._cell_arrays.get(cell)
+        if arrays is None:
+            arrays = (
+                unit_vectors([s.latitude for s in bucket], [s.longitude for s in bucket]),
+                np.array([s.radius or 0.0 for s in bucket], dtype=np.float64),
+            )
+            self._cell_arrays[cell] = arrays
+        vectors, radii = arrays
+        distances = distances_from(latitude, longitude, vectors)
+        distances[distances > radii] = np.inf
+        best = int(distances.argmin())
+        if not np.isfinite(distances[best]):
+            return None
+        return bucket[best], float(distances[best])
+
+    async def _locate_db(self, latitude: float, longitude: float) -> tuple[IndexedStation, float] | None:
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(containing_stations_query(latitude, longitude).limit(1))).first()
+        if row is None:
+            return None
+        *station, distance = row
+        return IndexedStation(*station), distance
+
+    def ensure_loaded(self) -> bool:
+        """Whether the index is usable; if not, start a rebuild (at most every REBUILD_RETRY_INTERVAL)"""
+        if self._loaded:
+            return True
+        if (
+            (self._rebuild_task is None or self._rebuild_task.done())
+            and time.monotonic() >= self._retry_at
+        ):
+            self._retry_at = time.monotonic() + REBUILD_RETRY_INTERVAL
+            self._rebuild_task = asyncio.create_task(self._rebuild_quietly())
+        return False
+
+    async def _rebuild_quietly(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception:
+            logger.exception("Station index rebuild failed; using PostGIS until the next attempt")
+
+    async def rebuild(self) -> None:
+        """Reload every station from Postgres"""
+        async with self._lock:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(select(
+                    Station.id, Station.name, Station.latitude, Station.longitude, Station.radius
+                ))).all()
+            self._cells.clear()
+            self._cell_arrays.clear()
+            self._stations.clear()
+            for row in rows:
+                self._insert(IndexedStation(*row))
+            self._loaded = True
+        logger.info("Station index built with %d stations", len(rows))
+
+    async def refresh(self, station_id: str) -> None:
+        """Re-read one station (created, updated or deleted)"""
+        async with self._lock:
+            # checked under the lock: a rebuild in progress may predate this change
+            if not self._loaded:
+                self.ensure_loaded()
+                return
+            async with AsyncSessionLocal() as session:
+                row = (await session.execute(
+                    select(Station.id, Station.name, Station.latitude, Station.longitude, Station.radius)
+                    .where(Station.id == station_id)
+                )).first()
+            self._remove(station_id)
+            if row is not None:
+                self._insert(IndexedStation(*row))
+
+    # -- cross-worker invalidation --
+
+    async def start(self, redis_client) -> None:
+        """Build the index and listen for station changes (called from main.py lifespan)"""
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(INVALIDATE_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen())
+        try:
+            await self.rebuild()
+        except Exception:
+            # ensure_loaded() retries the build; locate() falls back to PostGIS meanwhile
+            logger.exception("Station index build failed at startup")
+
+    async def stop(self) -> None:
+        if self._rebuild_task is not None:
+            self._rebuild_task.cancel()
+            self._rebuild_task = None
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message and message.get('type') == 'message':
+                    if message['data']:
+                        await self.refresh(message['data'])
+                    else:
+                        await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Station index invalidation listener failed; rebuilding")
+                # changes may have been missed while disconnected
+                self._loaded = False
+                await asyncio.sleep(1.0)
+                self.ensure_loaded()
+
+
+def publish_station_invalidation(redis_client, station_id: str | None = None) -> None:
+    """Tell every worker to re-read a station, or everything (blocking client, for threadpool routes)"""
+    try:
+        redis_client.publish(INVALIDATE_CHANNEL, station_id or "")
+    except Exception:
+        logger.warning("Failed to publish station invalidation for %s", station_id, exc_info=True)
+
+
+# Global station index instance
+station_index = StationIndex()
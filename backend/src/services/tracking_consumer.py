@@ -0,0 +1,159 @@
+"""
+Kafka tracking consumer: writes live_tracking rows and latest-location keys.
+
+Run alongside the API when TRACKING_INGEST_MODE=kafka:
+  cd pi-live-core/backend/src && python -m services.tracking_consumer
+"""
+import signal
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import orjson
+
+from core.config import config
+from core.db import open_pg_pool, close_pg_pool
+from core.redis import create_redis_pool, create_async_redis, close_async_redis
+from services.tracking_ingest import TrackingIngestor, TrackPoint, ingestor
+from services.tracking_kafka import create_consumer, decode_event, topic_partition
+from services.websocket_manager import location_key, location_message, LOCATION_TTL
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT = 1.0  # seconds
+RETRY_BACKOFF = 5.0  # seconds before re-reading a batch whose write failed
+
+
+class TrackingConsumer:
+    """Consumes tracking events in batches; offsets are committed only after rows are written"""
+
+    def __init__(
+        self,
+        consumer: Any,
+        writer: TrackingIngestor,
+        redis_client,
+        topic: str = config.KAFKA_TRACKING_TOPIC,
+        batch_size: int = config.KAFKA_CONSUMER_BATCH_SIZE,
+    ):
+        self.consumer = consumer
+        self.writer = writer
+        self.redis = redis_client
+        self.topic = topic
+        self.batch_size = max(1, batch_size)
+
+        # counters, exposed for logs
+        self.consumed = 0
+        self.invalid = 0
+        self.retried = 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self.consumer.subscribe([self.topic])
+        try:
+            while not stop.is_set():
+                messages = await asyncio.to_thread(
+                    self.consumer.consume, self.batch_size, POLL_TIMEOUT
+                )
+                if messages:
+                    await self.process(messages)
+        finally:
+            await asyncio.to_thread(self.consumer.close)
+            logger.info(
+                "Tracking consumer stopped: consumed=%d invalid=%d retried=%d written=%d dropped=%d",
+                self.consumed, self.invalid, self.retried, self.writer.written, self.writer.dropped,
+            )
+
+    async def process(self, messages: List[Any]) -> bool:
+        """Write one batch, refresh latest locations, then commit its offsets
+
+        Returns False when the write failed: nothing is committed and the
+        partitions are rewound so the batch is consumed again (rows already
+        written are skipped by the ingestor's ON CONFLICT fallback).
+        """
+        points: List[TrackPoint] = []
+        # first offset of this batch per (topic, partition), to rewind to
+        starts: Dict[tuple[str, int], int] = {}
+        for message in messages:
+            if message.error() is not None:
+                logger.warning("Tracking consumer error: %s", message.error())
+                continue
+            starts.setdefault((message.topic(), message.partition()), message.offset())
+            try:
+                points.append(decode_event(message.value()))
+            except ValueError:
+                # poison message: skip it rather than block the partition
+                self.invalid += 1
+                logger.warning(
+                    "Skipping invalid tracking event at %s[%d]@%d",
+                    message.topic(), message.partition(), message.offset(),
+                )
+
+        if not starts:
+            # only error events: no offsets stored, and commit() would raise _NO_OFFSET
+            return True
+
+        if points:
+            failed = self.writer.failed
+            for point in points:
+                await self.writer.submit(point)
+            await self.writer.join()
+            if self.writer.failed != failed:
+                await self._rewind(starts)
+                return False
+            await self._store_latest(points)
+            self.consumed += len(points)
+
+        await asyncio.to_thread(self.consumer.commit, asynchronous=False)
+        return True
+
+    async def _rewind(self, starts: Dict[tuple[str, int], int]) -> None:
+        self.retried += 1
+        logger.error(
+            "Tracking batch not written; re-reading %d partitions in %.0fs", len(starts), RETRY_BACKOFF
+        )
+        for (topic, partition), offset in starts.items():
+            self.consumer.seek(topic_partition(self.consumer, topic, partition, offset))
+        await asyncio.sleep(RETRY_BACKOFF)
+
+    async def _store_latest(self, points: List[TrackPoint]) -> None:
+        # partitions are keyed by vehicle, so the last point seen is the latest
+        latest: Dict[str, TrackPoint] = {point.vehicle_id: point for point in points}
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for vehicle_id, point in latest.items():
+                    payload = orjson.dumps(location_message(
+                        point.latitude,
+                        point.longitude,
+                        point.speed,
+                        point.heading,
+                        point.accuracy,
+                        point.timestamp.isoformat(),
+                    ))
+                    pipe.set(location_key(vehicle_id), payload, ex=LOCATION_TTL)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Failed to update latest locations for %d vehicles", len(latest), exc_info=True)
+
+
+async def main() -> None:
+    pool = create_redis_pool()
+    redis_client = create_async_redis(pool)
+    pg = await open_pg_pool(max_size=config.TRACKING_INGEST_POOL_SIZE)
+    ingestor.start(pg)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    consumer = TrackingConsumer(create_consumer(), ingestor, redis_client)
+    try:
+        await consumer.run(stop)
+    finally:
+        await ingestor.stop()
+        await close_pg_pool()
+        await close_async_redis(redis_client, pool)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
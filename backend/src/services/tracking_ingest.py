@@ -0,0 +1,218 @@
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, List
+
+import asyncpg
+
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+TABLE = "live_tracking"
+SCHEMA = "public"
+COLUMNS = (
+    "id",
+    "vehicle_id",
+    "driver_id",
+    "latitude",
+    "longitude",
+    "speed",
+    "heading",
+    "accuracy",
+    "timestamp",
+)
+
+# Fallback when a batch references a vehicle deleted mid-flight, or repeats
+# points already written (Kafka redelivery): insert the rows whose vehicle still
+# exists and that are not stored yet, instead of failing the batch.
+INSERT_EXISTING_SQL = f"""
+    INSERT INTO {SCHEMA}.{TABLE} ({", ".join(COLUMNS)})
+    SELECT t.*
+    FROM unnest(
+        $1::varchar[], $2::varchar[], $3::varchar[],
+        $4::float8[], $5::float8[], $6::float8[], $7::float8[], $8::float8[],
+        $9::timestamptz[]
+    ) AS t({", ".join(COLUMNS)})
+    WHERE EXISTS (SELECT 1 FROM {SCHEMA}.vehicles v WHERE v.id = t.vehicle_id)
+    ON CONFLICT (id, "timestamp") DO NOTHING
+"""
+
+WRITE_RETRIES = 3
+
+
+def timestamp_in_window(timestamp: datetime, now: datetime) -> bool:
+    """Whether a client timestamp is within the accepted clock skew of now (naive = UTC)"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (
+        now - timedelta(seconds=config.TRACKING_MAX_CLOCK_BEHIND)
+        <= timestamp
+        <= now + timedelta(seconds=config.TRACKING_MAX_CLOCK_AHEAD)
+    )
+
+
+class TrackPoint(NamedTuple):
+    """One live_tracking row, in COLUMNS order"""
+    id: str
+    vehicle_id: str
+    driver_id: str
+    latitude: float
+    longitude: float
+    speed: float | None
+    heading: float | None
+    accuracy: float | None
+    timestamp: datetime
+
+    @classmethod
+    def new(
+        cls,
+        vehicle_id: str,
+        driver_id: str,
+        latitude: float,
+        longitude: float,
+        speed: float | None,
+        heading: float | None,
+        accuracy: float | None,
+        timestamp: datetime,
+    ) -> "TrackPoint":
+        return cls(
+            str(uuid.uuid4()),
+            vehicle_id,
+            driver_id,
+            latitude,
+            longitude,
+            speed,
+            heading,
+            accuracy,
+            timestamp,
+        )
+
+
+class TrackingIngestor:
+    """Buffers driver GPS points and writes them to live_tracking in bulk"""
+
+    def __init__(
+        self,
+        batch_size: int = config.TRACKING_INGEST_BATCH_SIZE,
+        flush_interval: float = config.TRACKING_INGEST_FLUSH_INTERVAL,
+        max_pending: int = config.TRACKING_INGEST_MAX_PENDING,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self._queue: asyncio.Queue[TrackPoint] | None = None
+        self._pool: asyncpg.Pool | None = None
+        self._task: asyncio.Task | None = None
+
+        # counters, exposed for logs / health checks
+        self.written = 0
+        self.dropped = 0
+        # points dropped because every write attempt failed (a subset of dropped)
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self, pool: asyncpg.Pool) -> None:
+        """Start the flusher (called from main.py lifespan)"""
+        self._pool = pool
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush whatever is buffered, then stop the flusher"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Tracking ingest shutdown timed out with %d points pending", self.pending)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Tracking ingest stopped: written=%d dropped=%d", self.written, self.dropped)
+
+    async def submit(self, point: TrackPoint) -> None:
+        """Queue a point; waits while the buffer is full so producers slow down"""
+        if self._queue is None:
+            raise RuntimeError("Tracking ingestor not started; ensure lifespan runs first")
+        await self._queue.put(point)
+
+    async def join(self) -> None:
+        """Wait until every submitted point has been written or dropped"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _next_batch(self) -> List[TrackPoint]:
+        queue = self._queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if len(batch) >= self.batch_size:
+                break
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[TrackPoint]) -> None:
+        for attempt in range(1, WRITE_RETRIES + 1):
+            try:
+                async with self._pool.acquire() as conn:
+                    try:
+                        await conn.copy_records_to_table(
+                            TABLE,
+                            schema_name=SCHEMA,
+                            columns=COLUMNS,
+                            records=batch,
+                        )
+                        self.written += len(batch)
+                    except (asyncpg.ForeignKeyViolationError, asyncpg.UniqueViolationError):
+                        status = await conn.execute(
+                            INSERT_EXISTING_SQL, *(list(col) for col in zip(*batch))
+                        )
+                        inserted = int(status.rsplit(" ", 1)[-1])
+                        self.written += inserted
+                        self.dropped += len(batch) - inserted
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Tracking batch write failed (attempt %d/%d, %d points)",
+                    attempt, WRITE_RETRIES, len(batch), exc_info=True,
+                )
+                await asyncio.sleep(0.5 * attempt)
+
+        self.dropped += len(batch)
+        self.failed += len(batch)
+        logger.error("Dropped %d tracking points after %d failed writes", len(batch), WRITE_RETRIES)
+
+
+# Global tracking ingestor instance
+ingestor = TrackingIngestor()
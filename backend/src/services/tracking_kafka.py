@@ -0,0 +1,319 @@
+import time
+import zlib
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple
+
+import orjson
+
+from core.config import config
+from services.tracking_ingest import TrackPoint
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BROKER = "memory://"
+
+
+def encode_event(point: TrackPoint) -> bytes:
+    """Serialize a tracking point as a Kafka message value"""
+    return orjson.dumps(point._asdict())
+
+
+def _number(value: Any, field: str, bound: float | None = None, optional: bool = False) -> float | None:
+    """value as a float, within [-bound, bound] when given; raises ValueError otherwise"""
+    if value is None and optional:
+        return None
+    # bool is an int subclass; JSON true/false is never a measurement
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"invalid tracking event: {field} must be a number")
+    if bound is not None and not -bound <= value <= bound:
+        raise ValueError(f"invalid tracking event: {field} out of range")
+    return float(value)
+
+
+def decode_event(value: bytes) -> TrackPoint:
+    """Parse and check a Kafka message value; raises ValueError on malformed events
+
+    Types and coordinate ranges are checked here so an event the database
+    would reject on every retry is skipped as poison instead of stalling its
+    partition.
+    """
+    data = orjson.loads(value)
+    if not isinstance(data, dict):
+        raise ValueError("tracking event must be an object")
+    try:
+        for field in ("id", "vehicle_id", "driver_id"):
+            if not isinstance(data[field], str) or not 0 < len(data[field]) <= 36:
+                raise ValueError(f"invalid tracking event: {field} must be an id string")
+        data["latitude"] = _number(data["latitude"], "latitude", 90)
+        data["longitude"] = _number(data["longitude"], "longitude", 180)
+        # unconstrained columns: only the type has to be right
+        for field in ("speed", "heading", "accuracy"):
+            data[field] = _number(data[field], field, optional=True)
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return TrackPoint(**data)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"invalid tracking event: {e}") from e
+
+
+# -- in-memory stand-in for a Kafka cluster --
+
+class FakeTopicPartition(NamedTuple):
+    """The parts of confluent_kafka.TopicPartition FakeConsumer.seek reads"""
+    topic: str
+    partition: int
+    offset: int
+
+
+class FakeMessage:
+    """The parts of confluent_kafka.Message the tracking consumer reads"""
+
+    __slots__ = ("_topic", "_partition", "_offset", "_key", "_value")
+
+    def __init__(self, topic: str, partition: int, offset: int, key: bytes | None, value: bytes):
+        self._topic = topic
+        self._partition = partition
+        self._offset = offset
+        self._key = key
+        self._value = value
+
+    def topic(self) -> str:
+        return self._topic
+
+    def partition(self) -> int:
+        return self._partition
+
+    def offset(self) -> int:
+        return self._offset
+
+    def key(self) -> bytes | None:
+        return self._key
+
+    def value(self) -> bytes:
+        return self._value
+
+    def error(self):
+        return None
+
+
+class InMemoryBroker:
+    """Single-process broker with keyed partitions and committed offsets per group"""
+
+    def __init__(self, partitions: int = 4):
+        self.partitions = partitions
+        self.topics: Dict[str, List[List[FakeMessage]]] = {}
+        # (group, topic, partition) -> next offset to read
+        self.committed: Dict[tuple[str, str, int], int] = {}
+        self.lock = threading.Lock()
+
+    def partition_for(self, key: bytes | None) -> int:
+        return zlib.crc32(key or b"") % self.partitions
+
+    def append(self, topic: str, key: bytes | None, value: bytes) -> FakeMessage:
+        with self.lock:
+            partitions = self.topics.setdefault(topic, [[] for _ in range(self.partitions)])
+            partition = self.partition_for(key)
+            message = FakeMessage(topic, partition, len(partitions[partition]), key, value)
+            partitions[partition].append(message)
+            return message
+
+    def producer(self) -> "FakeProducer":
+        return FakeProducer(self)
+
+    def consumer(self, group_id: str) -> "FakeConsumer":
+        return FakeConsumer(self, group_id)
+
+
+class FakeProducer:
+    """confluent_kafka.Producer subset: produce / poll / flush"""
+
+    def __init__(self, broker: InMemoryBroker):
+        self.broker = broker
+        self._callbacks: List[tuple[Callable, FakeMessage]] = []
+        self._lock = threading.Lock()
+
+    def produce(self, topic: str, value: bytes, key: str | bytes | None = None, on_delivery=None):
+        if isinstance(key, str):
+            key = key.encode()
+        message = self.broker.append(topic, key, value)
+        if on_delivery is not None:
+            with self._lock:
+                self._callbacks.append((on_delivery, message))
+
+    def poll(self, timeout: float = 0) -> int:
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+        for on_delivery, message in callbacks:
+            on_delivery(None, message)
+        return len(callbacks)
+
+    def flush(self, timeout: float = -1) -> int:
+        self.poll()
+        return 0
+
+    def __len__(self) -> int:
+        return len(self._callbacks)
+
+
+class FakeConsumer:
+    """confluent_kafka.Consumer subset: subscribe / consume / seek / commit / close"""
+
+    def __init__(self, broker: InMemoryBroker, group_id: str):
+        self.broker = broker
+        self.group_id = group_id
+        self.topics: List[str] = []
+        # (topic, partition) -> next offset to hand out
+        self.positions: Dict[tuple[str, int], int] = {}
+
+    def subscribe(self, topics: List[str]):
+        self.topics = list(topics)
+        self.positions = {}
+
+    def _position(self, topic: str, partition: int) -> int:
+        if (topic, partition) not in self.positions:
+            self.positions[(topic, partition)] = self.broker.committed.get(
+                (self.group_id, topic, partition), 0
+            )
+        return self.positions[(topic, partition)]
+
+    def _take(self, num_messages: int) -> List[FakeMessage]:
+        messages: List[FakeMessage] = []
+        with self.broker.lock:
+            for topic in self.topics:
+                for partition, log in enumerate(self.broker.topics.get(topic, ())):
+                    position = self._position(topic, partition)
+                    batch = log[position:position + num_messages - len(messages)]
+                    self.positions[(topic, partition)] = position + len(batch)
+                    messages.extend(batch)
+                    if len(messages) >= num_messages:
+                        return messages
+        return messages
+
+    def consume(self, num_messages: int = 1, timeout: float = -1) -> List[FakeMessage]:
+        # like librdkafka, a negative timeout waits indefinitely
+        deadline = None if timeout < 0 else time.monotonic() + timeout
+        while True:
+            messages = self._take(num_messages)
+            if messages or (deadline is not None and time.monotonic() >= deadline):
+                return messages
+            time.sleep(0.01)
+
+    def seek(self, partition: FakeTopicPartition):
+        self.positions[(partition.topic, partition.partition)] = partition.offset
+
+    def commit(self, asynchronous: bool = True):
+        with self.broker.lock:
+            for (topic, partition), offset in self.positions.items():
+                self.broker.committed[(self.group_id, topic, partition)] = offset
+
+    def close(self):
+        self.positions = {}
+
+
+# Shared by producer and consumer when KAFKA_BOOTSTRAP_SERVERS=memory://
+memory_broker = InMemoryBroker()
+
+
+def create_producer(bootstrap_servers: str = config.KAFKA_BOOTSTRAP_SERVERS):
+    if bootstrap_servers == MEMORY_BROKER:
+        return memory_broker.producer()
+
+    from confluent_kafka import Producer
+    return Producer({
+        "bootstrap.servers": bootstrap_servers,
+        "enable.idempotence": True,
+        "linger.ms": 5,
+        "compression.type": "lz4",
+    })
+
+
+def create_consumer(
+    bootstrap_servers: str = config.KAFKA_BOOTSTRAP_SERVERS,
+    group_id: str = config.KAFKA_CONSUMER_GROUP,
+):
+    if bootstrap_servers == MEMORY_BROKER:
+        return memory_broker.consumer(group_id)
+
+    from confluent_kafka import Consumer
+    return Consumer({
+        "bootstrap.servers": bootstrap_servers,
+        "group.id": group_id,
+        "enable.auto.commit": False,
+        "auto.offset.reset": "earliest",
+    })
+
+
+def topic_partition(consumer, topic: str, partition: int, offset: int):
+    """TopicPartition for consumer.seek, matching the consumer create_consumer returned"""
+    if isinstance(consumer, FakeConsumer):
+        return FakeTopicPartition(topic, partition, offset)
+
+    from confluent_kafka import TopicPartition
+    return TopicPartition(topic, partition, offset)
+
+
+class TrackingProducer:
+    """Publishes driver GPS points to Kafka, keyed by vehicle_id so each vehicle stays ordered"""
+
+    def __init__(self, topic: str = config.KAFKA_TRACKING_TOPIC):
+        self.topic = topic
+        self._producer: Any = None
+        self._poll_task: asyncio.Task | None = None
+
+        # counters, exposed for logs / health checks
+        self.delivered = 0
+        self.failed = 0
+
+    def start(self, producer=None) -> None:
+        """Create the producer and its delivery-report poller (called from main.py lifespan)"""
+        self._producer = producer if producer is not None else create_producer()
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush undelivered events, then stop polling"""
+        if self._producer is None:
+            return
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        remaining = await asyncio.to_thread(self._producer.flush, timeout)
+        if remaining:
+            logger.warning("Tracking producer shutdown with %d events undelivered", remaining)
+        self._producer = None
+        logger.info("Tracking producer stopped: delivered=%d failed=%d", self.delivered, self.failed)
+
+    async def submit(self, point: TrackPoint) -> None:
+        """Queue a point for Kafka; waits while librdkafka's local buffer is full"""
+        if self._producer is None:
+            raise RuntimeError("Tracking producer not started; ensure lifespan runs first")
+        value = encode_event(point)
+        while True:
+            try:
+                self._producer.produce(
+                    self.topic, key=point.vehicle_id, value=value, on_delivery=self._on_delivery
+                )
+                return
+            except BufferError:
+                await asyncio.sleep(0.05)
+
+    def _on_delivery(self, err, message) -> None:
+        if err is not None:
+            self.failed += 1
+            logger.warning("Tracking event delivery failed: %s", err)
+        else:
+            self.delivered += 1
+
+    async def _poll(self) -> None:
+        while True:
+            self._producer.poll(0)
+            await asyncio.sleep(0.1)
+
+
+# Global tracking producer instance (used when TRACKING_INGEST_MODE=kafka)
+producer = TrackingProducer()
@@ -0,0 +1,216 @@
+"""
+Automatic travel start/complete from geofence transitions.
+
+Departing a SCHEDULED travel's origin station starts it; arriving at an
+IN_PROGRESS travel's destination completes it and writes its TravelHistory row
+with the distance driven and the duration. Events carry the vehicle's odometer
+reading, so the distance is end minus start (services/odometer.py); the
+live_tracking path is only summed for travels without a start reading. Events come
+in-process from the worker that detected them, so each is handled once
+fleet-wide, and are applied in batches: one transaction per batch, with a
+savepoint per event so one bad event doesn't lose the rest.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import config
+from core.const import GeofenceEvent
+from core.db import AsyncSessionLocal
+from common.models import Travel, TravelHistory, TravelStatus, HistoryStatus
+from services.geofence import geofence
+from services.odometer import travel_distance_km
+from tracking.queries import path_distance_query
+
+logger = logging.getLogger(__name__)
+
+
+def event_time(event: dict) -> datetime:
+    """Event timestamp as aware UTC; now when missing or unparseable"""
+    try:
+        ts = datetime.fromisoformat(event["timestamp"].replace('Z', '+00:00'))
+    except (KeyError, AttributeError, ValueError):
+        return datetime.now(timezone.utc)
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+async def record_history(
+    session: AsyncSession,
+    travel: Travel,
+    status: HistoryStatus,
+    odometer_m: float | None = None,
+) -> TravelHistory | None:
+    """Add the TravelHistory row for a finished travel (None if it already has one)
+
+    odometer_m is the vehicle's odometer reading at the end of the travel; the
+    distance is also stored on the travel.
+    """
+    if await session.scalar(select(TravelHistory.id).where(TravelHistory.travel_id == travel.id)):
+        return None
+
+    departure = travel.actual_departure or travel.scheduled_departure or travel.created_at
+    distance_km = travel_distance_km(travel.start_odometer_m, odometer_m)
+    duration_minutes = None
+    if distance_km is None and travel.actual_departure is not None:
+        end = travel.actual_arrival or datetime.now(timezone.utc)
+        distance_m = await session.scalar(path_distance_query(travel.vehicle_id, travel.actual_departure, end))
+        distance_km = round(distance_m / 1000, 3)
+    if distance_km is not None:
+        travel.distance = distance_km
+    if travel.actual_arrival is not None and departure is not None:
+        duration_minutes = max(0, round((travel.actual_arrival - departure).total_seconds() / 60))
+
+    history = TravelHistory(
+        travel_id=travel.id,
+        vehicle_id=travel.vehicle_id,
+        driver_id=travel.driver_id,
+        origin_station_id=travel.origin_station_id,
+        destination_station_id=travel.destination_station_id,
+        departure_time=departure,
+        arrival_time=travel.actual_arrival,
+        distance_km=distance_km,
+        duration_minutes=duration_minutes,
+        status=status,
+    )
+    session.add(history)
+    return history
+
+
+async def complete_travel_record(
+    session: AsyncSession,
+    travel: Travel,
+    arrival: datetime,
+    odometer_m: float | None = None,
+) -> None:
+    """Mark a travel completed and write its history (caller commits)"""
+    travel.status = TravelStatus.COMPLETED
+    travel.actual_arrival = arrival
+    await record_history(session, travel, HistoryStatus.COMPLETED, odometer_m)
+
+
+async def cancel_travel_record(session: AsyncSession, travel: Travel, odometer_m: float | None = None) -> None:
+    """Mark a travel cancelled and write its history (caller commits)"""
+    travel.status = TravelStatus.CANCELLED
+    await record_history(session, travel, HistoryStatus.CANCELLED, odometer_m)
+
+
+class TravelLifecycle:
+    """Applies geofence arrived/departed events to travels in batches"""
+
+    def __init__(
+        self,
+        flush_interval: float = config.TRAVEL_LIFECYCLE_FLUSH_INTERVAL,
+        batch_size: int = config.TRAVEL_LIFECYCLE_BATCH_SIZE,
+    ):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[dict] | None = None
+        self._task: asyncio.Task | None = None
+        # counters for logs
+        self.started = 0
+        self.completed = 0
+
+    def start(self) -> None:
+        """Consume this worker's geofence events (called from main.py lifespan)"""
+        self._queue = asyncio.Queue(maxsize=self.batch_size * 10)
+        self._task = asyncio.create_task(self._run())
+        geofence.add_handler(self.submit)
+
+    async def stop(self) -> None:
+        """Apply whatever is queued, then stop"""
+        if self._task is None:
+            return
+        geofence.remove_handler(self.submit)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        pending = self._drain([])
+        if pending:
+            await self._apply_quietly(pending)
+        logger.info("Travel lifecycle stopped: started=%d completed=%d", self.started, self.completed)
+
+    def submit(self, event: dict) -> None:
+        if self._queue is None:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Travel lifecycle queue full; dropping %s event for %s", event["type"], event["vehicle_id"])
+
+    def _drain(self, batch: list[dict]) -> list[dict]:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # let transitions from the same moment share the transaction
+            await asyncio.sleep(self.flush_interval)
+            await self._apply_quietly(self._drain(batch))
+
+    async def _apply_quietly(self, events: list[dict]) -> None:
+        try:
+            await self.apply(events)
+        except Exception:
+            logger.exception("Travel lifecycle batch of %d events failed", len(events))
+
+    async def apply(self, events: list[dict]) -> None:
+        """Apply events in order in one transaction"""
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                for event in events:
+                    try:
+                        async with session.begin_nested():
+                            await self._apply_event(session, event)
+                    except Exception:
+                        logger.exception("Skipping geofence event %s", event)
+
+    async def _apply_event(self, session: AsyncSession, event: dict) -> None:
+        vehicle_id, station_id = event["vehicle_id"], event["station_id"]
+
+        if event["type"] == GeofenceEvent.DEPARTED.value:
+            travel = await session.scalar(
+                select(Travel)
+                .where(
+                    Travel.vehicle_id == vehicle_id,
+                    Travel.origin_station_id == station_id,
+                    Travel.status == TravelStatus.SCHEDULED
+                )
+                .order_by(Travel.scheduled_departure.asc().nulls_last(), Travel.created_at.asc())
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if travel is not None:
+                travel.status = TravelStatus.IN_PROGRESS
+                travel.actual_departure = event_time(event)
+                travel.start_odometer_m = event.get("odometer_m")
+                self.started += 1
+                logger.info("Travel %s started: vehicle %s left station %s", travel.id, vehicle_id, station_id)
+
+        elif event["type"] == GeofenceEvent.ARRIVED.value:
+            travel = await session.scalar(
+                select(Travel)
+                .where(
+                    Travel.vehicle_id == vehicle_id,
+                    Travel.destination_station_id == station_id,
+                    Travel.status == TravelStatus.IN_PROGRESS
+                )
+                .order_by(Travel.actual_departure.asc().nulls_last())
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            if travel is not None:
+                await complete_travel_record(session, travel, event_time(event), event.get("odometer_m"))
+                self.completed += 1
+                logger.info("Travel %s completed: vehicle %s reached station %s", travel.id, vehicle_id, station_id)
+
+
+# Global travel lifecycle instance
+travel_lifecycle = TravelLifecycle()
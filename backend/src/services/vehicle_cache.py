@@ -0,0 +1,151 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import NamedTuple, Any
+
+from sqlalchemy import select
+
+from core.config import config
+from core.db import AsyncSessionLocal
+from common.models import Vehicle, VehicleStatus
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "vehicles:invalidate"
+
+
+class CachedVehicle(NamedTuple):
+    """Subset of a Vehicle row needed on the ping path"""
+    id: str
+    driver_id: str | None
+    status: VehicleStatus
+
+
+class VehicleCache:
+    """In-process TTL/LRU cache of vehicles, invalidated across workers via Redis Pub/Sub"""
+
+    def __init__(
+        self,
+        ttl: float = config.VEHICLE_CACHE_TTL,
+        max_size: int = config.VEHICLE_CACHE_MAX_SIZE,
+    ):
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        # vehicle_id -> (expires_at, vehicle or None for a cached miss)
+        self._entries: OrderedDict[str, tuple[float, CachedVehicle | None]] = OrderedDict()
+        # in-flight loads, so concurrent misses for one vehicle share a query
+        self._loading: dict[str, asyncio.Task] = {}
+        # bumped by invalidate(); a load that spans a bump is not cached
+        self._generation = 0
+        self._pubsub: Any = None
+        self._listener_task: asyncio.Task | None = None
+
+    async def get(self, vehicle_id: str) -> CachedVehicle | None:
+        """Return the cached vehicle, loading it from Postgres on a miss"""
+        entry = self._entries.get(vehicle_id)
+        if entry is not None:
+            expires_at, vehicle = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(vehicle_id)
+                return vehicle
+            del self._entries[vehicle_id]
+
+        task = self._loading.get(vehicle_id)
+        if task is None:
+            task = asyncio.create_task(self._load_and_put(vehicle_id))
+            self._loading[vehicle_id] = task
+            task.add_done_callback(lambda done: self._load_done(vehicle_id, done))
+        # a cancelled caller must not cancel the load other callers wait on
+        return await asyncio.shield(task)
+
+    def invalidate(self, vehicle_id: str | None = None) -> None:
+        """Drop one vehicle from this worker's cache, or all of them"""
+        self._generation += 1
+        if vehicle_id is None:
+            self._entries.clear()
+            self._loading.clear()
+        else:
+            self._entries.pop(vehicle_id, None)
+            # later misses start a fresh load instead of joining the stale one
+            self._loading.pop(vehicle_id, None)
+
+    async def _load_and_put(self, vehicle_id: str) -> CachedVehicle | None:
+        generation = self._generation
+        vehicle = await self._load(vehicle_id)
+        # an invalidation during the load means the row may predate the update
+        if generation == self._generation:
+            self._put(vehicle_id, vehicle)
+        return vehicle
+
+    def _load_done(self, vehicle_id: str, task: asyncio.Task) -> None:
+        if self._loading.get(vehicle_id) is task:
+            del self._loading[vehicle_id]
+
+    async def _load(self, vehicle_id: str) -> CachedVehicle | None:
+        async with AsyncSessionLocal() as session:
+            row = (
+                await session.execute(
+                    select(Vehicle.id, Vehicle.driver_id, Vehicle.status)
+                    .where(Vehicle.id == vehicle_id)
+                )
+            ).first()
+        return CachedVehicle(*row) if row else None
+
+    def _put(self, vehicle_id: str, vehicle: CachedVehicle | None) -> None:
+        self._entries[vehicle_id] = (time.monotonic() + self.ttl, vehicle)
+        self._entries.move_to_end(vehicle_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    # -- cross-worker invalidation --
+
+    async def start(self, redis_client) -> None:
+        """Listen for invalidations from every worker (called from main.py lifespan)"""
+        self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(INVALIDATE_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+            self._pubsub = None
+        self.invalidate()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message and message.get('type') == 'message':
+                    self.invalidate(message['data'] or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Vehicle cache invalidation listener failed; retrying")
+                # entries may be stale while disconnected
+                self.invalidate()
+                await asyncio.sleep(1.0)
+
+
+def publish_vehicle_invalidation(redis_client, vehicle_id: str) -> None:
+    """Tell every worker to drop a vehicle (blocking client, for threadpool routes)"""
+    try:
+        redis_client.publish(INVALIDATE_CHANNEL, vehicle_id)
+    except Exception:
+        logger.warning("Failed to publish vehicle invalidation for %s", vehicle_id, exc_info=True)
+
+
+# Global vehicle cache instance
+vehicle_cache = VehicleCache()
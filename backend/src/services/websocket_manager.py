@@ -1,45 +1,506 @@
-import json
+import time
+import struct
 import asyncio
-from typing import Dict, Set, Any
-from fastapi import WebSocket
+import logging
+from typing import Dict, Set, Any, NamedTuple
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect, status
+
+from core.config import config
+from core.geo import haversine_distance, heading_difference
+from services.location_codec import encode_location
+from services.geofence import geofence
+from services.odometer import odometer
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "vehicle:"
+CHANNEL_SUFFIX = ":updates"
+
+
+def vehicle_channel(vehicle_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{vehicle_id}{CHANNEL_SUFFIX}"
+
+
+def channel_vehicle_id(channel: str) -> str | None:
+    if channel.startswith(CHANNEL_PREFIX) and channel.endswith(CHANNEL_SUFFIX):
+        return channel[len(CHANNEL_PREFIX):-len(CHANNEL_SUFFIX)]
+    return None
+
+
+def location_key(vehicle_id: str) -> str:
+    """Redis key holding a vehicle's latest position"""
+    return f"vehicle:{vehicle_id}:location"
+
+
+LOCATION_TTL = 3600  # seconds
+
+# Non-position messages on a vehicle channel are JSON objects whose first key is
+# "type" (e.g. {"type": "eta", ...}); positions never start this way
+EVENT_PREFIX = '{"type":'
+
+
+class TypedEvent(NamedTuple):
+    """A typed event queued for a viewer; unlike positions, never superseded"""
+    text: str
+
+
+def vehicle_event(event_type: str, body: dict) -> bytes:
+    """Encode a typed event for a vehicle channel"""
+    return orjson.dumps({"type": event_type, **body})
+
+
+def location_message(
+    latitude: float,
+    longitude: float,
+    speed: float = None,
+    heading: float = None,
+    accuracy: float = None,
+    timestamp: str = None
+) -> dict:
+    """Position as stored under location_key and published to viewers"""
+    location_data = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timestamp": timestamp
+    }
+    if speed is not None:
+        location_data["speed"] = speed
+    if heading is not None:
+        location_data["heading"] = heading
+    if accuracy is not None:
+        location_data["accuracy"] = accuracy
+    return location_data
+
+
+_UNSET = object()
+
+
+class Frame:
+    """Pre-encoded location payload, decoded at most once and only if a sender needs it"""
+
+    __slots__ = ("text", "_data", "_binary")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._data: Any = _UNSET
+        self._binary: Any = _UNSET
+
+    @property
+    def data(self) -> dict | None:
+        if self._data is _UNSET:
+            try:
+                data = orjson.loads(self.text)
+                self._data = data if isinstance(data, dict) else None
+            except orjson.JSONDecodeError:
+                self._data = None
+        return self._data
+
+    @property
+    def binary(self) -> bytes | None:
+        """Fixed-layout binary encoding, shared by every binary viewer"""
+        if self._binary is _UNSET:
+            try:
+                self._binary = encode_location(self.data)
+            except (KeyError, TypeError, ValueError, struct.error):
+                self._binary = None
+        return self._binary
+
+
+class TrackShaping(NamedTuple):
+    """Per-subscriber rate shaping and encoding for /ws/track"""
+    delta: bool = False
+    min_distance_m: float | None = None
+    min_heading_deg: float | None = None
+    min_interval_ms: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.delta or any(
+            v is not None for v in (self.min_distance_m, self.min_heading_deg, self.min_interval_ms)
+        )
+
+
+class ClientSender:
+    """Bounded outbound queue and writer task for one WebSocket"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = config.WS_SEND_QUEUE_SIZE,
+        evict_after: float = config.WS_SLOW_CLIENT_TIMEOUT,
+        binary: bool = False,
+    ):
+        self.websocket = websocket
+        self.evict_after = evict_after
+        self.binary = binary
+        self.vehicle_ids: Set[str] = set()
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max(1, max_queue))
+        # set when the queue first overflows, cleared once the writer catches up
+        self.behind_since: float | None = None
+        self.task = asyncio.create_task(self._run())
+
+    def push(self, vehicle_id: str, frame: Frame) -> bool:
+        """Queue a pre-encoded frame; returns False once the client should be evicted"""
+        payload = frame.binary if self.binary else frame.text
+        if payload is None:
+            return not self.is_stale()
+        return self._enqueue(payload)
+
+    def push_event(self, text: str) -> bool:
+        """Queue a typed JSON event as text, bypassing position encoding"""
+        return self._enqueue(TypedEvent(text))
+
+    def _enqueue(self, item: Any) -> bool:
+        if self.task.done():
+            return False
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Positions supersede each other: keep only the newest one, plus the
+            # typed events (the newest ones, if events alone would fill the queue)
+            events, latest = [], None
+            while not self.queue.empty():
+                queued = self.queue.get_nowait()
+                if isinstance(queued, TypedEvent):
+                    events.append(queued)
+                else:
+                    latest = queued
+            if isinstance(item, TypedEvent):
+                events.append(item)
+            else:
+                latest = item
+            room = self.queue.maxsize - (latest is not None)
+            for event in events[max(0, len(events) - room):]:
+                self.queue.put_nowait(event)
+            if latest is not None:
+                self.queue.put_nowait(latest)
+            if self.behind_since is None:
+                self.behind_since = time.monotonic()
+        return not self.is_stale()
+
+    def _encode(self, item: Any) -> str | bytes:
+        return item
+
+    def is_stale(self) -> bool:
+        return (
+            self.behind_since is not None
+            and time.monotonic() - self.behind_since > self.evict_after
+        )
+
+    async def _run(self):
+        try:
+            while True:
+                item = await self.queue.get()
+                payload = item.text if isinstance(item, TypedEvent) else self._encode(item)
+                if isinstance(payload, bytes):
+                    await self.websocket.send_bytes(payload)
+                else:
+                    await self.websocket.send_text(payload)
+                if self.queue.empty():
+                    self.behind_since = None
+        except (WebSocketDisconnect, RuntimeError) as e:
+            # Socket went away; push() sees the finished task and the viewer is evicted
+            logger.debug("Viewer socket closed while sending: %r", e)
+
+    def close(self):
+        self.task.cancel()
+
+
+class ShapedSender(ClientSender):
+    """ClientSender that thins updates by movement / rate and can send quantized deltas.
+
+    Delta frames carry integers: latitude/longitude in 1e-6 degrees, speed in 0.1 km/h
+    and heading in whole degrees. The first frame is a keyframe with absolute values,
+    later ones hold lat/lon deltas against the last frame this client was sent:
+        {"k": [lat_e6, lon_e6, speed_e1, heading, timestamp]}
+        {"d": [dlat_e6, dlon_e6, speed_e1, heading, timestamp]}
+    """
+
+    COORD_SCALE = 1_000_000
+    SPEED_SCALE = 10
+
+    def __init__(self, websocket: WebSocket, shaping: TrackShaping, **kwargs):
+        self.shaping = shaping
+        self.min_interval = (shaping.min_interval_ms or 0) / 1000
+        # last position that passed the filter (and when)
+        self._last_accepted: dict | None = None
+        self._last_accepted_at: float | None = None
+        # newest position held back by the rate cap, sent when the interval elapses
+        self._trailing: tuple[str, Frame] | None = None
+        self._trailing_handle: asyncio.TimerHandle | None = None
+        # last quantized lat/lon actually written to the socket
+        self._last_sent_e6: tuple[int, int] | None = None
+        super().__init__(websocket, **kwargs)
+
+    def push(self, vehicle_id: str, frame: Frame) -> bool:
+        data = frame.data
+        if data is None or "latitude" not in data or "longitude" not in data:
+            return not self.is_stale()
+        if not self._significant(data):
+            return not self.is_stale()
+
+        now = time.monotonic()
+        if (
+            self.min_interval
+            and self._last_accepted_at is not None
+            and now - self._last_accepted_at < self.min_interval
+        ):
+            self._hold(vehicle_id, frame, self._last_accepted_at + self.min_interval - now)
+            return not self.is_stale()
+
+        self._last_accepted = data
+        self._last_accepted_at = now
+        self._trailing = None
+        if self.shaping.delta:
+            return self._enqueue(data)
+        payload = frame.binary if self.binary else frame.text
+        if payload is None:
+            return not self.is_stale()
+        return self._enqueue(payload)
+
+    def _significant(self, data: dict) -> bool:
+        last = self._last_accepted
+        shaping = self.shaping
+        if last is None or (shaping.min_distance_m is None and shaping.min_heading_deg is None):
+            return True
+
+        if shaping.min_distance_m is not None:
+            moved = haversine_distance(
+                last["latitude"], last["longitude"], data["latitude"], data["longitude"]
+            )
+            if moved >= shaping.min_distance_m:
+                return True
+
+        if shaping.min_heading_deg is not None:
+            h1, h2 = last.get("heading"), data.get("heading")
+            if h1 is not None and h2 is not None and heading_difference(h1, h2) >= shaping.min_heading_deg:
+                return True
+
+        return False
+
+    def _hold(self, vehicle_id: str, frame: Frame, delay: float):
+        self._trailing = (vehicle_id, frame)
+        if self._trailing_handle is None:
+            loop = asyncio.get_running_loop()
+            self._trailing_handle = loop.call_later(delay, self._release_trailing)
+
+    def _release_trailing(self):
+        self._trailing_handle = None
+        if self._trailing is not None:
+            vehicle_id, frame = self._trailing
+            self._trailing = None
+            self.push(vehicle_id, frame)
+
+    def _encode(self, item: Any) -> str:
+        if not self.shaping.delta:
+            # full frames are already text
+            return item
+
+        lat = round(item["latitude"] * self.COORD_SCALE)
+        lon = round(item["longitude"] * self.COORD_SCALE)
+        speed = item.get("speed")
+        heading = item.get("heading")
+        tail = [
+            round(speed * self.SPEED_SCALE) if speed is not None else None,
+            round(heading) % 360 if heading is not None else None,
+            item.get("timestamp"),
+        ]
+
+        last = self._last_sent_e6
+        self._last_sent_e6 = (lat, lon)
+        if last is None:
+            return orjson.dumps({"k": [lat, lon, *tail]}).decode()
+        return orjson.dumps({"d": [lat - last[0], lon - last[1], *tail]}).decode()
+
+    def close(self):
+        if self._trailing_handle is not None:
+            self._trailing_handle.cancel()
+            self._trailing_handle = None
+        super().close()
+
+
+class FleetSender:
+    """Coalesces updates for many vehicles and flushes them as one frame per interval"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        interval: float = config.WS_FLEET_BATCH_INTERVAL,
+        evict_after: float = config.WS_SLOW_CLIENT_TIMEOUT,
+    ):
+        self.websocket = websocket
+        self.interval = interval
+        self.evict_after = evict_after
+        self.vehicle_ids: Set[str] = set()
+        # [min_lon, min_lat, max_lon, max_lat] when watching an area
+        self.bbox: tuple[float, float, float, float] | None = None
+        # latest pre-encoded position per vehicle since the last flush
+        self.pending: Dict[str, str] = {}
+        self.sending_since: float | None = None
+        self.task = asyncio.create_task(self._run())
+
+    def push(self, vehicle_id: str, frame: Frame) -> bool:
+        """Stage the newest position; returns False once the client should be evicted"""
+        if self.task.done():
+            return False
+        self.pending[vehicle_id] = frame.text
+        return not self.is_stale()
+
+    def push_event(self, text: str) -> bool:
+        """Typed events are not part of fleet batches"""
+        return not self.is_stale()
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if self.bbox is None:
+            return False
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        return min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
+
+    def is_stale(self) -> bool:
+        return (
+            self.sending_since is not None
+            and time.monotonic() - self.sending_since > self.evict_after
+        )
+
+    async def send_json(self, message: dict):
+        """Send a control reply outside the batch cycle"""
+        await self.websocket.send_text(orjson.dumps(message).decode())
+
+    async def _run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if not self.pending:
+                    continue
+                updates, self.pending = self.pending, {}
+                # Splice the already-encoded positions into one frame without re-parsing them
+                body = ",".join(
+                    f"{orjson.dumps(vid).decode()}:{text}" for vid, text in updates.items()
+                )
+                self.sending_since = time.monotonic()
+                await self.websocket.send_text(f'{{"type":"updates","vehicles":{{{body}}}}}')
+                self.sending_since = None
+        except (WebSocketDisconnect, RuntimeError) as e:
+            logger.debug("Fleet socket closed while sending: %r", e)
+
+    def close(self):
+        self.task.cancel()
+
 
 class ConnectionManager:
     """Manages WebSocket connections and Redis Pub/Sub subscriptions"""
-    
+
     def __init__(self):
         # Track active connections by vehicle_id
         self.active_connections: Dict[str, Set[WebSocket]] = {}
-        # Track Redis pubsub subscriptions
-        self.pubsubs: Dict[str, Any] = {}
-        # Background tasks for pubsub listeners
-        self.pubsub_tasks: Dict[str, asyncio.Task] = {}
-    
-    async def connect(self, websocket: WebSocket, vehicle_id: str):
+        # Outbound queue + writer per connection
+        self.senders: Dict[WebSocket, ClientSender | ShapedSender | FleetSender] = {}
+        # Fleet connections watching a bounding box
+        self.area_viewers: Set[WebSocket] = set()
+        # Vehicles whose channel is subscribed on the shared pubsub connection
+        self.subscribed: Set[str] = set()
+        # Whether the all-vehicles pattern is subscribed (for bounding boxes)
+        self.pattern_subscribed = False
+        # Single process-wide pubsub and its listener task
+        self._pubsub: Any = None
+        self._listener_task: asyncio.Task | None = None
+        self._has_subscriptions = asyncio.Event()
+        self._pubsub_lock = asyncio.Lock()
+        # Pub/sub messages consumed by this worker (reported in cluster heartbeats)
+        self.messages_received = 0
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        vehicle_id: str,
+        shaping: TrackShaping | None = None,
+        binary: bool = False,
+        subprotocol: str | None = None,
+    ):
         """Accept a WebSocket connection"""
+        await websocket.accept(subprotocol=subprotocol)
+        if shaping is not None and shaping.enabled:
+            self.senders[websocket] = ShapedSender(websocket, shaping, binary=binary)
+        else:
+            self.senders[websocket] = ClientSender(websocket, binary=binary)
+        await self.add_viewer(websocket, vehicle_id)
+
+    async def connect_fleet(self, websocket: WebSocket) -> FleetSender:
+        """Accept a multi-vehicle WebSocket connection"""
         await websocket.accept()
-        if vehicle_id not in self.active_connections:
-            self.active_connections[vehicle_id] = set()
-        self.active_connections[vehicle_id].add(websocket)
-    
-    def disconnect(self, websocket: WebSocket, vehicle_id: str):
+        sender = FleetSender(websocket)
+        self.senders[websocket] = sender
+        return sender
+
+    async def add_viewer(self, websocket: WebSocket, vehicle_id: str):
+        """Start delivering a vehicle's updates to a connection"""
+        await self.add_viewers(websocket, [vehicle_id])
+
+    async def add_viewers(self, websocket: WebSocket, vehicle_ids):
+        """Start delivering several vehicles' updates to a connection (one SUBSCRIBE)"""
+        sender = self.senders[websocket]
+        for vehicle_id in vehicle_ids:
+            sender.vehicle_ids.add(vehicle_id)
+            self.active_connections.setdefault(vehicle_id, set()).add(websocket)
+        await self.subscribe_to_vehicles(vehicle_ids)
+
+    async def remove_viewer(self, websocket: WebSocket, vehicle_id: str):
+        """Stop delivering a vehicle's updates to a connection"""
+        await self.remove_viewers(websocket, [vehicle_id])
+
+    async def remove_viewers(self, websocket: WebSocket, vehicle_ids):
+        """Stop delivering several vehicles' updates to a connection (one UNSUBSCRIBE)"""
+        sender = self.senders.get(websocket)
+        unwatched = []
+        for vehicle_id in vehicle_ids:
+            if sender is not None:
+                sender.vehicle_ids.discard(vehicle_id)
+            if vehicle_id in self.active_connections:
+                self.active_connections[vehicle_id].discard(websocket)
+                if not self.active_connections[vehicle_id]:
+                    del self.active_connections[vehicle_id]
+                    unwatched.append(vehicle_id)
+        # Drop the channels once nobody watches these vehicles anymore
+        await self.unsubscribe_from_vehicles(unwatched)
+
+    async def set_area(self, websocket: WebSocket, bbox: tuple[float, float, float, float] | None):
+        """Watch every vehicle inside a bounding box, or stop when bbox is None"""
+        sender = self.senders[websocket]
+        sender.bbox = bbox
+        if bbox is None:
+            self.area_viewers.discard(websocket)
+            if not self.area_viewers:
+                await self._set_pattern(False)
+        else:
+            self.area_viewers.add(websocket)
+            await self._set_pattern(True)
+
+    async def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
-        if vehicle_id in self.active_connections:
-            self.active_connections[vehicle_id].discard(websocket)
-            if not self.active_connections[vehicle_id]:
-                del self.active_connections[vehicle_id]
-                # Clean up pubsub if no more connections
-                if vehicle_id in self.pubsub_tasks:
-                    self.pubsub_tasks[vehicle_id].cancel()
-                    del self.pubsub_tasks[vehicle_id]
-                if vehicle_id in self.pubsubs:
-                    try:
-                        self.pubsubs[vehicle_id].close()
-                    except:
-                        pass
-                    del self.pubsubs[vehicle_id]
-    
+        sender = self.senders.pop(websocket, None)
+        if sender is None:
+            return
+        sender.close()
+        await self.remove_viewers(websocket, list(sender.vehicle_ids))
+        if websocket in self.area_viewers:
+            self.area_viewers.discard(websocket)
+            if not self.area_viewers:
+                await self._set_pattern(False)
+
+    def stats(self) -> Dict[str, int]:
+        """Connection counts for this worker"""
+        return {
+            "connections": len(self.senders),
+            "viewers": sum(len(connections) for connections in self.active_connections.values()),
+            "vehicles": len(self.subscribed),
+            "area_viewers": len(self.area_viewers),
+            "messages_received": self.messages_received,
+        }
+
     def set_redis(self, redis_client):
-        """Set Redis client (called from main.py lifespan)."""
+        """Set asyncio Redis client (called from main.py lifespan)."""
         self._redis_client = redis_client
 
     def _redis(self):
@@ -54,86 +515,244 @@ class ConnectionManager:
         speed: float = None,
         heading: float = None,
         accuracy: float = None,
-        timestamp: str = None
+        timestamp: str = None,
+        store: bool = True
     ):
-        """Update vehicle location in Redis and publish to Pub/Sub"""
+        """Update vehicle location in Redis and publish to Pub/Sub
+
+        With store=False the latest-location key is left alone; the Kafka
+        consumer owns it in that mode. The odometer and geofence stages write
+        the vehicle's odometer and swap its station membership in the same
+        round trip; arrived / departed events carry the odometer reading.
+        """
         redis_client = self._redis()
         if redis_client is None:
             raise RuntimeError("Redis not set on WebSocket manager; ensure lifespan runs first")
-        
-        location_data = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "timestamp": timestamp
-        }
-        if speed is not None:
-            location_data["speed"] = speed
-        if heading is not None:
-            location_data["heading"] = heading
-        if accuracy is not None:
-            location_data["accuracy"] = accuracy
-        
-        # Store in Redis
-        location_key = f"vehicle:{vehicle_id}:location"
-        redis_client.set(location_key, json.dumps(location_data), ex=3600)  # Expire after 1 hour
-        
-        # Publish to Redis channel
-        channel = f"vehicle:{vehicle_id}:updates"
-        redis_client.publish(channel, json.dumps(location_data))
-    
+
+        payload = orjson.dumps(
+            location_message(latitude, longitude, speed, heading, accuracy, timestamp)
+        )
+        odometer_m = await odometer.advance(redis_client, vehicle_id, latitude, longitude, accuracy, timestamp)
+        station_id = await geofence.resolve(redis_client, vehicle_id, latitude, longitude)
+
+        # Store in Redis, publish to the vehicle channel, write the odometer and swap station membership in one round trip
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if store:
+                pipe.set(location_key(vehicle_id), payload, ex=LOCATION_TTL)  # Expire after 1 hour
+            pipe.publish(vehicle_channel(vehicle_id), payload)
+            odometer.queue_write(pipe, vehicle_id)
+            if station_id is not None:
+                geofence.queue_membership(pipe, vehicle_id, station_id)
+            results = await pipe.execute()
+
+        if station_id is not None:
+            await geofence.publish_transitions(
+                redis_client, vehicle_id, results[-1], station_id, latitude, longitude, timestamp, odometer_m
+            )
+
     async def broadcast_to_vehicle(self, vehicle_id: str, message: dict):
         """Broadcast a message to all WebSocket connections for a vehicle"""
-        if vehicle_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[vehicle_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
-            
-            # Remove disconnected connections
-            for conn in disconnected:
-                self.active_connections[vehicle_id].discard(conn)
-    
+        await self.broadcast_text(vehicle_id, orjson.dumps(message).decode())
+
+    async def broadcast_text(self, vehicle_id: str, text: str):
+        """Queue one pre-encoded frame for every viewer of a vehicle without awaiting sends"""
+        connections = self.active_connections.get(vehicle_id)
+        if connections:
+            await self._deliver(connections, vehicle_id, Frame(text))
+
+    async def broadcast_event(self, vehicle_id: str, text: str):
+        """Queue a typed event for every viewer of a vehicle"""
+        connections = self.active_connections.get(vehicle_id)
+        if not connections:
+            return
+        evicted = []
+        for connection in connections:
+            sender = self.senders.get(connection)
+            if sender is not None and not sender.push_event(text):
+                evicted.append(connection)
+        await self._evict(evicted)
+
+    async def broadcast_area(self, vehicle_id: str, text: str):
+        """Deliver a position to fleet connections whose bounding box contains it"""
+        frame = Frame(text)
+        location = frame.data
+        try:
+            latitude, longitude = location["latitude"], location["longitude"]
+        except (KeyError, TypeError):
+            return
+
+        direct = self.active_connections.get(vehicle_id, ())
+        connections = [
+            ws for ws in self.area_viewers
+            if ws not in direct and self.senders[ws].contains(latitude, longitude)
+        ]
+        if connections:
+            await self._deliver(connections, vehicle_id, frame)
+
+    async def _deliver(self, connections, vehicle_id: str, frame: Frame):
+        evicted = []
+        for connection in connections:
+            sender = self.senders.get(connection)
+            if sender is not None and not sender.push(vehicle_id, frame):
+                evicted.append(connection)
+
+        await self._evict(evicted)
+
+    async def _evict(self, evicted):
+        # Drop viewers that stayed behind too long or whose writer died
+        for connection in evicted:
+            await self.disconnect(connection)
+            asyncio.create_task(self._close_quietly(connection))
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=status.WS_1013_TRY_AGAIN_LATER), timeout=1.0
+            )
+        except Exception:
+            pass
+
     async def subscribe_to_vehicle(self, vehicle_id: str):
-        """Subscribe to Redis Pub/Sub channel for a vehicle and broadcast updates"""
-        if vehicle_id in self.pubsub_tasks:
+        """Add the vehicle channel to the shared Redis subscriber"""
+        await self.subscribe_to_vehicles([vehicle_id])
+
+    async def subscribe_to_vehicles(self, vehicle_ids):
+        """Add several vehicle channels to the shared Redis subscriber in one round trip"""
+        if all(vehicle_id in self.subscribed for vehicle_id in vehicle_ids):
             # Already subscribed
             return
-        
+
+        redis_client = self._redis()
+        if redis_client is None:
+            raise RuntimeError("Redis not set on WebSocket manager; ensure lifespan runs first")
+
+        async with self._pubsub_lock:
+            new_ids = [vehicle_id for vehicle_id in dict.fromkeys(vehicle_ids) if vehicle_id not in self.subscribed]
+            if not new_ids:
+                return
+            if self._pubsub is None:
+                self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(*(vehicle_channel(vehicle_id) for vehicle_id in new_ids))
+            self.subscribed.update(new_ids)
+            self._has_subscriptions.set()
+
+        self._ensure_listener()
+
+    async def unsubscribe_from_vehicle(self, vehicle_id: str):
+        """Remove the vehicle channel from the shared Redis subscriber"""
+        await self.unsubscribe_from_vehicles([vehicle_id])
+
+    async def unsubscribe_from_vehicles(self, vehicle_ids):
+        """Remove several vehicle channels from the shared Redis subscriber in one round trip"""
+        if not any(vehicle_id in self.subscribed for vehicle_id in vehicle_ids):
+            return
+        async with self._pubsub_lock:
+            old_ids = [vehicle_id for vehicle_id in dict.fromkeys(vehicle_ids) if vehicle_id in self.subscribed]
+            if not old_ids:
+                return
+            self.subscribed.difference_update(old_ids)
+            self._sync_has_subscriptions()
+            try:
+                await self._pubsub.unsubscribe(*(vehicle_channel(vehicle_id) for vehicle_id in old_ids))
+            except Exception:
+                logger.warning("Failed to unsubscribe from %d vehicles", len(old_ids), exc_info=True)
+
+    async def _set_pattern(self, enabled: bool):
+        """Toggle the all-vehicles pattern used by bounding-box viewers"""
+        if enabled == self.pattern_subscribed:
+            return
+
         redis_client = self._redis()
         if redis_client is None:
             raise RuntimeError("Redis not set on WebSocket manager; ensure lifespan runs first")
-        channel = f"vehicle:{vehicle_id}:updates"
-        pubsub = redis_client.pubsub()
-        pubsub.subscribe(channel)
-        self.pubsubs[vehicle_id] = pubsub
-        
-        async def listen_and_broadcast():
-            """Listen to Redis messages and broadcast to WebSocket clients"""
+
+        async with self._pubsub_lock:
+            if enabled == self.pattern_subscribed:
+                return
+            if self._pubsub is None:
+                self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pattern = vehicle_channel("*")
             try:
-                while True:
-                    # Use get_message with timeout in a loop
-                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                    if message and message.get('type') == 'message':
-                        try:
-                            data = json.loads(message['data'])
-                            await self.broadcast_to_vehicle(vehicle_id, data)
-                        except (json.JSONDecodeError, KeyError):
-                            continue
-                    # Small sleep to prevent busy waiting
-                    await asyncio.sleep(0.1)
+                if enabled:
+                    await self._pubsub.psubscribe(pattern)
+                else:
+                    await self._pubsub.punsubscribe(pattern)
+            except Exception:
+                logger.warning("Failed to toggle vehicle pattern subscription", exc_info=True)
+                if enabled:
+                    raise
+            self.pattern_subscribed = enabled
+            self._sync_has_subscriptions()
+
+        if enabled:
+            self._ensure_listener()
+
+    def _sync_has_subscriptions(self):
+        if self.subscribed or self.pattern_subscribed:
+            self._has_subscriptions.set()
+        else:
+            self._has_subscriptions.clear()
+
+    def _ensure_listener(self):
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen_and_broadcast())
+
+    async def _listen_and_broadcast(self):
+        """Read every subscribed channel off one connection and fan out by vehicle"""
+        while True:
+            try:
+                if not self._has_subscriptions.is_set():
+                    await self._has_subscriptions.wait()
+                    continue
+
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if not message:
+                    continue
+
+                vehicle_id = channel_vehicle_id(message['channel'])
+                if vehicle_id is None:
+                    continue
+                self.messages_received += 1
+
+                # Payload is already the JSON frame viewers receive; forward as-is
+                if message['data'].startswith(EVENT_PREFIX):
+                    # typed events go to direct viewers only, never into area batches
+                    if message.get('type') == 'message':
+                        await self.broadcast_event(vehicle_id, message['data'])
+                elif message.get('type') == 'message':
+                    await self.broadcast_text(vehicle_id, message['data'])
+                elif message.get('type') == 'pmessage':
+                    await self.broadcast_area(vehicle_id, message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Vehicle pubsub listener failed; retrying")
+                await asyncio.sleep(1.0)
+
+    async def close(self):
+        """Stop the shared subscriber (called from main.py lifespan)"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
             except asyncio.CancelledError:
-                try:
-                    pubsub.unsubscribe(channel)
-                    pubsub.close()
-                except Exception:
-                    pass
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
             except Exception:
                 pass
-        
-        task = asyncio.create_task(listen_and_broadcast())
-        self.pubsub_tasks[vehicle_id] = task
+            self._pubsub = None
+        for sender in self.senders.values():
+            sender.close()
+        self.senders.clear()
+        self.area_viewers.clear()
+        self.subscribed.clear()
+        self.pattern_subscribed = False
+        self._has_subscriptions.clear()
 
 
 # Global connection manager instance
@@ -1,45 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-import math
 import json
+import redis
 
 from fastapi import Request
 from auth.simple.security import get_current_user, require_role, get_db
 from auth.simple.schemas import UserRole
 from common.models import Station, User
-from core.dependencies import get_redis
+from core.dependencies import get_redis, get_sync_redis
+from services.station_index import station_index, publish_station_invalidation
+from services.websocket_manager import location_key
 from .schemas import StationCreate, StationUpdate, StationResponse, VehicleAtStationCheck
 
 router = APIRouter(prefix="/stations", tags=["stations"])
 
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate the distance between two coordinates using the Haversine formula.
-    Returns distance in meters.
-    """
-    R = 6371000  # Earth's radius in meters
-    
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-    
-    a = math.sin(delta_phi / 2) ** 2 + \
-        math.cos(phi1) * math.cos(phi2) * \
-        math.sin(delta_lambda / 2) ** 2
-    
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    
-    distance = R * c
-    return distance
-
-
 @router.post("", response_model=StationResponse, status_code=status.HTTP_201_CREATED)
 def create_station(
     station_data: StationCreate,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Create a new station (Admin only)"""
@@ -48,6 +29,9 @@ def create_station(
     db.commit()
     db.refresh(new_station)
     
+    # Add it to the station index on every worker
+    publish_station_invalidation(redis_client, new_station.id)
+    
     return new_station
 
 
@@ -84,6 +68,7 @@ def update_station(
     station_id: str,
     station_data: StationUpdate,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Update a station (Admin only)"""
@@ -101,6 +86,9 @@ def update_station(
     db.commit()
     db.refresh(station)
     
+    # Re-index the station on every worker
+    publish_station_invalidation(redis_client, station_id)
+    
     return station
 
 
@@ -108,6 +96,7 @@ def update_station(
 def delete_station(
     station_id: str,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Delete a station (Admin only)"""
@@ -121,24 +110,26 @@ def delete_station(
     db.delete(station)
     db.commit()
     
+    # Drop it from the station index on every worker
+    publish_station_invalidation(redis_client, station_id)
+    
     return None
 
 
 @router.get("/check/{vehicle_id}/at-station", response_model=VehicleAtStationCheck)
-def check_vehicle_at_station(
+async def check_vehicle_at_station(
     vehicle_id: str,
     request: Request,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Check if a vehicle is currently at any station based on its real-time location.
-    Uses Redis to get current vehicle location and calculates distance to all stations.
+    Uses Redis to get current vehicle location and the in-memory station grid
+    index, so only stations near the vehicle are measured.
     """
     # Get vehicle's current location from Redis
     redis_client = get_redis(request)
-    location_key = f"vehicle:{vehicle_id}:location"
-    location_data = redis_client.get(location_key)
+    location_data = await redis_client.get(location_key(vehicle_id))
     
     if not location_data:
         raise HTTPException(
@@ -163,25 +154,11 @@ def check_vehicle_at_station(
             detail="Invalid vehicle location data"
         )
     
-    # Get all stations
-    stations = db.query(Station).all()
-    
-    # Check distance to each station
-    closest_station = None
-    closest_distance = float('inf')
-    
-    for station in stations:
-        distance = calculate_distance(
-            vehicle_lat, vehicle_lon,
-            station.latitude, station.longitude
-        )
-        
-        # Check if vehicle is within station's radius
-        if distance <= station.radius and distance < closest_distance:
-            closest_station = station
-            closest_distance = distance
+    # Closest station whose radius contains the vehicle, from nearby grid cells only
+    match = await station_index.locate(vehicle_lat, vehicle_lon)
     
-    if closest_station:
+    if match:
+        closest_station, closest_distance = match
         return VehicleAtStationCheck(
             vehicle_id=vehicle_id,
             is_at_station=True,
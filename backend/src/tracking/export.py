@@ -0,0 +1,58 @@
+"""
+Streaming tracking exports (NDJSON / CSV) with constant memory.
+
+Rows come from a server-side cursor (yield_per) on a session owned by the
+generator, because the request's own session is closed before a
+StreamingResponse body starts. Only one batch is held at a time and each batch
+is encoded into a single chunk.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+import orjson
+from sqlalchemy import Select
+
+from core.db import AsyncSessionLocal
+from .queries import EXPORT_COLUMNS
+
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def stream_rows(query: Select, batch_size: int) -> AsyncIterator[Sequence[tuple]]:
+    """Batches of row tuples from a server-side cursor"""
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+
+def encode_ndjson(rows: Sequence[tuple]) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in rows)
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_csv(rows: Sequence[tuple], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+async def export_chunks(query: Select, export_format: str, batch_size: int) -> AsyncIterator[bytes]:
+    """Encoded chunks for StreamingResponse, one per fetched batch"""
+    if export_format == "csv":
+        yield encode_csv((), header=True)
+    async for rows in stream_rows(query, batch_size):
+        yield encode_ndjson(rows) if export_format == "ndjson" else encode_csv(rows)
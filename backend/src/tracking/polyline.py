@@ -0,0 +1,30 @@
+"""
+Google encoded polyline format, vectorized with NumPy.
+
+https://developers.google.com/maps/documentation/utilities/polylinealgorithm
+"""
+import numpy as np
+
+# zigzagged deltas fit in 32 bits at precision 5/6, i.e. at most 7 five-bit chunks
+_SHIFTS = np.arange(0, 35, 5, dtype=np.int64)
+
+
+def encode_polyline(latitudes, longitudes, precision: int = 5) -> str:
+    """Encode a coordinate sequence as a polyline string"""
+    coords = np.column_stack((
+        np.asarray(latitudes, dtype=np.float64),
+        np.asarray(longitudes, dtype=np.float64),
+    ))
+    if not coords.size:
+        return ""
+
+    scaled = np.round(coords * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = (deltas << 1) ^ (deltas >> 63)
+
+    shifted = values[:, None] >> _SHIFTS
+    lengths = 1 + np.count_nonzero(shifted[:, 1:], axis=1)
+    position = np.arange(_SHIFTS.size)
+    chunks = (shifted & 0x1F) | np.where(position < (lengths - 1)[:, None], 0x20, 0)
+    chunks += 63
+    return chunks[position < lengths[:, None]].astype(np.uint8).tobytes().decode("ascii")
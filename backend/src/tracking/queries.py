@@ -0,0 +1,256 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Select, String, cast, column, func, select, desc, true, values
+from sqlalchemy.orm import aliased
+from geoalchemy2 import Geography
+
+from common.models import LiveTracking, TrackingRollup
+from core.const import AggregateInterval
+from core.geo import geography_point
+
+# Columns covered by ix_live_tracking_vehicle_id_timestamp; selecting only these
+# lets Postgres answer from the index without touching the heap.
+ROUTE_COLUMNS = (
+    LiveTracking.latitude,
+    LiveTracking.longitude,
+    LiveTracking.timestamp,
+    LiveTracking.speed,
+)
+
+# Playback columns for the compact history formats; all covered by the same index.
+HISTORY_COLUMNS = (
+    LiveTracking.timestamp,
+    LiveTracking.latitude,
+    LiveTracking.longitude,
+    LiveTracking.speed,
+    LiveTracking.heading,
+)
+
+# Every live_tracking column, in CSV/NDJSON field order for exports.
+EXPORT_COLUMNS = (
+    LiveTracking.id,
+    LiveTracking.vehicle_id,
+    LiveTracking.driver_id,
+    LiveTracking.timestamp,
+    LiveTracking.latitude,
+    LiveTracking.longitude,
+    LiveTracking.speed,
+    LiveTracking.heading,
+    LiveTracking.accuracy,
+    LiveTracking.created_at,
+)
+
+# Rollup fields served by history at minute/hour resolution.
+ROLLUP_COLUMNS = (
+    TrackingRollup.bucket,
+    TrackingRollup.last_timestamp,
+    TrackingRollup.last_latitude,
+    TrackingRollup.last_longitude,
+    TrackingRollup.avg_speed,
+    TrackingRollup.max_speed,
+    TrackingRollup.distance_m,
+    TrackingRollup.point_count,
+)
+
+
+ROLLUP_SPANS = {
+    AggregateInterval.MINUTE: timedelta(minutes=1),
+    AggregateInterval.HOUR: timedelta(hours=1),
+}
+
+
+def latest_point_query(vehicle_id: str) -> Select:
+    """Newest row for a vehicle: one descending probe of the composite index"""
+    return (
+        select(LiveTracking)
+        .where(LiveTracking.vehicle_id == vehicle_id)
+        .order_by(desc(LiveTracking.timestamp))
+        .limit(1)
+    )
+
+
+def latest_points_query(vehicle_ids: List[str]) -> Select:
+    """Newest row per vehicle via LATERAL, so each id is one index probe"""
+    ids = values(column("id", String), name="ids").data([(vehicle_id,) for vehicle_id in vehicle_ids])
+    latest = (
+        select(LiveTracking)
+        .where(LiveTracking.vehicle_id == ids.c.id)
+        .order_by(desc(LiveTracking.timestamp))
+        .limit(1)
+        .lateral()
+    )
+    return select(aliased(LiveTracking, latest)).select_from(ids).join(latest, true())
+
+
+def history_query(vehicle_id: str, start_time: datetime, end_time: datetime, limit: int) -> Select:
+    """Full rows in a time range, read in index order (no sort)"""
+    return (
+        select(LiveTracking)
+        .where(
+            LiveTracking.vehicle_id == vehicle_id,
+            LiveTracking.timestamp >= start_time,
+            LiveTracking.timestamp <= end_time
+        )
+        .order_by(LiveTracking.timestamp.asc())
+        .limit(limit)
+    )
+
+
+def history_columns_query(vehicle_id: str, start_time: datetime, end_time: datetime, limit: int) -> Select:
+    """HISTORY_COLUMNS tuples in a time range; index-only, no ORM entities"""
+    return (
+        select(*HISTORY_COLUMNS)
+        .where(
+            LiveTracking.vehicle_id == vehicle_id,
+            LiveTracking.timestamp >= start_time,
+            LiveTracking.timestamp <= end_time
+        )
+        .order_by(LiveTracking.timestamp.asc())
+        .limit(limit)
+    )
+
+
+def rollup_query(
+    vehicle_id: str,
+    resolution: AggregateInterval,
+    start_time: datetime,
+    end_time: datetime,
+    limit: int
+) -> Select:
+    """ROLLUP_COLUMNS tuples for buckets overlapping a time range (primary key range scan)"""
+    return (
+        select(*ROLLUP_COLUMNS)
+        .where(
+            TrackingRollup.vehicle_id == vehicle_id,
+            TrackingRollup.resolution == resolution.value,
+            TrackingRollup.bucket > start_time - ROLLUP_SPANS[resolution],
+            TrackingRollup.bucket <= end_time
+        )
+        .order_by(TrackingRollup.bucket.asc())
+        .limit(limit)
+    )
+
+
+def vehicles_within_query(latitude: float, longitude: float, radius_m: float, since: datetime) -> Select:
+    """Vehicles whose latest point (seen since `since`) lies within radius_m, nearest first
+
+    GiST finds vehicles with any recent point in range; each candidate's
+    latest point is then re-checked so vehicles that already left drop out.
+    """
+    point = geography_point(latitude, longitude)
+    candidates = (
+        select(LiveTracking.vehicle_id)
+        .where(
+            LiveTracking.timestamp >= since,
+            func.ST_DWithin(LiveTracking.location, point, radius_m)
+        )
+        .distinct()
+        .cte("candidates")
+    )
+    latest = (
+        select(
+            LiveTracking.vehicle_id,
+            LiveTracking.latitude,
+            LiveTracking.longitude,
+            LiveTracking.speed,
+            LiveTracking.heading,
+            LiveTracking.timestamp,
+            LiveTracking.location
+        )
+        .where(LiveTracking.vehicle_id == candidates.c.vehicle_id)
+        .order_by(desc(LiveTracking.timestamp))
+        .limit(1)
+        .lateral("latest")
+    )
+    distance = func.ST_Distance(latest.c.location, point)
+    return (
+        select(
+            latest.c.vehicle_id,
+            latest.c.latitude,
+            latest.c.longitude,
+            latest.c.speed,
+            latest.c.heading,
+            latest.c.timestamp,
+            distance.label("distance_m")
+        )
+        .select_from(candidates)
+        .join(latest, true())
+        .where(func.ST_DWithin(latest.c.location, point, radius_m))
+        .order_by(distance)
+    )
+
+
+def points_within_query(
+    polygon_geojson: str,
+    start_time: datetime,
+    end_time: datetime,
+    limit: int,
+    vehicle_id: Optional[str] = None
+) -> Select:
+    """Tracking rows inside a GeoJSON polygon in a time range (GiST ST_Covers)"""
+    area = cast(func.ST_GeomFromGeoJSON(polygon_geojson), Geography(srid=4326))
+    query = select(LiveTracking).where(
+        func.ST_Covers(area, LiveTracking.location),
+        LiveTracking.timestamp >= start_time,
+        LiveTracking.timestamp <= end_time
+    )
+    if vehicle_id is not None:
+        query = query.where(LiveTracking.vehicle_id == vehicle_id)
+    return query.order_by(LiveTracking.timestamp.asc()).limit(limit)
+
+
+def export_query(vehicle_id: Optional[str], start_time: datetime, end_time: datetime) -> Select:
+    """EXPORT_COLUMNS tuples for one vehicle (or the whole fleet) in time order"""
+    query = select(*EXPORT_COLUMNS).where(
+        LiveTracking.timestamp >= start_time,
+        LiveTracking.timestamp <= end_time
+    )
+    if vehicle_id is not None:
+        query = query.where(LiveTracking.vehicle_id == vehicle_id)
+    return query.order_by(LiveTracking.timestamp.asc())
+
+
+def route_query(
+    vehicle_id: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None
+) -> Select:
+    """Route columns only, so the range scan is index-only"""
+    query = select(*ROUTE_COLUMNS).where(LiveTracking.vehicle_id == vehicle_id)
+    if start_time is not None:
+        query = query.where(LiveTracking.timestamp >= start_time)
+    if end_time is not None:
+        query = query.where(LiveTracking.timestamp <= end_time)
+    return query.order_by(LiveTracking.timestamp.asc())
+
+
+def path_distance_query(vehicle_id: str, start_time: datetime, end_time: datetime) -> Select:
+    """Meters driven between two times: sum of consecutive point distances (index-only)"""
+    point = geography_point(LiveTracking.latitude, LiveTracking.longitude)
+    steps = (
+        select(
+            func.ST_Distance(point, func.lag(point).over(order_by=LiveTracking.timestamp)).label("step_m")
+        )
+        .where(
+            LiveTracking.vehicle_id == vehicle_id,
+            LiveTracking.timestamp >= start_time,
+            LiveTracking.timestamp <= end_time
+        )
+        .subquery()
+    )
+    return select(func.coalesce(func.sum(steps.c.step_m), 0.0))
+
+
+def recent_speeds_query(vehicle_id: str, since: datetime, limit: int = 1000) -> Select:
+    """(timestamp, speed) of a vehicle's points since a time, newest first (index-only)"""
+    return (
+        select(LiveTracking.timestamp, LiveTracking.speed)
+        .where(
+            LiveTracking.vehicle_id == vehicle_id,
+            LiveTracking.timestamp >= since,
+            LiveTracking.speed.is_not(None)
+        )
+        .order_by(LiveTracking.timestamp.desc())
+        .limit(limit)
+    )
@@ -1,34 +1,285 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import Optional, List
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional, List, Sequence
+from datetime import datetime, timedelta, timezone
+import logging
+import math
 
-from auth.simple.security import get_current_user, get_db
+import numpy as np
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from auth.simple.schemas import UserRole
+from auth.simple.security import get_current_user_async, has_role
 from common.models import LiveTracking, Vehicle, Travel, User
-from .schemas import LiveTrackingResponse, RouteResponse, LiveTrackingCreate, RoutePoint
+from core.config import config
+from core.const import AggregateInterval
+from core.dependencies import get_async_db, get_redis
+from core.repository import AsyncBaseRepository
+from services.tracking_ingest import TrackPoint, timestamp_in_window
+from services.tracking_kafka import producer
+from services.websocket_manager import LOCATION_TTL, location_key, location_message
+from .export import MEDIA_TYPES, export_chunks
+from .polyline import encode_polyline
+from .queries import (
+    latest_point_query,
+    latest_points_query,
+    history_query,
+    history_columns_query,
+    rollup_query,
+    ROLLUP_SPANS,
+    vehicles_within_query,
+    points_within_query,
+    export_query,
+    route_query,
+)
+from .simplify import simplify_indices
+from .schemas import (
+    LiveTrackingResponse,
+    RouteResponse,
+    LiveTrackingCreate,
+    RoutePoint,
+    CurrentLocationResponse,
+    CurrentLocationsResponse,
+    NearbyVehicleResponse,
+    TrackingAreaQuery,
+    TrackingRollupHistoryResponse,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tracking", tags=["tracking"])
 
+# Upper bound on ids per /tracking/current request (one MGET, one LATERAL query)
+MAX_CURRENT_VEHICLES = 1000
+
+
+def _cached_location(vehicle_id: str, raw: Optional[str]) -> Optional[CurrentLocationResponse]:
+    """Decode a vehicle:{id}:location payload; anything unusable counts as a miss"""
+    if not raw:
+        return None
+    try:
+        return CurrentLocationResponse(vehicle_id=vehicle_id, **orjson.loads(raw))
+    except (orjson.JSONDecodeError, TypeError, ValidationError):
+        return None
+
+
+async def _read_cached(redis_client: aioredis.Redis, vehicle_ids: List[str]) -> List[Optional[str]]:
+    """MGET the latest-location keys; a Redis outage reads as all misses"""
+    try:
+        return await redis_client.mget([location_key(vehicle_id) for vehicle_id in vehicle_ids])
+    except RedisError:
+        logger.warning("Redis unavailable for current locations; reading from DB", exc_info=True)
+        return [None] * len(vehicle_ids)
+
+
+async def _repopulate(redis_client: aioredis.Redis, points: Sequence[LiveTracking]) -> None:
+    """Write DB rows back to the latest-location keys in one pipeline
+
+    NX so a fresher position published by a driver meanwhile is never overwritten.
+    """
+    if not points:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for point in points:
+                payload = orjson.dumps(location_message(
+                    point.latitude,
+                    point.longitude,
+                    point.speed,
+                    point.heading,
+                    point.accuracy,
+                    point.timestamp.isoformat()
+                ))
+                pipe.set(location_key(point.vehicle_id), payload, ex=LOCATION_TTL, nx=True)
+            await pipe.execute()
+    except RedisError:
+        logger.warning("Failed to repopulate current locations in Redis", exc_info=True)
+
+
+# Slack when comparing history spans to the resolution thresholds, so a range
+# built from two clock reads (or rounded by a client) isn't bumped a level
+HISTORY_SPAN_TOLERANCE = timedelta(seconds=1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive query datetimes as UTC so spans can be compared"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _auto_resolution(start_time: datetime, end_time: datetime, limit: int) -> Optional[AggregateInterval]:
+    """Raw rows for short spans, minute then hour rollups as the span grows
+
+    Minute rollups are only picked while the span's buckets fit under limit,
+    so a zoomed-out range is never cut short.
+    """
+    span = _as_utc(end_time) - _as_utc(start_time) - HISTORY_SPAN_TOLERANCE
+    if span <= timedelta(hours=config.TRACKING_HISTORY_RAW_MAX_HOURS):
+        return None
+    if (
+        span <= timedelta(days=config.TRACKING_HISTORY_MINUTE_MAX_DAYS)
+        and _bucket_count(span, AggregateInterval.MINUTE) <= limit
+    ):
+        return AggregateInterval.MINUTE
+    return AggregateInterval.HOUR
+
+
+def _bucket_count(span: timedelta, resolution: AggregateInterval) -> int:
+    """Buckets overlapping a span (the first may start before it)"""
+    return math.ceil(span / ROLLUP_SPANS[resolution]) + 1
+
+
+def _rollup_history_body(
+    vehicle_id: str, resolution: AggregateInterval, response_format: str, rows, truncated: bool
+) -> dict:
+    """History body built from rollup tuples (see ROLLUP_COLUMNS)"""
+    (buckets, timestamps, latitudes, longitudes,
+     avg_speeds, max_speeds, distances, counts) = zip(*rows) if rows else ((),) * 8
+    body = {
+        "vehicle_id": vehicle_id,
+        "format": response_format,
+        "resolution": resolution.value,
+        "count": len(rows),
+        "truncated": truncated,
+        "start_time": timestamps[0] if rows else None,
+        "end_time": timestamps[-1] if rows else None,
+    }
+    if response_format == "polyline":
+        body["polyline"] = encode_polyline(latitudes, longitudes)
+    elif response_format == "columnar":
+        body["timestamps_ms"] = [int(ts.timestamp() * 1000) for ts in timestamps]
+        body["latitudes"] = latitudes
+        body["longitudes"] = longitudes
+        body["speeds"] = avg_speeds
+        body["max_speeds"] = max_speeds
+        body["distances_m"] = distances
+        body["point_counts"] = counts
+    else:
+        body["points"] = [
+            {
+                "bucket": bucket,
+                "timestamp": timestamp,
+                "latitude": latitude,
+                "longitude": longitude,
+                "speed": avg_speed,
+                "max_speed": max_speed,
+                "distance_m": distance,
+                "point_count": count,
+            }
+            for bucket, timestamp, latitude, longitude, avg_speed, max_speed, distance, count in rows
+        ]
+    return body
+
 
-@router.get("/vehicle/{vehicle_id}/current", response_model=LiveTrackingResponse)
-def get_current_tracking(
+@router.get("/current", response_model=CurrentLocationsResponse)
+async def get_current_locations(
+    vehicle_ids: List[str] = Query(..., description="Vehicle ids, repeated or comma-separated"),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Get the latest position of several vehicles (fleet map) in one Redis round trip"""
+    ids = list(dict.fromkeys(
+        vehicle_id.strip()
+        for value in vehicle_ids
+        for vehicle_id in value.split(",")
+        if vehicle_id.strip()
+    ))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="vehicle_ids is required"
+        )
+    if len(ids) > MAX_CURRENT_VEHICLES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_CURRENT_VEHICLES} vehicle_ids per request"
+        )
+    
+    locations = {}
+    misses = []
+    for vehicle_id, raw in zip(ids, await _read_cached(redis_client, ids)):
+        location = _cached_location(vehicle_id, raw)
+        if location is None:
+            misses.append(vehicle_id)
+        else:
+            locations[vehicle_id] = location
+    
+    # One query for every miss, then warm Redis for the next load
+    if misses:
+        points = (await db.scalars(latest_points_query(misses))).all()
+        for point in points:
+            locations[point.vehicle_id] = CurrentLocationResponse.model_validate(point)
+        await _repopulate(redis_client, points)
+    
+    return CurrentLocationsResponse(
+        locations=locations,
+        missing=[vehicle_id for vehicle_id in ids if vehicle_id not in locations]
+    )
+
+
+@router.get("/nearby", response_model=List[NearbyVehicleResponse])
+async def get_vehicles_nearby(
+    latitude: float = Query(..., ge=-90, le=90, description="Center latitude"),
+    longitude: float = Query(..., ge=-180, le=180, description="Center longitude"),
+    radius_m: float = Query(1000, gt=0, le=100000, description="Search radius in meters"),
+    max_age_s: int = Query(300, ge=1, le=86400, description="Ignore vehicles not seen for this many seconds"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Vehicles whose latest position is within radius_m of a point, nearest first"""
+    since = datetime.now(timezone.utc) - timedelta(seconds=max_age_s)
+    rows = (await db.execute(vehicles_within_query(latitude, longitude, radius_m, since))).all()
+    return [NearbyVehicleResponse(**row._mapping) for row in rows]
+
+
+@router.post("/within", response_model=List[LiveTrackingResponse])
+async def get_points_within_area(
+    query: TrackingAreaQuery,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Tracking points inside a GeoJSON polygon within a time range (default last 24 hours)"""
+    start_time = query.start_time or datetime.utcnow() - timedelta(hours=24)
+    end_time = query.end_time or datetime.utcnow()
+    
+    tracking_points = (
+        await db.scalars(points_within_query(
+            query.polygon.model_dump_json(),
+            start_time,
+            end_time,
+            query.limit,
+            query.vehicle_id
+        ))
+    ).all()
+    
+    return tracking_points
+
+
+@router.get("/vehicle/{vehicle_id}/current", response_model=CurrentLocationResponse)
+async def get_current_tracking(
     vehicle_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get the latest tracking point for a vehicle"""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    """Get the latest tracking point for a vehicle (Redis first, DB on a miss)"""
+    location = _cached_location(vehicle_id, (await _read_cached(redis_client, [vehicle_id]))[0])
+    if location is not None:
+        return location
+    
+    vehicle = await AsyncBaseRepository(db, Vehicle).get(vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
     
-    tracking = db.query(LiveTracking)\
-        .filter(LiveTracking.vehicle_id == vehicle_id)\
-        .order_by(desc(LiveTracking.timestamp))\
-        .first()
+    tracking = await db.scalar(latest_point_query(vehicle_id))
     
     if not tracking:
         raise HTTPException(
@@ -36,69 +287,178 @@ def get_current_tracking(
             detail="No tracking data found for this vehicle"
         )
     
+    await _repopulate(redis_client, [tracking])
     return tracking
 
 
 @router.get("/vehicle/{vehicle_id}/history", response_model=List[LiveTrackingResponse])
-def get_tracking_history(
+async def get_tracking_history(
     vehicle_id: str,
     start_time: Optional[datetime] = Query(None, description="Start time for tracking history"),
     end_time: Optional[datetime] = Query(None, description="End time for tracking history"),
     limit: int = Query(1000, ge=1, le=10000, description="Maximum number of points to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response_format: Literal["full", "polyline", "columnar"] = Query(
+        "full", alias="format", description="full rows, encoded polyline, or parallel arrays"
+    ),
+    resolution: Literal["auto", "raw", "minute", "hour"] = Query(
+        "auto", description="raw points or minute/hour rollups; auto picks from the time span"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get tracking history for a vehicle within a time range"""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    """Get tracking history for a vehicle within a time range
+
+    format=polyline returns the coordinates as a Google encoded polyline.
+    format=columnar returns parallel arrays (timestamps_ms, latitudes,
+    longitudes, speeds, headings). Both read index-only tuples and are
+    serialized directly, without ORM entities or pydantic models.
+
+    With format=polyline|columnar and resolution=auto, spans over
+    TRACKING_HISTORY_RAW_MAX_HOURS are served from minute rollups, and from
+    hour rollups over TRACKING_HISTORY_MINUTE_MAX_DAYS or once the minute
+    buckets would exceed limit (one point per bucket: last position,
+    average/max speed, distance, point count). format=full returns raw rows
+    unless resolution=minute|hour is asked for, in which case the body is a
+    TrackingRollupHistoryResponse. Rollup bodies set truncated when the range
+    held more than limit buckets.
+    """
+    vehicle = await AsyncBaseRepository(db, Vehicle).get(vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
     
-    query = db.query(LiveTracking).filter(LiveTracking.vehicle_id == vehicle_id)
+    # Default to last 24 hours if no time range specified
+    now = datetime.utcnow()
+    if not start_time:
+        start_time = now - timedelta(hours=24)
+    if not end_time:
+        end_time = now
+    
+    if resolution == "auto":
+        # full rows keep the List[LiveTrackingResponse] shape existing clients expect
+        rollup = None if response_format == "full" else _auto_resolution(start_time, end_time, limit)
+    else:
+        rollup = None if resolution == "raw" else AggregateInterval(resolution)
+    
+    if rollup is not None:
+        # one extra bucket tells whether the range was cut at limit
+        rows = (await db.execute(rollup_query(vehicle_id, rollup, start_time, end_time, limit + 1))).all()
+        truncated = len(rows) > limit
+        body = _rollup_history_body(vehicle_id, rollup, response_format, rows[:limit], truncated)
+        if response_format == "full":
+            return Response(
+                content=TrackingRollupHistoryResponse(**body).model_dump_json(),
+                media_type="application/json"
+            )
+        return Response(content=orjson.dumps(body), media_type="application/json")
+    
+    if response_format == "full":
+        tracking_points = (
+            await db.scalars(history_query(vehicle_id, start_time, end_time, limit))
+        ).all()
+        return tracking_points
+    
+    rows = (await db.execute(history_columns_query(vehicle_id, start_time, end_time, limit))).all()
+    timestamps, latitudes, longitudes, speeds, headings = zip(*rows) if rows else ((),) * 5
+    
+    body = {
+        "vehicle_id": vehicle_id,
+        "format": response_format,
+        "resolution": "raw",
+        "count": len(rows),
+        "start_time": timestamps[0] if rows else None,
+        "end_time": timestamps[-1] if rows else None,
+    }
+    if response_format == "polyline":
+        body["polyline"] = encode_polyline(latitudes, longitudes)
+    else:
+        body["timestamps_ms"] = [int(ts.timestamp() * 1000) for ts in timestamps]
+        body["latitudes"] = latitudes
+        body["longitudes"] = longitudes
+        body["speeds"] = speeds
+        body["headings"] = headings
+    
+    return Response(content=orjson.dumps(body), media_type="application/json")
+
+
+@router.get("/export")
+async def export_tracking(
+    vehicle_id: Optional[str] = Query(None, description="Vehicle to export; omit for the whole fleet (admin only)"),
+    start_time: Optional[datetime] = Query(None, description="Start of the export range"),
+    end_time: Optional[datetime] = Query(None, description="End of the export range"),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Stream tracking rows for audits without a row limit
+
+    Rows are read through a server-side cursor and written batch by batch,
+    so memory stays flat for a month of one vehicle or a day of the fleet.
+    """
+    if vehicle_id is None:
+        if not has_role(current_user, [UserRole.ADMIN]):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Fleet-wide export requires admin role"
+            )
+    else:
+        vehicle = await AsyncBaseRepository(db, Vehicle).get(vehicle_id)
+        if not vehicle:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vehicle not found"
+            )
     
     # Default to last 24 hours if no time range specified
     if not start_time:
         start_time = datetime.utcnow() - timedelta(hours=24)
     if not end_time:
         end_time = datetime.utcnow()
+    if _as_utc(start_time) > _as_utc(end_time):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_time must be before end_time"
+        )
     
-    query = query.filter(
-        LiveTracking.timestamp >= start_time,
-        LiveTracking.timestamp <= end_time
+    filename = f"tracking_{vehicle_id or 'fleet'}_{start_time:%Y%m%dT%H%M}_{end_time:%Y%m%dT%H%M}.{export_format}"
+    return StreamingResponse(
+        export_chunks(
+            export_query(vehicle_id, start_time, end_time),
+            export_format,
+            config.TRACKING_EXPORT_BATCH_SIZE
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
-    
-    tracking_points = query.order_by(LiveTracking.timestamp.asc()).limit(limit).all()
-    
-    return tracking_points
 
 
 @router.get("/vehicle/{vehicle_id}/route", response_model=RouteResponse)
-def get_route(
+async def get_route(
     vehicle_id: str,
     travel_id: Optional[str] = Query(None, description="Filter by specific travel"),
     start_time: Optional[datetime] = Query(None, description="Start time for route"),
     end_time: Optional[datetime] = Query(None, description="End time for route"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    tolerance_m: Optional[float] = Query(None, ge=0, le=10000, description="Simplify: drop vertices within this many meters of the line"),
+    max_points: Optional[int] = Query(None, ge=2, le=100000, description="Simplify: return at most this many points"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Get route path for a vehicle, optionally filtered by travel"""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    """Get route path for a vehicle, optionally filtered by travel and simplified"""
+    vehicle = await AsyncBaseRepository(db, Vehicle).get(vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vehicle not found"
         )
     
-    query = db.query(LiveTracking).filter(LiveTracking.vehicle_id == vehicle_id)
-    
     if travel_id:
         # Validate travel exists and belongs to vehicle
-        travel = db.query(Travel).filter(
-            Travel.id == travel_id,
-            Travel.vehicle_id == vehicle_id
-        ).first()
+        travel = await AsyncBaseRepository(db, Travel).get_by(
+            id=travel_id,
+            vehicle_id=vehicle_id
+        )
         if not travel:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,28 +467,20 @@ def get_route(
         
         # Use travel time range
         if travel.actual_departure and travel.actual_arrival:
-            query = query.filter(
-                LiveTracking.timestamp >= travel.actual_departure,
-                LiveTracking.timestamp <= travel.actual_arrival
-            )
+            start_time, end_time = travel.actual_departure, travel.actual_arrival
         elif travel.scheduled_departure and travel.scheduled_arrival:
-            query = query.filter(
-                LiveTracking.timestamp >= travel.scheduled_departure,
-                LiveTracking.timestamp <= travel.scheduled_arrival
-            )
+            start_time, end_time = travel.scheduled_departure, travel.scheduled_arrival
+        else:
+            start_time = end_time = None
     else:
         # Use provided time range or default to last 24 hours
         if not start_time:
             start_time = datetime.utcnow() - timedelta(hours=24)
         if not end_time:
             end_time = datetime.utcnow()
-        
-        query = query.filter(
-            LiveTracking.timestamp >= start_time,
-            LiveTracking.timestamp <= end_time
-        )
     
-    tracking_points = query.order_by(LiveTracking.timestamp.asc()).all()
+    # Index-only scan: only the covered route columns are selected
+    tracking_points = (await db.execute(route_query(vehicle_id, start_time, end_time))).all()
     
     if not tracking_points:
         raise HTTPException(
@@ -136,6 +488,15 @@ def get_route(
             detail="No tracking data found for the specified criteria"
         )
     
+    # Douglas-Peucker on NumPy arrays; only kept vertices become RoutePoints
+    kept_points = tracking_points
+    if tolerance_m is not None or max_points is not None:
+        count = len(tracking_points)
+        latitudes = np.fromiter((point.latitude for point in tracking_points), dtype=np.float64, count=count)
+        longitudes = np.fromiter((point.longitude for point in tracking_points), dtype=np.float64, count=count)
+        keep = await run_in_threadpool(simplify_indices, latitudes, longitudes, tolerance_m or 0.0, max_points)
+        kept_points = [tracking_points[i] for i in keep.tolist()]
+    
     route_points = [
         RoutePoint(
             latitude=point.latitude,
@@ -143,28 +504,34 @@ def get_route(
             timestamp=point.timestamp,
             speed=point.speed
         )
-        for point in tracking_points
+        for point in kept_points
     ]
     
     return RouteResponse(
         vehicle_id=vehicle_id,
         travel_id=travel_id,
         points=route_points,
-        total_points=len(route_points),
+        total_points=len(tracking_points),
+        returned_points=len(route_points),
         start_time=tracking_points[0].timestamp,
         end_time=tracking_points[-1].timestamp
     )
 
 
 @router.post("", response_model=LiveTrackingResponse, status_code=status.HTTP_201_CREATED)
-def create_tracking_point(
+async def create_tracking_point(
     tracking_data: LiveTrackingCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Manually store a tracking point (backup to WebSocket)"""
+    """Manually store a tracking point (backup to WebSocket)
+
+    With TRACKING_INGEST_MODE=kafka the point is produced to the tracking topic
+    and the response is 202 Accepted; the consumer writes the row.
+    """
     # Validate vehicle exists
-    vehicle = db.query(Vehicle).filter(Vehicle.id == tracking_data.vehicle_id).first()
+    vehicle = await AsyncBaseRepository(db, Vehicle).get(tracking_data.vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -172,16 +539,32 @@ def create_tracking_point(
         )
     
     # Validate driver exists
-    driver = db.query(User).filter(User.id == tracking_data.driver_id).first()
+    driver = await AsyncBaseRepository(db, User).get(tracking_data.driver_id)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Driver not found"
         )
     
+    # Rows outside the premade partitions would land in the default one for good
+    if not timestamp_in_window(tracking_data.timestamp, datetime.now(timezone.utc)):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Timestamp too far from server time"
+        )
+    
+    if config.TRACKING_INGEST_MODE == "kafka":
+        point = TrackPoint.new(**tracking_data.model_dump())
+        await producer.submit(point)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return LiveTrackingResponse(
+            **point._asdict(),
+            created_at=datetime.now(timezone.utc)
+        )
+    
     new_tracking = LiveTracking(**tracking_data.model_dump())
     db.add(new_tracking)
-    db.commit()
-    db.refresh(new_tracking)
+    await db.commit()
+    await db.refresh(new_tracking)
     
     return new_tracking
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
+
+from core.types import PolygonGeoJSON
 
 
 class LiveTrackingBase(BaseModel):
@@ -29,6 +31,66 @@ class LiveTrackingResponse(LiveTrackingBase):
         from_attributes = True
 
 
+class CurrentLocationResponse(LiveTrackingBase):
+    """Latest position; id, driver_id and created_at are null when served from Redis"""
+    id: Optional[str] = None
+    driver_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CurrentLocationsResponse(BaseModel):
+    """Latest positions for several vehicles, keyed by vehicle id"""
+    locations: Dict[str, CurrentLocationResponse]
+    missing: List[str]
+
+
+class NearbyVehicleResponse(BaseModel):
+    """Latest position of a vehicle found within a search radius"""
+    vehicle_id: str
+    latitude: float
+    longitude: float
+    speed: Optional[float] = None
+    heading: Optional[float] = None
+    timestamp: datetime
+    distance_m: float
+
+
+class TrackingAreaQuery(BaseModel):
+    """Schema for searching tracking points inside a polygon"""
+    polygon: PolygonGeoJSON
+    vehicle_id: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    limit: int = Field(1000, ge=1, le=10000)
+
+
+class TrackingRollupPoint(BaseModel):
+    """One minute/hour bucket: last position, average/max speed, distance and point count"""
+    bucket: datetime
+    timestamp: datetime
+    latitude: float
+    longitude: float
+    speed: Optional[float] = None
+    max_speed: Optional[float] = None
+    distance_m: float
+    point_count: int
+
+
+class TrackingRollupHistoryResponse(BaseModel):
+    """Tracking history served from rollups (format=full with resolution=minute|hour)"""
+    vehicle_id: str
+    format: str = "full"
+    resolution: str
+    count: int
+    truncated: bool
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    points: List[TrackingRollupPoint]
+
+
 class RoutePoint(BaseModel):
     """Schema for route point"""
     latitude: float
@@ -43,6 +105,7 @@ class RouteResponse(BaseModel):
     travel_id: Optional[str] = None
     points: List[RoutePoint]
     total_points: int
+    returned_points: int
     start_time: datetime
     end_time: datetime
 
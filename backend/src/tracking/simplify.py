@@ -0,0 +1,104 @@
+"""
+Route polyline simplification (Douglas-Peucker) on NumPy arrays.
+
+Points are projected to a local equirectangular plane in meters, so tolerance_m
+is a real ground distance. Every pass splits all open segments at once with
+whole-array operations (no per-segment Python loop), so a pass costs O(points
+still open) and a 1M-point route takes roughly as many passes as the recursion
+is deep. When a pass would exceed max_points, only its largest deviations are kept.
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+from core.geo import EARTH_RADIUS_M
+
+
+def project(latitudes: np.ndarray, longitudes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """x/y meters around the mean latitude, as two contiguous float64 arrays"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    x = lon * (EARTH_RADIUS_M * math.cos(float(lat.mean())))
+    y = lat * EARTH_RADIUS_M
+    return x, y
+
+
+def segment_distances_sq(
+    x: np.ndarray,
+    y: np.ndarray,
+    points: np.ndarray,
+    left: np.ndarray,
+    right: np.ndarray,
+) -> np.ndarray:
+    """Squared distance of each point to the segment between its left and right anchors"""
+    ax = x[left]
+    ay = y[left]
+    dx = x[right] - ax
+    dy = y[right] - ay
+    px = x[points] - ax
+    py = y[points] - ay
+    length_sq = dx * dx + dy * dy
+    t = px * dx + py * dy
+    np.divide(t, length_sq, out=t, where=length_sq > 0.0)
+    np.clip(t, 0.0, 1.0, out=t)
+    px -= t * dx
+    py -= t * dy
+    return px * px + py * py
+
+
+def simplify_indices(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    tolerance_m: float = 0.0,
+    max_points: Optional[int] = None,
+) -> np.ndarray:
+    """Sorted indices of the vertices to keep; endpoints are always kept
+
+    Stops when no remaining point deviates more than tolerance_m from the
+    simplified line, or when max_points vertices are kept, whichever is first.
+    """
+    n = len(latitudes)
+    if n <= 2:
+        return np.arange(n)
+
+    budget = (n if max_points is None else max(2, max_points)) - 2
+    tolerance_sq = tolerance_m * tolerance_m
+    x, y = project(latitudes, longitudes)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    # interior points whose segment may still be split, in route order
+    open_points = np.arange(1, n - 1)
+
+    while budget > 0 and open_points.size:
+        anchors = np.flatnonzero(keep)
+        # number of anchors at or before each open point = index of its right anchor
+        segment = np.cumsum(keep)[open_points]
+        distances = segment_distances_sq(x, y, open_points, anchors[segment - 1], anchors[segment])
+
+        # per-segment maximum and the first point reaching it
+        starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        seg_max = np.maximum.reduceat(distances, starts)
+        counts = np.diff(np.r_[starts, open_points.size])
+        at_max = np.flatnonzero(distances == np.repeat(seg_max, counts))
+        at_max_segment = segment[at_max]
+        farthest = at_max[np.r_[True, at_max_segment[1:] != at_max_segment[:-1]]]
+
+        split = seg_max > tolerance_sq
+        if not split.any():
+            break
+        if np.count_nonzero(split) > budget:
+            ranked = np.argpartition(-np.where(split, seg_max, -1.0), budget - 1)[:budget]
+            split = np.zeros_like(split)
+            split[ranked] = True
+
+        keep[open_points[farthest[split]]] = True
+        budget -= int(np.count_nonzero(split))
+
+        # segments that were split stay open (minus the new vertex); the rest are done
+        still_open = np.repeat(split, counts)
+        still_open[farthest[split]] = False
+        open_points = open_points[still_open]
+
+    return np.flatnonzero(keep)
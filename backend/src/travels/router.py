@@ -1,25 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
-from auth.simple.security import get_current_user, require_role, get_db
+from auth.simple.security import get_current_user_async, require_role_async
 from auth.simple.schemas import UserRole
 from common.models import Travel, Vehicle, User, Station, TravelStatus
-from .schemas import TravelCreate, TravelUpdate, TravelResponse
+from core.dependencies import get_async_db, get_redis
+from core.repository import AsyncBaseRepository
+from services.travel_lifecycle import complete_travel_record, cancel_travel_record
+from services.odometer import read_odometer
+from services.eta import eta_service
+from .schemas import TravelCreate, TravelUpdate, TravelResponse, TravelEtaResponse
 
 router = APIRouter(prefix="/travels", tags=["travels"])
 
 
 @router.post("", response_model=TravelResponse, status_code=status.HTTP_201_CREATED)
-def create_travel(
+async def create_travel(
     travel_data: TravelCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.USER]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async([UserRole.ADMIN, UserRole.USER]))
 ):
     """Create a new travel/trip"""
     # Validate vehicle exists
-    vehicle = db.query(Vehicle).filter(Vehicle.id == travel_data.vehicle_id).first()
+    vehicle = await AsyncBaseRepository(db, Vehicle).get(travel_data.vehicle_id)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -27,7 +33,7 @@ def create_travel(
         )
     
     # Validate driver exists and is a driver
-    driver = db.query(User).filter(User.id == travel_data.driver_id).first()
+    driver = await AsyncBaseRepository(db, User).get(travel_data.driver_id)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,14 +46,15 @@ def create_travel(
         )
     
     # Validate stations exist
-    origin = db.query(Station).filter(Station.id == travel_data.origin_station_id).first()
+    stations = AsyncBaseRepository(db, Station)
+    origin = await stations.get(travel_data.origin_station_id)
     if not origin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Origin station not found"
         )
     
-    destination = db.query(Station).filter(Station.id == travel_data.destination_station_id).first()
+    destination = await stations.get(travel_data.destination_station_id)
     if not destination:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,46 +70,48 @@ def create_travel(
     
     new_travel = Travel(**travel_data.model_dump())
     db.add(new_travel)
-    db.commit()
-    db.refresh(new_travel)
+    await db.commit()
+    await db.refresh(new_travel)
     
     return new_travel
 
 
 @router.get("", response_model=List[TravelResponse])
-def list_travels(
+async def list_travels(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[TravelStatus] = None,
     vehicle_id: Optional[str] = None,
     driver_id: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """List travels with optional filters"""
-    query = db.query(Travel)
+    conditions = []
     
     if status_filter:
-        query = query.filter(Travel.status == status_filter)
+        conditions.append(Travel.status == status_filter)
     
     if vehicle_id:
-        query = query.filter(Travel.vehicle_id == vehicle_id)
+        conditions.append(Travel.vehicle_id == vehicle_id)
     
     if driver_id:
-        query = query.filter(Travel.driver_id == driver_id)
+        conditions.append(Travel.driver_id == driver_id)
     
-    travels = query.offset(skip).limit(limit).all()
+    travels, _, _ = await AsyncBaseRepository(db, Travel).filter(
+        *conditions, skip=skip, limit=limit, with_total=False
+    )
     return travels
 
 
 @router.get("/{travel_id}", response_model=TravelResponse)
-def get_travel(
+async def get_travel(
     travel_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get a specific travel by ID"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,15 +120,54 @@ def get_travel(
     return travel
 
 
+@router.get("/{travel_id}/eta", response_model=TravelEtaResponse)
+async def get_travel_eta(
+    travel_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Estimated arrival for an in-progress travel.
+    Served from the vehicle's cached estimate, which driver pings refresh after
+    meaningful movement; computed on demand when there is none. Live updates
+    arrive on /ws/track/{vehicle_id} as {"type": "eta", ...}.
+    """
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
+    if not travel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Travel not found"
+        )
+    
+    if travel.status != TravelStatus.IN_PROGRESS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No ETA for travel with status: {travel.status}"
+        )
+    
+    eta = await eta_service.cached(redis_client, travel)
+    if eta is None:
+        eta = await eta_service.estimate(db, redis_client, travel)
+        if eta is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No known position for the travel's vehicle"
+            )
+        await eta_service.store(redis_client, eta)
+    
+    return eta
+
+
 @router.put("/{travel_id}", response_model=TravelResponse)
-def update_travel(
+async def update_travel(
     travel_id: str,
     travel_data: TravelUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Update a travel"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -130,20 +178,21 @@ def update_travel(
     for field, value in travel_data.model_dump(exclude_unset=True).items():
         setattr(travel, field, value)
     
-    db.commit()
-    db.refresh(travel)
+    await db.commit()
+    await db.refresh(travel)
     
     return travel
 
 
 @router.post("/{travel_id}/start", response_model=TravelResponse)
-def start_travel(
+async def start_travel(
     travel_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Mark a travel as started (in progress)"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,21 +207,27 @@ def start_travel(
     
     travel.status = TravelStatus.IN_PROGRESS
     travel.actual_departure = datetime.utcnow()
+    travel.start_odometer_m = await read_odometer(redis_client, travel.vehicle_id)
     
-    db.commit()
-    db.refresh(travel)
+    await db.commit()
+    await db.refresh(travel)
     
     return travel
 
 
 @router.post("/{travel_id}/complete", response_model=TravelResponse)
-def complete_travel(
+async def complete_travel(
     travel_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(get_current_user_async)
 ):
-    """Mark a travel as completed"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    """Mark a travel as completed and record its history
+
+    Travels normally complete on their own when the vehicle enters the
+    destination station (services/travel_lifecycle.py).
+    """
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,23 +240,25 @@ def complete_travel(
             detail=f"Cannot complete travel with status: {travel.status}"
         )
     
-    travel.status = TravelStatus.COMPLETED
-    travel.actual_arrival = datetime.utcnow()
+    await complete_travel_record(
+        db, travel, datetime.now(timezone.utc), await read_odometer(redis_client, travel.vehicle_id)
+    )
     
-    db.commit()
-    db.refresh(travel)
+    await db.commit()
+    await db.refresh(travel)
     
     return travel
 
 
 @router.post("/{travel_id}/cancel", response_model=TravelResponse)
-def cancel_travel(
+async def cancel_travel(
     travel_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.USER]))
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(require_role_async([UserRole.ADMIN, UserRole.USER]))
 ):
-    """Cancel a travel"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    """Cancel a travel and record its history"""
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -214,29 +271,29 @@ def cancel_travel(
             detail="Cannot cancel a completed travel"
         )
     
-    travel.status = TravelStatus.CANCELLED
+    await cancel_travel_record(db, travel, await read_odometer(redis_client, travel.vehicle_id))
     
-    db.commit()
-    db.refresh(travel)
+    await db.commit()
+    await db.refresh(travel)
     
     return travel
 
 
 @router.delete("/{travel_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_travel(
+async def delete_travel(
     travel_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role_async([UserRole.ADMIN]))
 ):
     """Delete a travel (Admin only)"""
-    travel = db.query(Travel).filter(Travel.id == travel_id).first()
+    travel = await AsyncBaseRepository(db, Travel).get(travel_id)
     if not travel:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Travel not found"
         )
     
-    db.delete(travel)
-    db.commit()
+    await db.delete(travel)
+    await db.commit()
     
     return None
@@ -41,3 +41,20 @@ class TravelResponse(TravelBase):
 
     class Config:
         from_attributes = True
+
+
+class TravelEtaResponse(BaseModel):
+    """Arrival estimate for an in-progress travel"""
+    travel_id: str
+    vehicle_id: str
+    destination_station_id: str
+    eta: datetime
+    remaining_minutes: float
+    remaining_km: float
+    speed_kmh: float
+    live_speed_kmh: Optional[float] = None
+    historical_speed_kmh: Optional[float] = None
+    historical_trips: int = 0
+    scheduled_arrival: Optional[datetime] = None
+    delay_minutes: Optional[float] = None
+    computed_at: datetime
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
+import redis
 
 from auth.simple.security import get_current_user, require_role, get_db
 from auth.simple.schemas import UserRole
 from common.models import Vehicle, User, VehicleStatus
+from core.dependencies import get_sync_redis
+from services.vehicle_cache import publish_vehicle_invalidation
+from services.websocket_manager import location_key
+from services.geofence import station_key
+from services.odometer import odometer_key
 from .schemas import VehicleCreate, VehicleUpdate, VehicleResponse
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
@@ -14,6 +20,7 @@ router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 def create_vehicle(
     vehicle_data: VehicleCreate,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Create a new vehicle (Admin only)"""
@@ -45,6 +52,9 @@ def create_vehicle(
     db.commit()
     db.refresh(new_vehicle)
     
+    # Clear cached "not found" entries on every worker
+    publish_vehicle_invalidation(redis_client, new_vehicle.id)
+    
     return new_vehicle
 
 
@@ -87,6 +97,7 @@ def update_vehicle(
     vehicle_id: str,
     vehicle_data: VehicleUpdate,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Update a vehicle (Admin only)"""
@@ -127,6 +138,9 @@ def update_vehicle(
     db.commit()
     db.refresh(vehicle)
     
+    # Drop the cached vehicle/driver assignment on every worker
+    publish_vehicle_invalidation(redis_client, vehicle.id)
+    
     return vehicle
 
 
@@ -134,6 +148,7 @@ def update_vehicle(
 def delete_vehicle(
     vehicle_id: str,
     db: Session = Depends(get_db),
+    redis_client: redis.Redis = Depends(get_sync_redis),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Delete a vehicle (Admin only)"""
@@ -147,4 +162,12 @@ def delete_vehicle(
     db.delete(vehicle)
     db.commit()
     
+    # Drop the cached vehicle on every worker, and its cached position and
+    # station membership / odometer so /tracking/current stops serving it
+    publish_vehicle_invalidation(redis_client, vehicle_id)
+    try:
+        redis_client.delete(location_key(vehicle_id), station_key(vehicle_id), odometer_key(vehicle_id))
+    except redis.RedisError:
+        pass
+    
     return None
@@ -1,16 +1,52 @@
 import json
-from datetime import datetime
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, status
-from pydantic import BaseModel, ValidationError
+import asyncio
+from datetime import datetime, timezone
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException, Depends, status
+from typing import List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError, model_validator
 from sqlalchemy.orm import Session
+import redis.asyncio as aioredis
 
-from auth.simple.security import verify_token, get_db
+from auth.simple.security import verify_token, get_db, require_role
+from core.config import config
+from core.dependencies import get_redis
 from auth.simple.schemas import UserRole
-from common.models import User, LiveTracking, Vehicle
-from services.websocket_manager import manager
+from common.models import User
+from core.types import Latitude, Longitude
+from services.websocket_manager import manager, TrackShaping
+from services.tracking_ingest import ingestor, TrackPoint, timestamp_in_window
+from services.tracking_kafka import producer
+from services.vehicle_cache import vehicle_cache, CachedVehicle
+from services.location_codec import decode_location, LocationFrameError, BINARY_SUBPROTOCOL
+from services.cluster import registry, live_workers
+from services.geofence import geofence
+from services.odometer import odometer
+from services.eta import eta_service
 
 router = APIRouter(tags=["websocket"])
 
+# Kafka mode: points go to the topic and the consumer owns latest-location keys
+kafka_ingest = config.TRACKING_INGEST_MODE == "kafka"
+tracking_sink = producer if kafka_ingest else ingestor
+
+
+class FleetControl(BaseModel):
+    """Fleet subscription control message"""
+    action: Literal["subscribe", "unsubscribe", "subscribe_area", "unsubscribe_area"]
+    vehicle_ids: List[str] = Field(default_factory=list, max_length=1000)
+    # [min_lon, min_lat, max_lon, max_lat]
+    bbox: Optional[Tuple[Longitude, Latitude, Longitude, Latitude]] = None
+
+    @model_validator(mode="after")
+    def validate_bbox(self):
+        if self.action == "subscribe_area":
+            if self.bbox is None:
+                raise ValueError("bbox is required for subscribe_area")
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if min_lon > max_lon or min_lat > max_lat:
+                raise ValueError("bbox must be [min_lon, min_lat, max_lon, max_lat]")
+        return self
+
 
 class LocationUpdate(BaseModel):
     """Location update schema"""
@@ -39,16 +75,49 @@ async def get_user_from_token(token: str, db: Session) -> User:
         raise credentials_exception
 
 
+def _negotiate_encoding(websocket: WebSocket, encoding: str) -> tuple[bool, Optional[str]]:
+    """Binary when the client offers the subprotocol or asks via ?encoding=binary"""
+    if BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+        return True, BINARY_SUBPROTOCOL
+    return encoding == "binary", None
+
+
+def _driver_may_report(vehicle: CachedVehicle | None, driver_id: str) -> bool:
+    """Vehicle exists and is either unassigned or assigned to this driver"""
+    return vehicle is not None and vehicle.driver_id in (None, driver_id)
+
+
 @router.websocket("/ws/track/{vehicle_id}")
 async def track_websocket(
     websocket: WebSocket,
     vehicle_id: str,
-    token: str = Query(...)
+    token: str = Query(...),
+    mode: Literal["full", "delta"] = Query("full", description="full JSON positions or quantized deltas"),
+    min_distance_m: Optional[float] = Query(None, gt=0, description="Only send after moving this far"),
+    min_heading_deg: Optional[float] = Query(None, gt=0, le=180, description="Or send after turning this many degrees"),
+    min_interval_ms: Optional[int] = Query(None, gt=0, description="Send at most once per interval"),
+    encoding: Literal["json", "binary"] = Query("json", description="json text or fixed-layout binary frames"),
 ):
     """
     WebSocket endpoint for dashboards to subscribe to vehicle location updates.
-    Requires JWT token in query parameter.
+    Requires JWT token in query parameter. Shaping parameters are opt-in; without
+    them every update is forwarded as the full JSON position. Binary frames
+    (services.location_codec) are negotiated via ?encoding=binary or the
+    "pilive.binary.v1" subprotocol and cannot be combined with mode=delta.
+    Travel ETAs are pushed as JSON text {"type": "eta", ...} in every mode.
     """
+    binary, subprotocol = _negotiate_encoding(websocket, encoding)
+    if binary and mode == "delta":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    shaping = TrackShaping(
+        delta=mode == "delta",
+        min_distance_m=min_distance_m,
+        min_heading_deg=min_heading_deg,
+        min_interval_ms=min_interval_ms,
+    )
+
     # Get database session
     db_gen = get_db()
     db = next(db_gen)
@@ -57,20 +126,19 @@ async def track_websocket(
         # Verify JWT token and get user
         user = await get_user_from_token(token, db)
         
-        # Connect to WebSocket
-        await manager.connect(websocket, vehicle_id)
-        
-        # Subscribe to Redis Pub/Sub channel for this vehicle
-        await manager.subscribe_to_vehicle(vehicle_id)
+        # Connect to WebSocket and subscribe to this vehicle's Redis channel
+        await manager.connect(websocket, vehicle_id, shaping, binary=binary, subprotocol=subprotocol)
         
-        # Send confirmation
+        # Send confirmation (always JSON text)
         await websocket.send_json({
             "status": "connected",
             "vehicle_id": vehicle_id,
-            "message": "Tracking vehicle location updates"
+            "message": "Tracking vehicle location updates",
+            "mode": mode,
+            "encoding": "binary" if binary else "json"
         })
         
-        # Keep connection alive and let the pubsub task handle broadcasting
+        # Keep connection alive and let the shared pubsub listener handle broadcasting
         while True:
             try:
                 # Just keep the connection alive
@@ -80,12 +148,160 @@ async def track_websocket(
                 break
                 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, vehicle_id)
+        pass
+    except HTTPException:
+        await websocket.close()
+    except Exception as e:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        # Release this viewer; the vehicle channel is unsubscribed with the last one
+        await manager.disconnect(websocket)
+        try:
+            next(db_gen, None)
+        except StopIteration:
+            pass
+
+
+@router.websocket("/ws/fleet")
+async def fleet_websocket(
+    websocket: WebSocket,
+    token: str = Query(...)
+):
+    """
+    WebSocket endpoint for dispatcher dashboards watching many vehicles at once.
+    Requires JWT token in query parameter. Send control messages such as
+    {"action": "subscribe", "vehicle_ids": [...]} or
+    {"action": "subscribe_area", "bbox": [min_lon, min_lat, max_lon, max_lat]};
+    updates arrive batched as {"type": "updates", "vehicles": {vehicle_id: location}}.
+    """
+    # Get database session
+    db_gen = get_db()
+    db = next(db_gen)
+    
+    try:
+        # Verify JWT token once for the whole fleet
+        user = await get_user_from_token(token, db)
+        
+        # Connect to WebSocket
+        sender = await manager.connect_fleet(websocket)
+        
+        # Send confirmation
+        await sender.send_json({
+            "status": "connected",
+            "message": "Send subscribe/unsubscribe messages to track vehicles"
+        })
+        
+        # Apply control messages; the shared pubsub listener feeds the batches
+        while True:
+            try:
+                control = FleetControl.model_validate(await websocket.receive_json())
+                
+                if control.action == "subscribe":
+                    room = config.WS_FLEET_MAX_VEHICLES - len(sender.vehicle_ids)
+                    if len(set(control.vehicle_ids) - sender.vehicle_ids) > room:
+                        await sender.send_json({
+                            "status": "error",
+                            "message": f"At most {config.WS_FLEET_MAX_VEHICLES} vehicles per connection"
+                        })
+                        continue
+                    await manager.add_viewers(websocket, control.vehicle_ids)
+                elif control.action == "unsubscribe":
+                    await manager.remove_viewers(websocket, control.vehicle_ids)
+                elif control.action == "subscribe_area":
+                    await manager.set_area(websocket, control.bbox)
+                else:
+                    await manager.set_area(websocket, None)
+                
+                await sender.send_json({
+                    "status": "ok",
+                    "action": control.action,
+                    "vehicle_count": len(sender.vehicle_ids),
+                    "bbox": sender.bbox
+                })
+                
+            except ValidationError as ve:
+                await sender.send_json({
+                    "status": "error",
+                    "message": f"Invalid control message: {str(ve)}"
+                })
+            except json.JSONDecodeError:
+                await sender.send_json({
+                    "status": "error",
+                    "message": "Invalid JSON format"
+                })
+                
+    except WebSocketDisconnect:
+        pass
     except HTTPException:
         await websocket.close()
     except Exception as e:
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
     finally:
+        # Release every vehicle channel and area held by this connection
+        await manager.disconnect(websocket)
+        try:
+            next(db_gen, None)
+        except StopIteration:
+            pass
+
+
+@router.websocket("/ws/geofence")
+async def geofence_websocket(
+    websocket: WebSocket,
+    token: str = Query(...),
+    vehicle_ids: Optional[str] = Query(None, description="Comma-separated vehicle ids; all vehicles when omitted")
+):
+    """
+    WebSocket endpoint for station arrival/departure events.
+    Requires JWT token in query parameter. Each event is sent as
+    {"type": "arrived" | "departed", "vehicle_id", "station_id", "station_name",
+    "latitude", "longitude", "timestamp", "odometer_m"}, replacing polling of
+    /stations/check/{vehicle_id}/at-station.
+    """
+    watched = {v.strip() for v in vehicle_ids.split(",") if v.strip()} if vehicle_ids else None
+
+    # Get database session
+    db_gen = get_db()
+    db = next(db_gen)
+    queue = None
+    forward_task = None
+
+    try:
+        # Verify JWT token and get user
+        user = await get_user_from_token(token, db)
+
+        await websocket.accept()
+        queue = await geofence.subscribe()
+
+        await websocket.send_json({
+            "status": "connected",
+            "message": "Receiving station arrival/departure events",
+            "vehicle_ids": sorted(watched) if watched is not None else None
+        })
+
+        async def forward():
+            while True:
+                vehicle_id, text = await queue.get()
+                if watched is None or vehicle_id in watched:
+                    await websocket.send_text(text)
+
+        forward_task = asyncio.create_task(forward())
+
+        # Nothing is expected from the client; reading detects the disconnect
+        while True:
+            await websocket.receive_text()
+
+    except WebSocketDisconnect:
+        pass
+    except HTTPException:
+        await websocket.close()
+    except Exception as e:
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        if forward_task is not None:
+            forward_task.cancel()
+        if queue is not None:
+            await geofence.unsubscribe(queue)
         try:
             next(db_gen, None)
         except StopIteration:
@@ -96,12 +312,18 @@ async def track_websocket(
 async def driver_websocket(
     websocket: WebSocket,
     vehicle_id: str,
-    token: str = Query(...)
+    token: str = Query(...),
+    encoding: Literal["json", "binary"] = Query("json", description="json text or fixed-layout binary frames")
 ):
     """
     WebSocket endpoint for drivers to push GPS coordinates.
     Requires JWT token in query parameter and driver role.
+    In binary mode (?encoding=binary or the "pilive.binary.v1" subprotocol) each
+    location is one services.location_codec frame; successful pings are not
+    acknowledged and errors are reported as JSON text.
     """
+    binary, subprotocol = _negotiate_encoding(websocket, encoding)
+
     # Get database session
     db_gen = get_db()
     db = next(db_gen)
@@ -115,26 +337,62 @@ async def driver_websocket(
             await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
             return
         
-        # Connect to WebSocket
-        await manager.connect(websocket, vehicle_id)
+        # Verify vehicle exists and is not assigned to another driver
+        if not _driver_may_report(await vehicle_cache.get(vehicle_id), user.id):
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        # Accept WebSocket (drivers publish only; they are not fan-out viewers)
+        await websocket.accept(subprotocol=subprotocol)
+        
+        # The previous session may have run on another worker; resume its odometer from Redis
+        odometer.forget(vehicle_id)
         
         # Send confirmation
         await websocket.send_json({
             "status": "connected",
             "vehicle_id": vehicle_id,
-            "message": "Ready to receive location updates"
+            "message": "Ready to receive location updates",
+            "encoding": "binary" if binary else "json"
         })
         
         # Listen for location updates
         while True:
             try:
-                # Receive JSON message with location data
-                data = await websocket.receive_json()
+                if binary:
+                    # Fixed-layout frame: struct unpack + range check, no pydantic
+                    location = decode_location(await websocket.receive_bytes())
+                else:
+                    # Receive JSON message with location data
+                    data = await websocket.receive_json()
+                    
+                    # Validate location data
+                    location = LocationUpdate(**data)
                 
-                # Validate location data
-                location = LocationUpdate(**data)
+                # Re-check against the in-process cache; update/delete invalidations
+                # from any worker end the session here without a DB round trip
+                if not _driver_may_report(await vehicle_cache.get(vehicle_id), user.id):
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    break
                 
-                # Update location in Redis and publish to Pub/Sub
+                # Parse timestamp if provided, otherwise use current time; a skewed
+                # device clock falls back to server time too
+                now = datetime.now(timezone.utc)
+                track_timestamp = now
+                if binary and location.timestamp:
+                    track_timestamp = location.timestamp
+                elif location.timestamp:
+                    try:
+                        track_timestamp = datetime.fromisoformat(location.timestamp.replace('Z', '+00:00'))
+                    except (ValueError, AttributeError):
+                        pass
+                if track_timestamp.tzinfo is None:
+                    track_timestamp = track_timestamp.replace(tzinfo=timezone.utc)
+                if not timestamp_in_window(track_timestamp, now):
+                    track_timestamp = now
+                
+                # Update location in Redis and publish to Pub/Sub; the stored copy
+                # always carries a parseable timestamp so /tracking/current can serve it
                 await manager.update_vehicle_location(
                     vehicle_id=vehicle_id,
                     latitude=location.latitude,
@@ -142,45 +400,33 @@ async def driver_websocket(
                     speed=location.speed,
                     heading=location.heading,
                     accuracy=location.accuracy,
-                    timestamp=location.timestamp
+                    timestamp=track_timestamp.isoformat(),
+                    store=not kafka_ingest
                 )
                 
-                # Store tracking point in database
-                try:
-                    # Get vehicle to ensure it exists
-                    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-                    if vehicle:
-                        # Parse timestamp if provided, otherwise use current time
-                        track_timestamp = datetime.utcnow()
-                        if location.timestamp:
-                            try:
-                                track_timestamp = datetime.fromisoformat(location.timestamp.replace('Z', '+00:00'))
-                            except (ValueError, AttributeError):
-                                pass
-                        
-                        tracking_point = LiveTracking(
-                            vehicle_id=vehicle_id,
-                            driver_id=user.id,
-                            latitude=location.latitude,
-                            longitude=location.longitude,
-                            speed=location.speed,
-                            heading=location.heading,
-                            accuracy=location.accuracy,
-                            timestamp=track_timestamp
-                        )
-                        db.add(tracking_point)
-                        db.commit()
-                except Exception as db_error:
-                    # Log error but don't break the WebSocket connection
-                    db.rollback()
+                # Re-estimate the travel ETA in the background once the vehicle has moved enough
+                eta_service.observe(vehicle_id, location.latitude, location.longitude)
+                
+                # Queue tracking point for the batched live_tracking writer (or Kafka)
+                await tracking_sink.submit(TrackPoint.new(
+                    vehicle_id=vehicle_id,
+                    driver_id=user.id,
+                    latitude=location.latitude,
+                    longitude=location.longitude,
+                    speed=location.speed,
+                    heading=location.heading,
+                    accuracy=location.accuracy,
+                    timestamp=track_timestamp
+                ))
                 
                 # Send acknowledgment
-                await websocket.send_json({
-                    "status": "received",
-                    "vehicle_id": vehicle_id,
-                    "latitude": location.latitude,
-                    "longitude": location.longitude
-                })
+                if not binary:
+                    await websocket.send_json({
+                        "status": "received",
+                        "vehicle_id": vehicle_id,
+                        "latitude": location.latitude,
+                        "longitude": location.longitude
+                    })
                 
             except ValidationError as ve:
                 await websocket.send_json({
@@ -192,6 +438,14 @@ async def driver_websocket(
                     "status": "error",
                     "message": "Invalid JSON format"
                 })
+            except LocationFrameError as fe:
+                # decode_location range / size check
+                await websocket.send_json({
+                    "status": "error",
+                    "message": f"Invalid binary location frame: {str(fe)}"
+                })
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 await websocket.send_json({
                     "status": "error",
@@ -199,13 +453,36 @@ async def driver_websocket(
                 })
                 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, vehicle_id)
+        pass
     except HTTPException:
         await websocket.close()
     except Exception as e:
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
     finally:
+        # The next session may land on another worker; Redis keeps the membership
+        geofence.forget(vehicle_id)
         try:
             next(db_gen, None)
         except StopIteration:
             pass
+
+
+@router.get("/ws/cluster")
+async def cluster_status(
+    redis_client: aioredis.Redis = Depends(get_redis),
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """
+    Live WebSocket workers and their connection counts (admin only).
+    Workers only appear when WS_CLUSTER_ENABLED is set.
+    """
+    workers = await live_workers(redis_client)
+    return {
+        "enabled": config.WS_CLUSTER_ENABLED,
+        "worker_id": registry.worker_id,
+        "workers": workers,
+        "totals": {
+            field: sum(worker.get(field, 0) for worker in workers)
+            for field in manager.stats()
+        },
+    }